@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 from pathlib import Path
 import os
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -63,19 +64,148 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_PAGINATION_CLASS": "pronovetai_app.pagination.DataTablesPagination",
+    "DEFAULT_FILTER_BACKENDS": [
+        "pronovetai_app.filters.DataTablesSearchFilter",
+        "pronovetai_app.filters.DataTablesOrderingFilter",
+        "pronovetai_app.filters.NumericRangeFilter",
+    ],
 }
 
 SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# CACHE_BACKEND picks the tier every cache user shares (sessions, dashboard
+# counters, lookup tables, cache-aside entries, index version keys):
+#   locmem  per process; fine for runserver, useless across gunicorn workers
+#   file    a directory shared by the workers on one host (CACHE_LOCATION)
+#   redis   CACHE_LOCATION=redis://host:6379/1; needs `pip install redis`
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+CACHE_TIERS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pronovetai',
+        'OPTIONS': {'MAX_ENTRIES': 10_000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / 'var' / 'cache')),
+        'OPTIONS': {'MAX_ENTRIES': 20_000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+    },
+}
+if CACHE_BACKEND not in CACHE_TIERS:
+    raise ImproperlyConfigured(f"CACHE_BACKEND must be one of {', '.join(CACHE_TIERS)}, not {CACHE_BACKEND!r}")
+CACHES = {
+    'default': {
+        **CACHE_TIERS[CACHE_BACKEND],
+        'KEY_PREFIX': os.getenv('CACHE_KEY_PREFIX', 'pronovetai'),
+        'TIMEOUT': 300,
+    },
+}
+# lifetime of cache-aside entries (pronovetai_app/caching.py)
+CACHE_ASIDE_TIMEOUT = int(os.getenv('CACHE_ASIDE_TIMEOUT', 300))
+
+# seconds before /api/dashboard/ recounts its cached totals
+DASHBOARD_COUNTERS_MAX_AGE = int(os.getenv('DASHBOARD_COUNTERS_MAX_AGE', 300))
+
+# request instrumentation (pronovetai_app/instrumentation.py): requests over
+# either threshold are logged and counted in /metrics
+API_SLOW_REQUEST_MS = int(os.getenv('API_SLOW_REQUEST_MS', 500))
+API_MAX_QUERIES = int(os.getenv('API_MAX_QUERIES', 50))
+# /metrics answers staff sessions and `Authorization: Bearer $METRICS_TOKEN`
+# (the scraper's credentials). METRICS_ALLOWED_IPS is matched against
+# REMOTE_ADDR, which behind a reverse proxy is the proxy: every request from
+# outside arrives from 127.0.0.1, so only list addresses that reach gunicorn
+# directly.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = [ip for ip in os.getenv('METRICS_ALLOWED_IPS', '').split(',') if ip]
+
+# /api/search/ and ?search= use the FULLTEXT indexes of migration 0012 on
+# MySQL (search.py); SEARCH_FULLTEXT=0 falls back to icontains everywhere
+SEARCH_FULLTEXT = os.getenv('SEARCH_FULLTEXT', '1') == '1'
+
+# seconds a process trusts its copy of the grade/type/user-type lookup tables
+# (reference.py); REFERENCE_DATA_SHARED=1 also keeps the rows in the cache
+REFERENCE_DATA_MAX_AGE = int(os.getenv('REFERENCE_DATA_MAX_AGE', 300))
+REFERENCE_DATA_SHARED = os.getenv('REFERENCE_DATA_SHARED', '0') == '1'
+
+# /api/token/refresh/ checks the blacklist through denylist.py: rebuilt every
+# TOKEN_DENYLIST_REBUILD seconds, re-read at least every TOKEN_DENYLIST_MAX_AGE
+# (`manage.py prune_tokens` keeps the token tables small)
+SIMPLE_JWT = {
+    'TOKEN_REFRESH_SERIALIZER': 'pronovetai_app.denylist.TokenRefreshSerializer',
+}
+TOKEN_DENYLIST_REBUILD = int(os.getenv('TOKEN_DENYLIST_REBUILD', 3600))
+TOKEN_DENYLIST_MAX_AGE = int(os.getenv('TOKEN_DENYLIST_MAX_AGE', 30))
+
+# BuildingLog rows are inserted by a background thread (auditlog.py),
+# in batches of AUDIT_LOG_BATCH_SIZE or every AUDIT_LOG_FLUSH_MS; rows the
+# database refuses, or that are still queued when it is gone at shutdown, go
+# to AUDIT_LOG_SPOOL for `manage.py replay_audit_log`. AUDIT_LOG_ASYNC=0
+# writes inline.
+AUDIT_LOG_ASYNC = os.getenv('AUDIT_LOG_ASYNC', '1') == '1'
+AUDIT_LOG_BATCH_SIZE = int(os.getenv('AUDIT_LOG_BATCH_SIZE', 100))
+AUDIT_LOG_FLUSH_MS = int(os.getenv('AUDIT_LOG_FLUSH_MS', 500))
+AUDIT_LOG_QUEUE_SIZE = int(os.getenv('AUDIT_LOG_QUEUE_SIZE', 10_000))
+AUDIT_LOG_SPOOL = os.getenv('AUDIT_LOG_SPOOL', str(BASE_DIR / 'var' / 'audit-log.jsonl'))
+
+# StatelessJWTAuthentication (authentication.py) builds request.user from the
+# token claims for GET/HEAD/OPTIONS and loads it from pt_users for writes;
+# JWT_STATELESS_USER=0 loads it on every call like JWTAuthentication does
+JWT_STATELESS_USER = os.getenv('JWT_STATELESS_USER', '1') == '1'
+
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
 
+# ModelBackend plus the legacy MD5 formats of pt_users.user_pass, in one pass
 AUTHENTICATION_BACKENDS = [
-    "django.contrib.auth.backends.ModelBackend",
     "pronovetai_app.legacy_backends.LegacyHashBackend",
 ]
 
+# PASSWORD_HASHER_PROFILE picks the hasher for new and re-hashed passwords,
+# with the cost parameters below (pronovetai_app/hashers.py). Changing either
+# rehashes each user at their next login; `manage.py bench_login` shows what
+# a profile costs. argon2 needs `pip install argon2-cffi`.
+PASSWORD_HASHER_PROFILE = os.getenv('PASSWORD_HASHER_PROFILE', 'pbkdf2')
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'pronovetai_app.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'pronovetai_app.hashers.ScryptPasswordHasher',
+    'argon2': 'pronovetai_app.hashers.Argon2PasswordHasher',
+}
+if PASSWORD_HASHER_PROFILE not in PASSWORD_HASHER_PROFILES:
+    raise ImproperlyConfigured(
+        f"PASSWORD_HASHER_PROFILE must be one of {', '.join(PASSWORD_HASHER_PROFILES)}, not {PASSWORD_HASHER_PROFILE!r}"
+    )
+PASSWORD_HASHER_COSTS = {
+    'pbkdf2': {'iterations': int(os.getenv('PBKDF2_ITERATIONS', 870_000))},
+    'scrypt': {
+        'work_factor': int(os.getenv('SCRYPT_WORK_FACTOR', 2 ** 14)),
+        'block_size': int(os.getenv('SCRYPT_BLOCK_SIZE', 8)),
+        'parallelism': int(os.getenv('SCRYPT_PARALLELISM', 5)),
+        'maxmem': int(os.getenv('SCRYPT_MAXMEM', 0)),
+    },
+    'argon2': {
+        'time_cost': int(os.getenv('ARGON2_TIME_COST', 2)),
+        'memory_cost': int(os.getenv('ARGON2_MEMORY_COST', 102_400)),  # KiB
+        'parallelism': int(os.getenv('ARGON2_PARALLELISM', 8)),
+    },
+}
+# the profile's hasher first, then everything stored hashes may still use;
+# pbkdf2_wrapped_md5 verifies MD5 hashes wrapped by `manage.py wrap_legacy_hashes`
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE],
+    *(path for name, path in PASSWORD_HASHER_PROFILES.items() if name != PASSWORD_HASHER_PROFILE),
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "pronovetai_app.legacy_backends.PBKDF2WrappedMD5PasswordHasher",
+]
+
 
 MIDDLEWARE = [
+    "pronovetai_app.instrumentation.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -115,28 +245,35 @@ WSGI_APPLICATION = "core.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-# DATABASES = {
-#     "default": {
-#         "ENGINE": "django.db.backends.sqlite3",
-#         "NAME": BASE_DIR / "db.sqlite3",
-#     }
-# }
-
+# DB_ENGINE=sqlite runs on a local file instead of MySQL (quick checks,
+# `manage.py benchmark_api`); DB_NAME/DB_HOST/... point at another MySQL
+# server such as a local container.
 DATABASES = {
     'default': {
         'ENGINE': 'core.db.backends.mysql',
-        'NAME': 'pronovetai_db',
-        'USER': 'root',
+        'NAME': os.getenv('DB_NAME', 'pronovetai_db'),
+        'USER': os.getenv('DB_USER', 'root'),
         'PASSWORD': os.getenv('DB_PASSWORD'),
-        'HOST': '127.0.0.1',
-        'PORT': '3306',
+        'HOST': os.getenv('DB_HOST', '127.0.0.1'),
+        'PORT': os.getenv('DB_PORT', '3306'),
         'OPTIONS': {
             'init_command': 'SET sql_mode="STRICT_TRANS_TABLES"',
             'charset': 'utf8mb4',
         },
+        # legacy tables are created by the test runner, not by migrations
+        'TEST': {'MIGRATE': False},
     }
 }
 
+if os.getenv('DB_ENGINE') == 'sqlite':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        'TEST': {'MIGRATE': False},
+    }
+
+TEST_RUNNER = 'pronovetai_app.test_runner.UnmanagedModelTestRunner'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
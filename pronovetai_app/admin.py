@@ -6,6 +6,7 @@ from django import forms
 from .models import (User, UserType, Company,
                      Building, Unit, ODForm,
                      Address, Contact)
+from . import reference
 
 
 def user_type_help():
@@ -16,7 +17,7 @@ def user_type_help():
      …"
     """
     return "\n".join(
-        f"{ut.pk} – {ut.description}" for ut in UserType.objects.all()
+        f"{ut.pk} – {ut.description}" for ut in reference.user_types.rows()
     ) or "Create some UserType rows first!"
 
 
@@ -0,0 +1,243 @@
+"""
+BuildingLog writes off the request path.
+
+log_building() builds the row, and once the surrounding transaction commits
+hands it to a per-process background thread. The thread inserts with one
+bulk_create per model as soon as AUDIT_LOG_BATCH_SIZE rows are waiting or
+AUDIT_LOG_FLUSH_MS after the first of them, whichever comes first. The
+request never waits on the INSERT.
+
+Nothing is dropped:
+  • a full queue (AUDIT_LOG_QUEUE_SIZE) makes the caller insert its row itself
+  • a batch the database refuses is retried row by row; rows that still fail
+    (a building deleted meanwhile, say) are appended to the spool file
+  • a batch that can be neither inserted nor spooled stays with the thread
+    and is retried; if the thread dies, its replacement takes over its rows
+  • at interpreter exit the queue is drained, to the database or, if that is
+    gone, to the spool file
+`manage.py replay_audit_log` inserts what the spool file holds.
+
+Row ids do not exist until the flush, so callers get the unsaved instance;
+the timestamp is set when the row is built and records the event.
+AUDIT_LOG_ASYNC=0 writes each row inline, as before.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, close_old_connections, connections, models, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import BuildingLog
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def async_enabled() -> bool:
+    return getattr(settings, 'AUDIT_LOG_ASYNC', True)
+
+
+def batch_size() -> int:
+    return getattr(settings, 'AUDIT_LOG_BATCH_SIZE', 100)
+
+
+def flush_interval() -> float:
+    return getattr(settings, 'AUDIT_LOG_FLUSH_MS', 500) / 1000
+
+
+def queue_size() -> int:
+    return getattr(settings, 'AUDIT_LOG_QUEUE_SIZE', 10_000)
+
+
+def spool_path() -> Path:
+    return Path(getattr(settings, 'AUDIT_LOG_SPOOL', settings.BASE_DIR / 'var' / 'audit-log.jsonl'))
+
+
+class AuditLogWriter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spool_lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._unwritten = []  # taken off the queue, not yet inserted or spooled
+
+    # ── producer side ────────────────────────────────────────────────
+    def enqueue(self, entry) -> None:
+        if not async_enabled():
+            self.write([entry])
+            return
+        with self._lock:
+            # started lazily, and again in a forked worker (threads do not survive fork)
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                if self._pid != os.getpid():
+                    self._unwritten = []  # a forked worker's copy; the parent writes these
+                elif self._queue is not None:
+                    self._unwritten.extend(_drain(self._queue))  # the thread died; the new one takes over
+                self._queue = queue.Queue(maxsize=queue_size())
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, args=(self._queue,), name='audit-log-writer', daemon=True,
+                )
+                self._thread.start()
+            pending = self._queue
+        try:
+            pending.put_nowait(entry)
+        except queue.Full:
+            self.write([entry])  # back-pressure: this caller pays for its own insert
+
+    def flush(self, timeout: float = 10.0) -> None:
+        """Write everything queued and stop the thread; the next enqueue starts a new one."""
+        with self._lock:
+            thread, pending = self._thread, self._queue
+            self._thread = self._queue = None
+        if thread is None or self._pid != os.getpid():
+            return
+        pending.put(_STOP)
+        thread.join(timeout)
+        leftover = _drain(pending)
+        stopped = not thread.is_alive()  # otherwise it is still writing its batch
+        if stopped:
+            leftover, self._unwritten = self._unwritten + leftover, []
+        if leftover:
+            try:
+                self.write(leftover)
+            except Exception:
+                if stopped:
+                    self._unwritten = leftover  # the next thread retries them
+                raise
+
+    # ── consumer side ────────────────────────────────────────────────
+    def _run(self, pending) -> None:
+        try:
+            self._consume(pending)
+        finally:
+            connections.close_all()  # this thread's connections
+
+    def _consume(self, pending) -> None:
+        batch = self._unwritten  # rows left by a thread that died go first
+        while True:
+            stop = False
+            if not batch:
+                entry = pending.get()
+                if entry is _STOP:
+                    return
+                batch.append(entry)
+            deadline = time.monotonic() + flush_interval()
+            while len(batch) < batch_size():
+                try:
+                    entry = pending.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stop = True
+                    break
+                batch.append(entry)
+            try:
+                close_old_connections()  # this thread has no request cycle to recycle its connection
+                self.write(batch)
+            except Exception:
+                # not even spooled (disk full, say): kept, and retried with the next batch
+                logger.exception('audit log: could not write or spool %d rows, will retry', len(batch))
+            else:
+                batch.clear()
+            if stop:
+                return
+
+    def write(self, entries) -> int:
+        """Insert `entries` now; returns how many had to be spooled instead."""
+        spooled = 0
+        by_model = defaultdict(list)
+        for entry in entries:
+            by_model[type(entry)].append(entry)
+        for model, rows in by_model.items():
+            try:
+                with transaction.atomic():  # a savepoint when called inside a request's transaction
+                    model.objects.bulk_create(rows)
+                continue
+            except DatabaseError:
+                logger.warning('audit log: batch of %d %s rows failed, retrying one by one',
+                               len(rows), model.__name__, exc_info=True)
+            failed = []
+            for row in rows:
+                try:
+                    with transaction.atomic():
+                        model.objects.bulk_create([row])
+                except DatabaseError:
+                    failed.append(row)
+            if failed:
+                logger.error('audit log: %d %s rows spooled to %s', len(failed), model.__name__, spool_path())
+                self.spool(failed)
+                spooled += len(failed)
+        return spooled
+
+    # ── spool file ───────────────────────────────────────────────────
+    def spool(self, entries) -> None:
+        path = spool_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._spool_lock, path.open('a', encoding='utf-8') as fh:
+            for entry in entries:
+                fields = {f.attname: getattr(entry, f.attname) for f in entry._meta.concrete_fields
+                          if not f.primary_key}
+                fh.write(json.dumps({'model': entry._meta.label, 'fields': fields}, cls=DjangoJSONEncoder) + '\n')
+            fh.flush()
+            os.fsync(fh.fileno())
+
+
+def _drain(pending) -> list:
+    entries = []
+    while True:
+        try:
+            entry = pending.get_nowait()
+        except queue.Empty:
+            return entries
+        if entry is not _STOP:
+            entries.append(entry)
+
+
+def read_spool(path: Path) -> list:
+    entries = []
+    with path.open(encoding='utf-8') as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            model = apps.get_model(record['model'])
+            fields = record['fields']
+            for f in model._meta.concrete_fields:
+                if isinstance(f, models.DateTimeField) and isinstance(fields.get(f.attname), str):
+                    fields[f.attname] = parse_datetime(fields[f.attname])
+            entries.append(model(**fields))
+    return entries
+
+
+writer = AuditLogWriter()
+
+
+@atexit.register
+def _drain_at_exit():
+    try:
+        writer.flush(timeout=5.0)
+    except Exception:
+        logger.exception('audit log: could not drain the queue at exit')
+
+
+def _submit(entry):
+    transaction.on_commit(lambda: writer.enqueue(entry))
+    return entry
+
+
+def log_building(building_id, user, message: str) -> BuildingLog:
+    return _submit(BuildingLog(building_id=building_id, user=user, message=message, timestamp=timezone.now()))
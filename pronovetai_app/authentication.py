@@ -0,0 +1,82 @@
+"""
+JWT authentication that answers request.user from the access token's claims.
+
+LoginView puts is_staff, is_superuser, username, first_name and last_name
+into the token (on the refresh token, so access tokens from
+/api/token/refresh/ carry them too). Views that list
+StatelessJWTAuthentication get a TokenClaimsUser built from those claims and
+skip the pt_users lookup JWTAuthentication makes on every call. Code that
+needs the row itself, to store it in a foreign key say, calls
+full_user(request.user), which loads it once per request.
+
+Only safe methods (GET, HEAD, OPTIONS) are answered from the claims. Writes
+load the user as JWTAuthentication does, so a deactivated or demoted user
+loses them at once. Reads they keep until the token expires (SIMPLE_JWT
+ACCESS_TOKEN_LIFETIME, five minutes by default). Tokens without the claims,
+and every token while JWT_STATELESS_USER is off, go through the usual
+database lookup.
+"""
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+# written by LoginView, read by TokenClaimsUser
+USER_CLAIMS = ('is_staff', 'is_superuser', 'username', 'first_name', 'last_name')
+
+
+def add_user_claims(token, user) -> None:
+    token['is_staff'] = user.is_staff
+    token['is_superuser'] = user.is_superuser
+    token['username'] = user.username
+    token['user_login'] = user.username
+    token['first_name'] = user.first_name or ''
+    token['last_name'] = user.last_name or ''
+
+
+def stateless_enabled() -> bool:
+    return getattr(settings, 'JWT_STATELESS_USER', True)
+
+
+class TokenClaimsUser(TokenUser):
+    @cached_property
+    def first_name(self) -> str:
+        return self.token.get('first_name', '')
+
+    @cached_property
+    def last_name(self) -> str:
+        return self.token.get('last_name', '')
+
+    def get_full_name(self) -> str:
+        return f'{self.first_name} {self.last_name}'.strip()
+
+    def get_short_name(self) -> str:
+        return self.first_name
+
+    @cached_property
+    def user(self) -> User:
+        """The pt_users row, for code that needs a real User."""
+        return User.objects.get(pk=self.id)
+
+
+def full_user(user):
+    """request.user as a User instance, loading it if it came from token claims."""
+    return user.user if isinstance(user, TokenClaimsUser) else user
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    from_claims = False  # set per request; DRF makes one instance per request
+
+    def authenticate(self, request):
+        self.from_claims = stateless_enabled() and request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        claims = (api_settings.USER_ID_CLAIM, *USER_CLAIMS)
+        if not self.from_claims or any(claim not in validated_token for claim in claims):
+            return super().get_user(validated_token)
+        return TokenClaimsUser(validated_token)
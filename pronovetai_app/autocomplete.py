@@ -0,0 +1,148 @@
+"""
+In-process prefix index over Company.name for the company picker.
+
+Lookups are two bisects over sorted lists, so a keystroke never reaches
+MySQL. The index loads once per process, is patched in place by the
+post_save/post_delete receivers in signals.py, and reloads if another
+process bumped the shared version key in the cache.
+"""
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.core.cache import cache
+
+from .models import Company
+
+VERSION_KEY = 'autocomplete:company:version'
+
+
+def normalize(text: str) -> str:
+    """casefold, drop accents and punctuation, collapse whitespace."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = ''.join(ch if ch.isalnum() else ' ' for ch in text.casefold())
+    return ' '.join(text.split())
+
+
+class PrefixIndex:
+    """
+    Two sorted lists of (key, id):
+      • names – the whole normalized name, so "acme h" finds "Acme Holdings"
+      • words – each later word onward, so "acme" also finds "Pacific Acme"
+    Whole-name hits are returned before inner-word hits.
+    """
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+        self._lock = threading.RLock()
+        self._names = []
+        self._words = []
+        self._by_id = {}
+        self._version = None
+
+    # ── building ──────────────────────────────────────────────────────
+    def _keys(self, name):
+        norm = normalize(name)
+        words = norm.split(' ')
+        return norm, [' '.join(words[i:]) for i in range(1, len(words))]
+
+    def _insert(self, pk, name):
+        norm, tails = self._keys(name)
+        self._by_id[pk] = name
+        insort(self._names, (norm, pk))
+        for tail in tails:
+            insort(self._words, (tail, pk))
+
+    def _delete(self, pk):
+        name = self._by_id.pop(pk, None)
+        if name is None:
+            return
+        norm, tails = self._keys(name)
+        self._discard(self._names, (norm, pk))
+        for tail in tails:
+            self._discard(self._words, (tail, pk))
+
+    @staticmethod
+    def _discard(entries, entry):
+        i = bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del entries[i]
+
+    def rebuild(self):
+        # read before the rows: a change committed while they load moves the
+        # version past this one, so the next lookup reloads
+        version = cache.get_or_set(VERSION_KEY, 0, timeout=None)
+        rows = list(self.queryset.values_list('pk', 'name'))
+        names, words, by_id = [], [], {}
+        for pk, name in rows:
+            norm, tails = self._keys(name)
+            by_id[pk] = name
+            names.append((norm, pk))
+            words.extend((tail, pk) for tail in tails)
+        names.sort()
+        words.sort()
+        with self._lock:
+            self._names, self._words, self._by_id = names, words, by_id
+            self._version = version
+
+    def _ensure_current(self):
+        if self._version is None or cache.get(VERSION_KEY) != self._version:
+            self.rebuild()
+
+    # ── incremental updates (signals) ────────────────────────────────
+    def _bump(self):
+        # every write moves the shared version, so processes that have the
+        # index loaded reload it, whether or not this one has
+        loaded = self._version is not None
+        # if another process changed companies since our last load we are
+        # missing its edits too, so stay stale and reload on next lookup
+        in_sync = loaded and cache.get(VERSION_KEY) == self._version
+        try:
+            version = cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.set(VERSION_KEY, 0, timeout=None)
+            version = 0
+        if loaded:
+            self._version = version if in_sync else -1
+
+    def upsert(self, pk, name):
+        with self._lock:
+            if self._version is not None:  # not loaded here yet: the first lookup loads it
+                self._delete(pk)
+                self._insert(pk, name)
+            self._bump()
+
+    def remove(self, pk):
+        with self._lock:
+            if self._version is not None:
+                self._delete(pk)
+            self._bump()
+
+    # ── lookups ──────────────────────────────────────────────────────
+    @staticmethod
+    def _scan(entries, prefix, limit, seen):
+        i = bisect_left(entries, (prefix,))
+        hits = []
+        while i < len(entries) and len(hits) < limit and entries[i][0].startswith(prefix):
+            pk = entries[i][1]
+            if pk not in seen:
+                seen.add(pk)
+                hits.append(pk)
+            i += 1
+        return hits
+
+    def lookup(self, text: str, limit: int = 10) -> list[dict]:
+        prefix = normalize(text)
+        if not prefix:
+            return []
+        self._ensure_current()
+        with self._lock:
+            seen = set()
+            ids = self._scan(self._names, prefix, limit, seen)
+            if len(ids) < limit:
+                ids += self._scan(self._words, prefix, limit - len(ids), seen)
+            return [{'id': pk, 'name': self._by_id[pk]} for pk in ids]
+
+
+companies = PrefixIndex(Company.objects.all())
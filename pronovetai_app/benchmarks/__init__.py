@@ -0,0 +1,18 @@
+"""
+API load benchmark.
+
+    DB_ENGINE=sqlite python manage.py benchmark_api --scale medium
+    python manage.py benchmark_api --scale large --output bench/$(git rev-parse --short HEAD).json
+
+`benchmark_api` builds a throwaway test database from the configured
+DATABASES entry (in-memory for SQLite; `test_<name>` on a MySQL server, so a
+local container works the same way), fills it with a seeded synthetic
+portfolio (portfolio.py) and replays the scenarios in runner.py through
+django.test.Client against the real core.settings, middleware stack and URL
+conf. Results are JSON with sorted keys, one object per scenario, so two runs
+can be compared with any JSON diff.
+
+Requests are issued in-process and one at a time: latency covers routing,
+auth, views, serializers and SQL, not the network or a WSGI server, and
+throughput is sequential requests per second.
+"""
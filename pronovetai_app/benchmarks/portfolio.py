@@ -0,0 +1,156 @@
+"""
+Seeded synthetic portfolio for the API benchmark.
+
+Everything goes in with bulk_create, so signals do not run; the numeric
+shadow tables and dashboard counters are filled afterwards the same way
+after an import. Varchar columns get legacy-shaped values ("1,250.50",
+"PHP 850") so the field cleaners do real work.
+"""
+import random
+from collections import namedtuple
+from datetime import timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.utils import timezone
+
+from pronovetai_app import counters, numbers
+from pronovetai_app.models import (
+    Building, BuildingGrade, BuildingType, Company, Contact, ODForm, Unit, User, UserType,
+)
+
+Scale = namedtuple('Scale', 'buildings units_per_building contacts odforms')
+
+SCALES = {
+    'tiny': Scale(buildings=10, units_per_building=5, contacts=40, odforms=20),
+    'small': Scale(buildings=200, units_per_building=10, contacts=2_000, odforms=1_000),
+    'medium': Scale(buildings=1_000, units_per_building=40, contacts=20_000, odforms=10_000),
+    'large': Scale(buildings=5_000, units_per_building=60, contacts=300_000, odforms=200_000),
+}
+
+ADMIN_USERNAME = 'bench-admin'
+ADMIN_PASSWORD = 'bench-pass-1234'
+
+CITIES = {
+    'Makati': ['Bel-Air', 'San Lorenzo', 'Urdaneta', 'Poblacion'],
+    'Taguig': ['Fort Bonifacio', 'Ususan', 'Western Bicutan'],
+    'Pasig': ['San Antonio', 'Ugong', 'Kapitolyo'],
+    'Quezon City': ['Diliman', 'Bagumbayan', 'Eastwood'],
+    'Mandaluyong': ['Wack-Wack', 'Highway Hills'],
+}
+GRADES = [('PRIME', 'Premium'), ('A', 'Grade A'), ('B', 'Grade B'), ('C', 'Grade C')]
+TYPES = [('OFC', 'Office'), ('MXD', 'Mixed Use'), ('IND', 'Industrial')]
+VACANCY = ['Vacant', 'Vacant', 'Available', 'Occupied', 'Occupied', 'Leased']
+INDUSTRIES = ['Banking', 'BPO', 'Retail', 'Logistics', 'Pharma', 'Government', 'Tech']
+FIRST_NAMES = ['Ana', 'Ben', 'Carla', 'Dante', 'Ella', 'Franco', 'Gina', 'Hector', 'Ivy', 'Jose']
+LAST_NAMES = ['Cruz', 'Reyes', 'Santos', 'Garcia', 'Mendoza', 'Torres', 'Flores', 'Ramos']
+
+BATCH_SIZE = 2000
+
+
+def _insert(model, objects, batch_size=BATCH_SIZE) -> int:
+    objects, written = iter(objects), 0
+    while batch := list(islice(objects, batch_size)):
+        model.objects.bulk_create(batch)
+        written += len(batch)
+    return written
+
+
+def _money(rng, low, high):
+    value = rng.uniform(low, high)
+    return rng.choice([f'{value:.0f}', f'{value:,.2f}', f'PHP {value:,.0f}', f'{value:.2f}/sqm'])
+
+
+def _buildings(rng, scale):
+    for i in range(scale.buildings):
+        city = rng.choice(list(CITIES))
+        yield Building(
+            name=f'{rng.choice(["One", "Tower", "Plaza", "Centre"])} {city} {i}',
+            marketing_status=rng.choice(['active', 'active', 'inactive']),
+            grade=rng.choice(GRADES)[0], building_type=rng.choice(TYPES)[0],
+            address_street=f'{rng.randint(1, 999)} Ayala Ave', address_city=city,
+            address_brgy=rng.choice(CITIES[city]), address_zip=str(rng.randint(1000, 1999)),
+            office_rent=_money(rng, 400, 2000), sale_price_php=_money(rng, 80_000, 250_000),
+            lot_area=f'{rng.randint(800, 20_000):,}', year_built=str(rng.randint(1975, 2024)),
+        )
+
+
+def _units(rng, scale, building_ids, today):
+    for building_id in building_ids:
+        for n in range(scale.units_per_building):
+            floor = n // 4 + 1
+            gfa = Decimal(rng.randint(4_000, 250_000)) / 100
+            start = today - timedelta(days=rng.randint(0, 5 * 365))
+            yield Unit(
+                name=f'{floor}F-{n % 4 + 1:02d}', building_id=building_id, floor=str(floor),
+                vacancy_status=rng.choice(VACANCY), marketing_status='active',
+                gross_floor_area=gfa, net_floor_area=(gfa * Decimal('0.85')).quantize(Decimal('0.01')),
+                asking_rent=_money(rng, 400, 2000), sale_price_office=_money(rng, 80_000, 250_000),
+                lease_commencement_date=start,
+                lease_expiry_date=start + timedelta(days=rng.choice([365, 730, 1095, 1825])),
+            )
+
+
+def _contacts(rng, scale, company_ids):
+    for i in range(scale.contacts):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield Contact(
+            company_id=rng.choice(company_ids), first_name=first, last_name=last,
+            files_as=f'{last}, {first}', position=rng.choice(['Admin', 'CFO', 'Facilities', 'HR']),
+            email=f'{first}.{last}.{i}@example.com'.lower(), mobile_number=f'0917{i:07d}',
+        )
+
+
+def _odforms(rng, scale, contact_ids, user, now):
+    for _ in range(scale.odforms):
+        low = rng.choice([None, 50, 100, 200, 500, 1000])
+        yield ODForm(
+            created=now, contact_id=rng.choice(contact_ids), type_of_call='inbound',
+            source_of_call=rng.choice(ODForm.SOURCE_OF_CALL_CHOICES)[0],
+            type_of_caller=rng.choice(ODForm.TYPE_OF_CALLER_CHOICES)[0],
+            intent=rng.choice(ODForm.INTENT_CHOICES)[0], purpose=rng.choice(ODForm.PURPOSE_CHOICES)[0],
+            size_minimum=low, size_maximum=low * rng.choice([2, 3]) if low else None,
+            budget_maximum=rng.choice([None, 250_000, 500_000, 1_000_000, 5_000_000]),
+            preferred_location=rng.choice(list(CITIES)),
+            status=rng.choice(['active', 'active', 'active', 'inactive', 'done_deal']),
+            account_manager=user, created_by=user, edited_by=user,
+        )
+
+
+def generate(scale: Scale, seed: int = 0) -> dict:
+    """Fill an empty database with `scale` worth of rows; returns row counts per table."""
+    rng = random.Random(seed)
+    now = timezone.now()
+    today = timezone.localdate()
+
+    user_type = UserType.objects.create(description='Administrator', created_at=now)
+    admin = User.objects.create_superuser(ADMIN_USERNAME, ADMIN_PASSWORD, user_type=user_type)
+    BuildingGrade.objects.bulk_create([BuildingGrade(code=c, description=d) for c, d in GRADES])
+    BuildingType.objects.bulk_create([BuildingType(code=c, description=d) for c, d in TYPES])
+
+    # bulk_create does not return pks on MySQL, so ids are read back
+    written = {'buildings': _insert(Building, _buildings(rng, scale))}
+    building_ids = list(Building.objects.order_by('pk').values_list('pk', flat=True))
+    written['units'] = _insert(Unit, _units(rng, scale, building_ids, today))
+
+    written['companies'] = _insert(Company, (
+        Company(name=f'Company {i}', industry=rng.choice(INDUSTRIES), address_city=rng.choice(list(CITIES)))
+        for i in range(max(scale.contacts // 10, 1))
+    ))
+    company_ids = list(Company.objects.order_by('pk').values_list('pk', flat=True))
+    written['contacts'] = _insert(Contact, _contacts(rng, scale, company_ids))
+    contact_ids = list(Contact.objects.order_by('pk').values_list('pk', flat=True))
+
+    through = Unit.contacts.through
+    unit_ids = list(Unit.objects.order_by('pk').values_list('pk', flat=True))
+    written['unit_contacts'] = _insert(through, (
+        through(unit_id=unit_id, contact_id=contact_id)
+        for unit_id in unit_ids
+        for contact_id in sorted({rng.choice(contact_ids) for _ in range(rng.randint(0, 2))})
+    ))
+    written['odforms'] = _insert(ODForm, _odforms(rng, scale, contact_ids, admin, now))
+
+    for model in numbers.SHADOWS:
+        numbers.refresh_missing(model)
+    counters.reconcile()
+    return written
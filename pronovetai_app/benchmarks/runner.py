@@ -0,0 +1,163 @@
+"""
+Benchmark scenarios and their statistics.
+
+Each scenario builds one request from a seeded RNG and the ids in the
+portfolio, so a run with the same seed, scale and commit replays the same
+request sequence. The client authenticates the way the frontend does: a
+JWT from /api/login/ sent as a Bearer header.
+"""
+import json
+import math
+import random
+import time
+from collections import Counter
+
+from django.test import Client
+from django.utils import timezone
+
+from pronovetai_app.models import Building, Contact, ODForm, Unit
+
+from .portfolio import ADMIN_PASSWORD, ADMIN_USERNAME, CITIES
+
+PAGE_SIZE = 25
+
+
+def _page(rng, total):
+    return rng.randint(1, max(min(total // PAGE_SIZE, 200), 1))
+
+
+def _unit_payload(rng, ids):
+    area = rng.randint(50, 2000)
+    return {
+        'name': f'Bench {rng.randint(1, 10**6)}', 'building': rng.choice(ids['buildings']),
+        'floor': str(rng.randint(1, 40)), 'contact': 'Leasing desk', 'marketing_status': 'active',
+        'vacancy_status': 'Vacant', 'foreclosed': 'No', 'ceiling_condition': 'Bare',
+        'floor_condition': 'Bare', 'partition_condition': 'None', 'gross_floor_area': str(area),
+        'net_floor_area': str(area * 85 // 100), 'asking_rent': str(rng.randint(400, 2000)),
+        'price_per_parking_slot': '5,000', 'minimum_period': '3 years', 'escalation_rate': '5%',
+        'rent_free': '2 months', 'sale_price_office': str(rng.randint(80_000, 250_000)),
+        'sale_price_parking': '1,000,000',
+    }
+
+
+def _odform_payload(rng, ids):
+    low = rng.choice([50, 100, 200, 500])
+    return {
+        'created': timezone.now().isoformat(), 'contact': rng.choice(ids['contacts']),
+        'type_of_call': 'inbound', 'source_of_call': 'website', 'type_of_caller': 'direct',
+        'intent': rng.choice(['rent', 'buy', 'both']), 'purpose': 'new_office',
+        'size_minimum': low, 'size_maximum': low * 2, 'budget_maximum': rng.choice([500_000, 1_000_000]),
+        'preferred_location': rng.choice(list(CITIES)), 'status': 'active',
+    }
+
+
+# name -> build(rng, ids) returning (method, path, query params or JSON body)
+SCENARIOS = {
+    'building-list': lambda rng, ids: (
+        'GET', '/api/buildings/', {'page': _page(rng, len(ids['buildings'])), 'page_size': PAGE_SIZE}),
+    'building-detail': lambda rng, ids: ('GET', f'/api/buildings/{rng.choice(ids["buildings"])}/', {}),
+    'unit-list': lambda rng, ids: (
+        'GET', '/api/units/', {'page': _page(rng, len(ids['units'])), 'page_size': PAGE_SIZE}),
+    'unit-detail': lambda rng, ids: ('GET', f'/api/units/{rng.choice(ids["units"])}/', {}),
+    'unit-create': lambda rng, ids: ('POST', '/api/units/', _unit_payload(rng, ids)),
+    'contact-list': lambda rng, ids: (
+        'GET', '/api/contacts/', {'page': _page(rng, len(ids['contacts'])), 'page_size': PAGE_SIZE}),
+    'contact-detail': lambda rng, ids: ('GET', f'/api/contacts/{rng.choice(ids["contacts"])}/', {}),
+    'odform-list': lambda rng, ids: (
+        'GET', '/api/odforms/', {'page': _page(rng, len(ids['odforms'])), 'page_size': PAGE_SIZE}),
+    'odform-detail': lambda rng, ids: ('GET', f'/api/odforms/{rng.choice(ids["odforms"])}/', {}),
+    'odform-create': lambda rng, ids: ('POST', '/api/odforms/', _odform_payload(rng, ids)),
+    'dashboard': lambda rng, ids: ('GET', '/api/dashboard/', {}),
+    'expiring-contacts-page': lambda rng, ids: (
+        'GET', '/api/contacts/expiring', {'days': 183, 'page': 1, 'page_size': PAGE_SIZE}),
+    'expiring-contacts-stream': lambda rng, ids: ('GET', '/api/contacts/expiring', {'days': 30}),
+}
+
+
+def portfolio_ids() -> dict:
+    return {
+        name: list(model.objects.order_by('pk').values_list('pk', flat=True))
+        for name, model in (('buildings', Building), ('units', Unit), ('contacts', Contact), ('odforms', ODForm))
+    }
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct * len(sorted_values) / 100), 1)
+    return sorted_values[rank - 1]
+
+
+def login(client) -> str:
+    response = client.post('/api/login/', {'username': ADMIN_USERNAME, 'password': ADMIN_PASSWORD},
+                           content_type='application/json')
+    if response.status_code != 200:
+        raise RuntimeError(f'benchmark login failed: {response.status_code} {response.content[:200]!r}')
+    return response.json()['access']
+
+
+def _send(client, token, method, path, data):
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+    started = time.perf_counter()
+    if method == 'GET':
+        response = client.get(path, data, **headers)
+    else:
+        response = client.generic(method, path, json.dumps(data), content_type='application/json', **headers)
+    if response.streaming:
+        b''.join(response.streaming_content)  # the test client closes it, which records the metrics
+    elapsed = time.perf_counter() - started
+
+    # what Server-Timing reports, and streaming responses (which go without it) too
+    metrics = getattr(response.wsgi_request, 'metrics', None)
+    return response.status_code, elapsed, metrics.queries if metrics else None
+
+
+def run_scenario(client, token, build, ids, requests, warmup=0, seed=0) -> dict:
+    rng = random.Random(seed)
+    for _ in range(warmup):
+        _send(client, token, *build(rng, ids))
+
+    latencies, queries, statuses = [], [], Counter()
+    started = time.perf_counter()
+    for _ in range(requests):
+        status, elapsed, query_count = _send(client, token, *build(rng, ids))
+        latencies.append(elapsed * 1000)
+        statuses[str(status)] += 1
+        if query_count is not None:
+            queries.append(query_count)
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        'errors': sum(n for status, n in statuses.items() if int(status) >= 400),
+        'status': dict(statuses),
+        'throughput_rps': round(requests / wall, 2) if wall else None,
+        'latency_ms': {
+            'min': round(latencies[0], 2),
+            'mean': round(sum(latencies) / len(latencies), 2),
+            'p50': round(percentile(latencies, 50), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'max': round(latencies[-1], 2),
+        },
+        'queries': {
+            'mean': round(sum(queries) / len(queries), 2) if queries else None,
+            'max': max(queries) if queries else None,
+        },
+    }
+
+
+def run(names, requests, warmup=0, seed=0, on_result=None) -> dict:
+    """Run the named scenarios in order against the current database; returns {name: stats}."""
+    client = Client()
+    token = login(client)
+    ids = portfolio_ids()
+    results = {}
+    for name in names:
+        # every scenario gets its own stream so adding one does not reshuffle the others
+        results[name] = run_scenario(client, token, SCENARIOS[name], ids, requests, warmup, seed=f'{seed}:{name}')
+        if on_result:
+            on_result(name, results[name])
+    return results
@@ -0,0 +1,64 @@
+"""
+Cache-aside helpers over Django's cache (CACHES in core/settings.py).
+
+Entries are filed under namespaces: 'inventory' (buildings and units) and
+'odforms'. Each namespace has a version number in the cache, part of every
+key built from it; signals.py bumps it after a committed write (imports.py
+after a batch), which orphans every entry computed from the old rows without
+anything having to know which keys exist. Orphans age out with their
+timeout.
+
+    data = caching.get_or_compute(('inventory',), ('expiry-calendar', bucket, months), build)
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+_MISSING = object()
+
+
+def default_timeout() -> int:
+    return getattr(settings, 'CACHE_ASIDE_TIMEOUT', 300)
+
+
+def _version_key(namespace: str) -> str:
+    return f'aside:{namespace}:version'
+
+
+def versions(namespaces) -> dict[str, int]:
+    """Current version of each namespace, in one cache round trip."""
+    keys = {_version_key(ns): ns for ns in namespaces}
+    found = cache.get_many(list(keys))
+    for key, ns in keys.items():
+        if key not in found:
+            cache.add(key, 0, timeout=None)
+            found[key] = cache.get(key, 0)
+    return {ns: found[key] for key, ns in keys.items()}
+
+
+def bump(namespace: str) -> None:
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        cache.set(_version_key(namespace), 1, timeout=None)
+
+
+def make_key(namespaces, parts) -> str:
+    tag = '+'.join(f'{ns}.{v}' for ns, v in sorted(versions(namespaces).items()))
+    digest = hashlib.blake2b(repr(tuple(parts)).encode(), digest_size=16).hexdigest()
+    return f'aside:{tag}:{digest}'
+
+
+def get_or_compute(namespaces, parts, compute, timeout=None):
+    """
+    Return the cached value for `parts` under the current `namespaces`
+    versions, or call compute(), store and return its result. None is cached
+    like any other value.
+    """
+    key = make_key(namespaces, parts)
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        cache.set(key, value, timeout=default_timeout() if timeout is None else timeout)
+    return value
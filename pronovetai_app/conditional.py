@@ -0,0 +1,73 @@
+"""
+Per-object HTTP validators for detail endpoints.
+
+The tag is a digest of the row as loaded by get_object(): every concrete
+column plus the annotated/related values the serializer reads
+(`etag_fields`). pt_buildings and pt_units carry no edited timestamp or
+version column, and the legacy app and bulk imports write to them without
+going through Django, so hashing what was actually read is the only tag that
+cannot go stale. It costs a hash over one row, well under serializing it.
+
+GET answers If-None-Match / If-Modified-Since with 304 before the serializer
+runs. PUT/PATCH honour If-Match / If-Unmodified-Since and fail with 412 when
+the row changed since the client read it; requests without the headers are
+not affected.
+"""
+import hashlib
+from operator import attrgetter
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'This record was changed by someone else. Reload it and try again.'
+    default_code = 'precondition_failed'
+
+
+def object_etag(instance, extra_fields=()) -> str:
+    values = [getattr(instance, f.attname) for f in instance._meta.concrete_fields]
+    values.extend(attrgetter(name)(instance) for name in extra_fields)
+    return hashlib.blake2b(repr(values).encode(), digest_size=12).hexdigest()
+
+
+class ConditionalObjectMixin:
+    """For ModelViewSets: ETag/Last-Modified on retrieve, optimistic concurrency on update."""
+
+    etag_fields = ()  # dotted attributes beyond the row's own columns
+    last_modified_field = None
+
+    def get_etag(self, instance) -> str:
+        return quote_etag(object_etag(instance, self.etag_fields))
+
+    def get_last_modified(self, instance):
+        value = getattr(instance, self.last_modified_field) if self.last_modified_field else None
+        return int(value.timestamp()) if value else None
+
+    def _validators(self, instance):
+        return self.get_etag(instance), self.get_last_modified(instance)
+
+    def get_object(self):
+        instance = super().get_object()
+        if self.request.method in ('PUT', 'PATCH'):
+            etag, last_modified = self._validators(instance)
+            if get_conditional_response(self.request, etag=etag, last_modified=last_modified) is not None:
+                raise PreconditionFailed()
+        return instance
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = self._validators(instance)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # browsers keep the body and revalidate on every open of the edit modal
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,81 @@
+"""
+Dashboard totals kept in the cache instead of six COUNT(*)s per request.
+
+post_save/post_delete nudge the cached numbers up or down; anything that
+bypasses signals (bulk_create, queryset.update, raw SQL) is corrected by a
+full reconciliation, which runs when the snapshot is older than
+DASHBOARD_COUNTERS_MAX_AGE seconds or via `manage.py reconcile_counters`.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Building, Unit, Company, Contact, ODForm, User
+
+# response key -> model; keys match what dashboard.js reads
+COUNTED_MODELS = {
+    'buildings': Building,
+    'units': Unit,
+    'companies': Company,
+    'contact': Contact,
+    'odforms': ODForm,
+    'users': User,
+}
+
+KEY_PREFIX = 'dashboard:counters'
+RECONCILED_KEY = f'{KEY_PREFIX}:reconciled'
+MODIFIED_KEY = f'{KEY_PREFIX}:modified'
+
+
+def max_age() -> int:
+    return getattr(settings, 'DASHBOARD_COUNTERS_MAX_AGE', 300)
+
+
+def _count_key(name: str) -> str:
+    return f'{KEY_PREFIX}:{name}'
+
+
+def reconcile() -> 'Snapshot':
+    """Recount every table and overwrite the cached totals."""
+    now = time.time()
+    values = {name: model.objects.count() for name, model in COUNTED_MODELS.items()}
+    cache.set_many({_count_key(name): n for name, n in values.items()}, timeout=None)
+    cache.set_many({RECONCILED_KEY: now, MODIFIED_KEY: now}, timeout=None)
+    return Snapshot(values, now, now)
+
+
+def adjust(model, delta: int) -> None:
+    """Apply a +1/-1 from a signal. A missing key is left for the next reconcile."""
+    for name, counted in COUNTED_MODELS.items():
+        if counted is model:
+            try:
+                cache.incr(_count_key(name), delta)
+            except ValueError:
+                return
+            cache.set(MODIFIED_KEY, time.time(), timeout=None)
+            return
+
+
+class Snapshot:
+    def __init__(self, values: dict, reconciled_at: float, modified_at: float):
+        self.values = values
+        self.reconciled_at = reconciled_at
+        self.modified_at = modified_at
+
+    @property
+    def etag(self) -> str:
+        raw = ','.join(f'{k}={self.values[k]}' for k in sorted(self.values))
+        return hashlib.md5(raw.encode()).hexdigest()
+
+
+def snapshot() -> Snapshot:
+    keys = [_count_key(name) for name in COUNTED_MODELS] + [RECONCILED_KEY, MODIFIED_KEY]
+    cached = cache.get_many(keys)
+
+    if len(cached) < len(keys) or time.time() - cached[RECONCILED_KEY] > max_age():
+        return reconcile()
+
+    values = {name: cached[_count_key(name)] for name in COUNTED_MODELS}
+    return Snapshot(values, cached[RECONCILED_KEY], cached[MODIFIED_KEY])
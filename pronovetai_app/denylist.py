@@ -0,0 +1,157 @@
+"""
+Process-local copy of simplejwt's token blacklist, so /api/token/refresh/
+answers "is this refresh token blacklisted?" without querying
+token_blacklist_blacklistedtoken ⋈ token_blacklist_outstandingtoken.
+
+The unexpired blacklisted jtis are loaded into a bloom filter, about 1.2
+bytes per token at 1% false positives, so millions of entries cost a few MB
+per worker. Entries blacklisted since the load go into an exact set. A jti
+in neither is let through without a query; one in the exact set is refused;
+a bloom hit is confirmed against the database (the blacklisted tokens
+themselves, plus one clean token in a hundred).
+
+The filter is rebuilt every TOKEN_DENYLIST_REBUILD seconds, which drops the
+jtis that expired since. In between, new entries are read incrementally by
+blacklisted_at: at once when the version key in the shared cache moves
+(signals.py bumps it after a blacklist commit), and at least every
+TOKEN_DENYLIST_MAX_AGE seconds for rows written outside Django.
+With the per-process locmem cache tier that max age is also how long other
+workers keep accepting a token blacklisted elsewhere.
+"""
+import hashlib
+import math
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import serializers, tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+VERSION_KEY = 'denylist:version'
+# rows are re-read this far back on each sync, for transactions that
+# committed after a later one
+SYNC_OVERLAP = timedelta(seconds=60)
+# exact-set size that triggers a rebuild before TOKEN_DENYLIST_REBUILD
+MAX_RECENT = 50_000
+
+
+def rebuild_interval() -> int:
+    return getattr(settings, 'TOKEN_DENYLIST_REBUILD', 3600)
+
+
+def max_age() -> int:
+    return getattr(settings, 'TOKEN_DENYLIST_MAX_AGE', 30)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1024)
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for p in self._positions(item):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+
+State = namedtuple('State', 'bloom recent version synced_from')
+
+
+class Denylist:
+    def __init__(self):
+        self._state = None  # swapped as a whole
+        self._rebuild_at = 0.0
+        self._sync_at = 0.0
+
+    @staticmethod
+    def _rows(since=None):
+        rows = BlacklistedToken.objects.filter(token__expires_at__gt=aware_utcnow())
+        if since is not None:
+            rows = rows.filter(blacklisted_at__gte=since)
+        return rows.values_list('token__jti', flat=True)
+
+    def rebuild(self) -> State:
+        started = aware_utcnow()
+        version = cache.get_or_set(VERSION_KEY, 0, timeout=None)
+        jtis = list(self._rows().iterator(chunk_size=10_000))
+        bloom = BloomFilter(len(jtis) * 2)  # room to grow until the next rebuild
+        for jti in jtis:
+            bloom.add(jti)
+        self._state = State(bloom, frozenset(), version, started - SYNC_OVERLAP)
+        now = time.monotonic()
+        self._rebuild_at = now + rebuild_interval()
+        self._sync_at = now + max_age()
+        return self._state
+
+    def sync(self, state: State, version) -> State:
+        started = aware_utcnow()
+        recent = state.recent | frozenset(self._rows(since=state.synced_from))
+        self._state = State(state.bloom, recent, version, started - SYNC_OVERLAP)
+        self._sync_at = time.monotonic() + max_age()
+        return self._state
+
+    def _current(self) -> State:
+        state = self._state
+        now = time.monotonic()
+        if state is None or now >= self._rebuild_at or len(state.recent) > MAX_RECENT:
+            return self.rebuild()
+        version = cache.get(VERSION_KEY)
+        if version != state.version or now >= self._sync_at:
+            return self.sync(state, version)
+        return state
+
+    def add(self, jti: str) -> None:
+        """A token this process just blacklisted (after commit)."""
+        state = self._state
+        if state is not None:
+            self._state = state._replace(recent=state.recent | {jti})
+
+    def discard(self) -> None:
+        """Forget this process's copy; the next check rebuilds."""
+        self._state = None
+
+    def invalidate(self) -> None:
+        """After a committed blacklist write: make every process sync."""
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.set(VERSION_KEY, 0, timeout=None)
+
+    def is_blacklisted(self, jti: str) -> bool:
+        state = self._current()
+        if jti in state.recent:
+            return True
+        if jti not in state.bloom:
+            return False
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+denylist = Denylist()
+
+
+class RefreshToken(tokens.RefreshToken):
+    def check_blacklist(self) -> None:
+        if denylist.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+
+class TokenRefreshSerializer(serializers.TokenRefreshSerializer):
+    """SIMPLE_JWT['TOKEN_REFRESH_SERIALIZER']: /api/token/refresh/ through the denylist."""
+
+    token_class = RefreshToken
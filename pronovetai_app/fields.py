@@ -1,21 +1,51 @@
 # pronovetai_app/fields.py
+import re
 from decimal import Decimal, InvalidOperation
+from functools import lru_cache
 from django.db import models
 
+# first number in the string: optional sign, thousands commas, fraction, exponent
+# ("PHP 1,200.50 / sqm" -> 1,200.50; "3-5" -> 3)
+_INT_RE = re.compile(r"[-+]?\d+(?:,\d{3})*(?![\d,])|[-+]?\d+")
+_DEC_RE = re.compile(r"[-+]?(?:\d+(?:,\d{3})*(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?")
+
+# legacy columns hold a small vocabulary of repeated strings, so most
+# conversions are cache hits
+CLEAN_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=CLEAN_CACHE_SIZE)
+def parse_legacy_int(text):
+    match = _INT_RE.search(text)
+    return int(match.group().replace(",", "")) if match else None
+
+
+@lru_cache(maxsize=CLEAN_CACHE_SIZE)
+def parse_legacy_decimal(text):
+    match = _DEC_RE.search(text)
+    if not match:
+        return None
+    try:
+        value = Decimal(match.group().replace(",", ""))
+    except InvalidOperation:
+        return None
+    return value if value.is_finite() else None
+
 
 class BlankZeroIntegerField(models.IntegerField):
     """
     IntegerField tolerant of legacy data:
       • ''  → None
       • '0' → None   (if you keep that rule)
-      • any non-numeric junk like '1 basement' → None
+      • any text → first whole number in it ('1,200 sqm' → 1200, '3-5' → 3),
+        or None when there is none
     """
     description = "IntegerField that tolerates messy MySQL strings"
 
     def _clean_int(self, value):
-        # keep only leading digits, drop the rest
-        digits = "".join(ch for ch in str(value).lstrip() if ch.isdigit() or ch in "+-")
-        return int(digits) if digits else None
+        if isinstance(value, int):
+            return value
+        return parse_legacy_int(str(value))
 
     def from_db_value(self, value, expression, connection):
         if value in ("", None, "0"):
@@ -36,17 +66,18 @@ class BlankZeroIntegerField(models.IntegerField):
 
 class BlankZeroDecimalField(models.DecimalField):
     """
-    DecimalField tolerant of legacy '' / weird text.
+    DecimalField tolerant of legacy '' / weird text: keeps the first number
+    in the string ('1,200.50 sqm' → 1200.50, '3-5' → 3).
     """
     description = "DecimalField that tolerates messy MySQL strings"
 
     def _clean_dec(self, value):
-        # strip spaces; keep only first numeric part
-        txt = str(value).strip()
-        # allow leading sign and dot
-        allowed = set("0123456789+-eE.")
-        cleaned = "".join(ch for ch in txt if ch in allowed)
-        return Decimal(cleaned) if cleaned else None
+        if isinstance(value, Decimal):
+            return value
+        if isinstance(value, float):
+            # str() keeps the short repr ("0.1", not "0.1000000000000000055...")
+            return parse_legacy_decimal(str(value))
+        return parse_legacy_decimal(str(value).strip())
 
     def from_db_value(self, value, expression, connection):
         if value in ("", None):
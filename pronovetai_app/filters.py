@@ -0,0 +1,127 @@
+import re
+from decimal import Decimal, InvalidOperation
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import CharField
+from rest_framework.filters import BaseFilterBackend, OrderingFilter, SearchFilter, search_smart_split
+
+from . import search
+
+_COLUMN_DATA_RE = re.compile(r"^columns\[(\d+)\]\[data\]$")
+_ORDER_COLUMN_RE = re.compile(r"^order\[(\d+)\]\[column\]$")
+
+
+def is_datatables_request(request) -> bool:
+    """DataTables server-side mode always sends a `draw` counter."""
+    return "draw" in request.query_params
+
+
+def datatables_search_value(request) -> str:
+    return request.query_params.get("search[value]", "")
+
+
+def _datatables_columns(request) -> dict[int, str]:
+    columns = {}
+    for key, value in request.query_params.items():
+        m = _COLUMN_DATA_RE.match(key)
+        if m and value:
+            columns[int(m.group(1))] = value
+    return columns
+
+
+def _datatables_order(request) -> list[tuple[int, str]]:
+    """[(column index, 'asc'|'desc'), ...] in the order the client sent them."""
+    order = []
+    for key, value in request.query_params.items():
+        m = _ORDER_COLUMN_RE.match(key)
+        if not m or not value.isdigit():
+            continue
+        direction = request.query_params.get(f"order[{m.group(1)}][dir]", "asc")
+        order.append((int(m.group(1)), int(value), direction))
+    return [(col, direction) for _, col, direction in sorted(order)]
+
+
+class DataTablesSearchFilter(SearchFilter):
+    """
+    `?search=` for plain clients, `search[value]` for DataTables.
+    Views opt in by declaring `search_fields`; views that also set
+    `fulltext_search = True` use the model's FULLTEXT index when possible.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if getattr(view, 'fulltext_search', False):
+            terms = search.tokenize(' '.join(self.get_search_terms(request)))
+            if search.fulltext_available(queryset, terms):
+                return search.match(queryset, terms)
+        return super().filter_queryset(request, queryset, view)
+
+    def get_search_terms(self, request):
+        if self.search_param in request.query_params or not is_datatables_request(request):
+            return super().get_search_terms(request)
+        field = CharField(trim_whitespace=False, allow_blank=True)
+        return search_smart_split(field.run_validation(datatables_search_value(request)))
+
+
+class DataTablesOrderingFilter(OrderingFilter):
+    """
+    `?ordering=name,-id` for plain clients; `order[i][column]` + `columns[i][data]`
+    for DataTables. Column keys are serializer field names and are translated to
+    ORM lookups through the field `source` (e.g. company_name → company__name),
+    or through `view.ordering_aliases` for computed fields.
+
+    A trailing `pk` is always added so page boundaries are stable.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        if is_datatables_request(request) and self.ordering_param not in request.query_params:
+            fields = self._datatables_fields(request, view)
+            ordering = self.remove_invalid_fields(queryset, fields, view, request)
+            if not ordering:
+                ordering = list(self.get_default_ordering(view) or [])
+        else:
+            ordering = list(super().get_ordering(request, queryset, view) or [])
+
+        if ordering and not any(term.lstrip("-") in ("pk", "id") for term in ordering):
+            ordering.append("pk")
+        return ordering
+
+    def _datatables_fields(self, request, view):
+        columns = _datatables_columns(request)
+        aliases = getattr(view, "ordering_aliases", {})
+        serializer = view.get_serializer_class()(context={"request": request})
+
+        fields = []
+        for index, direction in _datatables_order(request):
+            name = columns.get(index)
+            if not name:
+                continue
+            if name in aliases:
+                lookup = aliases[name]
+            else:
+                field = serializer.fields.get(name)
+                if field is None or field.source == "*":
+                    continue
+                lookup = field.source.replace(".", "__")
+            fields.append(f"-{lookup}" if direction == "desc" else lookup)
+        return fields
+
+
+class NumericRangeFilter(BaseFilterBackend):
+    """
+    `?<name>_min=` / `?<name>_max=` for the names in `view.range_filters`
+    ({param name: ORM lookup}), typically the numeric shadow columns
+    (e.g. asking_rent → numbers__asking_rent), so the range runs in SQL.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        for name, lookup in getattr(view, "range_filters", {}).items():
+            for suffix, op in (("min", "gte"), ("max", "lte")):
+                raw = request.query_params.get(f"{name}_{suffix}", "").replace(",", "").strip()
+                if not raw:
+                    continue
+                try:
+                    value = Decimal(raw)
+                except InvalidOperation:
+                    raise ValidationError({f"{name}_{suffix}": "Must be a number."})
+                queryset = queryset.filter(**{f"{lookup}__{op}": value})
+        return queryset
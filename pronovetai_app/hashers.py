@@ -0,0 +1,57 @@
+"""
+Django's password hashers with their cost parameters taken from
+settings.PASSWORD_HASHER_COSTS at use time instead of from class attributes.
+
+PASSWORD_HASHER_PROFILE (core/settings.py) puts one of these first in
+PASSWORD_HASHERS. check_password() rehashes a stored password at its next
+successful login when it was made by another hasher or with other costs, so
+changing the profile or a cost moves users over as they log in; nothing has
+to be run. `manage.py bench_login` measures what each profile costs per core.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class Cost:
+    """A cost parameter read from PASSWORD_HASHER_COSTS[profile][<attribute name>]."""
+
+    def __init__(self, profile: str, default):
+        self.profile = profile
+        self.default = default
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        costs = getattr(settings, 'PASSWORD_HASHER_COSTS', {}).get(self.profile, {})
+        return costs.get(self.name, self.default)
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    profile = 'pbkdf2'
+    iterations = Cost(profile, hashers.PBKDF2PasswordHasher.iterations)
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    profile = 'scrypt'
+    work_factor = Cost(profile, hashers.ScryptPasswordHasher.work_factor)
+    block_size = Cost(profile, hashers.ScryptPasswordHasher.block_size)
+    parallelism = Cost(profile, hashers.ScryptPasswordHasher.parallelism)
+    maxmem = Cost(profile, hashers.ScryptPasswordHasher.maxmem)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Needs `pip install argon2-cffi`."""
+
+    profile = 'argon2'
+    time_cost = Cost(profile, hashers.Argon2PasswordHasher.time_cost)
+    memory_cost = Cost(profile, hashers.Argon2PasswordHasher.memory_cost)
+    parallelism = Cost(profile, hashers.Argon2PasswordHasher.parallelism)
+
+
+PROFILES = {hasher.profile: hasher for hasher in (PBKDF2PasswordHasher, ScryptPasswordHasher, Argon2PasswordHasher)}
+
+
+def costs(hasher) -> dict:
+    """The cost parameters `hasher` currently runs with, for reports."""
+    return {name: getattr(hasher, name) for name, value in vars(type(hasher)).items() if isinstance(value, Cost)}
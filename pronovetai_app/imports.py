@@ -0,0 +1,314 @@
+"""
+Bulk import of legacy spreadsheets into pt_units / pt_buildings.
+
+Files are read row by row (csv.reader, or iterparse over the XLSX
+sheet XML), every row is cleaned with the model fields' own to_python()
+(so BlankZeroDecimalField / BlankZeroIntegerField rules apply) plus
+Model.clean(), and valid rows are written with bulk_create / bulk_update
+in one transaction per batch. Invalid rows are skipped and reported.
+
+Used by `manage.py import_inventory` and POST /api/import/.
+"""
+import csv
+import io
+import zipfile
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from itertools import islice
+from xml.etree.ElementTree import ParseError, fromstring, iterparse
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Max
+
+from . import caching, counters, numbers, odform_index, reference
+from .models import Building, Unit
+
+MAX_REPORTED_ERRORS = 1000
+
+# headers written by the export endpoints that differ from the field name
+HEADER_ALIASES = {
+    Unit: {
+        'unit': 'name', 'building': 'building', 'vacancy': 'vacancy_status', 'gfa': 'gross_floor_area',
+        'nfa': 'net_floor_area', 'lease start': 'lease_commencement_date', 'lease end': 'lease_expiry_date',
+        'parking slots': 'allocated_parking_slot', 'sale price (office)': 'sale_price_office',
+    },
+    Building: {
+        'city': 'address_city', 'street': 'address_street', 'barangay': 'address_brgy', 'zip': 'address_zip',
+        'peza': 'peza', 'gfa': 'gfa', 'gla': 'gla', 'sale price (php)': 'sale_price_php',
+        'association dues': 'assoc_dues', 'type': 'building_type', 'total levels': 'total_levels',
+    },
+}
+
+TARGETS = {'units': Unit, 'buildings': Building}
+
+
+class ImportFileError(ValueError):
+    """The upload could not be read as CSV/XLSX, or has no usable header."""
+
+
+# ── readers ───────────────────────────────────────────────────────────
+def read_csv(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.reader(text)
+        headers = next(reader, [])
+        for row in reader:
+            yield headers, row
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise ImportFileError(f'Not a valid UTF-8 CSV file: {exc}') from exc
+
+
+_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+
+def _column_index(ref: str) -> int:
+    index = 0
+    for ch in ref:
+        if not ch.isalpha():
+            break
+        index = index * 26 + (ord(ch.upper()) - 64)
+    return index - 1
+
+
+def _first_sheet_path(zf) -> str:
+    rel_id = fromstring(zf.read('xl/workbook.xml')).find(f'{_NS}sheets/{_NS}sheet').get(f'{_REL_NS}id')
+    rels = fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    for rel in rels.iter(f'{_PKG_REL_NS}Relationship'):
+        if rel.get('Id') == rel_id:
+            target = rel.get('Target').lstrip('/')
+            return target if target.startswith('xl/') else f'xl/{target}'
+    raise ValueError('Workbook has no worksheet')
+
+
+def read_xlsx(fileobj):
+    try:
+        yield from _read_xlsx(fileobj)
+    except (zipfile.BadZipFile, KeyError, ParseError) as exc:
+        raise ImportFileError(f'Not a valid XLSX workbook: {exc}') from exc
+
+
+def _read_xlsx(fileobj):
+    with zipfile.ZipFile(fileobj) as zf:
+        shared = []
+        if 'xl/sharedStrings.xml' in zf.namelist():
+            with zf.open('xl/sharedStrings.xml') as fh:
+                for _, el in iterparse(fh):
+                    if el.tag == f'{_NS}si':
+                        shared.append(''.join(t.text or '' for t in el.iter(f'{_NS}t')))
+                        el.clear()
+
+        headers = None
+        with zf.open(_first_sheet_path(zf)) as fh:
+            for _, el in iterparse(fh):
+                if el.tag != f'{_NS}row':
+                    continue
+                cells, column = {}, -1
+                for c in el.iter(f'{_NS}c'):
+                    # `r` ("C5") may be omitted, in which case cells are consecutive
+                    column = _column_index(c.get('r')) if c.get('r') else column + 1
+                    kind, v = c.get('t'), c.find(f'{_NS}v')
+                    if kind == 'inlineStr':
+                        value = ''.join(t.text or '' for t in c.iter(f'{_NS}t'))
+                    elif v is None:
+                        value = ''
+                    elif kind == 's':
+                        value = shared[int(v.text)]
+                    else:
+                        value = v.text or ''
+                    cells[column] = value
+                el.clear()
+                row = [cells.get(i, '') for i in range(max(cells, default=-1) + 1)]
+                if headers is None:
+                    headers = row
+                else:
+                    yield headers, row
+
+
+def read_rows(fileobj, filename: str):
+    """Pick the reader from the extension, falling back to the zip magic."""
+    name = (filename or '').lower()
+    if name.endswith('.xlsx'):
+        return read_xlsx(fileobj)
+    if name.endswith('.csv'):
+        return read_csv(fileobj)
+    head = fileobj.read(2)
+    fileobj.seek(0)
+    return read_xlsx(fileobj) if head == b'PK' else read_csv(fileobj)
+
+
+# ── cleaning ──────────────────────────────────────────────────────────
+def _excel_date(value):
+    """XLSX stores dates as serial day numbers unless the cell was text."""
+    try:
+        return date(1899, 12, 30) + timedelta(days=int(float(value)))
+    except (TypeError, ValueError):
+        return value
+
+
+class RowCleaner:
+    def __init__(self, model, headers):
+        self.model = model
+        aliases = HEADER_ALIASES.get(model, {})
+        by_name = {f.name: f for f in model._meta.concrete_fields}
+        by_name.update({f.column: f for f in model._meta.concrete_fields})
+
+        self.columns = []  # (index, field)
+        for i, header in enumerate(headers):
+            key = (header or '').strip().lower()
+            name = aliases.get(key, key.replace(' ', '_'))
+            if name in ('id', 'pk'):
+                self.columns.append((i, model._meta.pk))
+            elif name in by_name and name != model._meta.pk.name:
+                self.columns.append((i, by_name[name]))
+        self.fields = [f for _, f in self.columns if not f.primary_key]
+        if not self.fields:
+            raise ImportFileError(f'No {model._meta.verbose_name} columns found in the header row.')
+
+        # exports write grade/type descriptions; store the code either way
+        self.codes = {}
+        if model is Building:
+            self.codes = {
+                'grade': reference.building_grades.codes_by_description(),
+                'building_type': reference.building_types.codes_by_description(),
+            }
+
+        self.building_ids, self.building_pks = None, None
+        if model is Unit and any(f.name == 'building' for f in self.fields):
+            # building cells may hold a building name or an id (names first:
+            # some legacy buildings are named with digits only)
+            self.building_ids = dict(Building.objects.values_list('name', 'id'))
+            self.building_pks = set(self.building_ids.values())
+
+    def clean(self, row):
+        """-> (pk or None, {attname: value}) or raises ValidationError."""
+        pk, values, errors = None, {}, {}
+        for i, f in self.columns:
+            raw = row[i] if i < len(row) else ''
+            raw = raw.strip() if isinstance(raw, str) else raw
+            try:
+                if f.primary_key:
+                    pk = int(raw) if raw else None
+                elif isinstance(f, models.ForeignKey):
+                    values[f.attname] = self._building_id(raw)
+                elif not raw:
+                    values[f.attname] = None if f.null else ''
+                else:
+                    if isinstance(f, models.DateField):
+                        raw = _excel_date(raw)
+                    elif f.name in self.codes:
+                        raw = self.codes[f.name].get(raw.lower(), raw)
+                    value = f.to_python(raw)
+                    if value is not None:
+                        f.run_validators(value)
+                    values[f.attname] = value
+            except ValidationError as exc:
+                errors[f.name] = exc.messages
+            except ValueError as exc:
+                errors[f.name] = [str(exc)]
+        if pk is None and self.model is Unit and 'building_id' not in values:
+            errors['building'] = ['Building is required.']
+        if errors:
+            raise ValidationError(errors)
+
+        self.model(**values).clean()
+        return pk, values
+
+    def _building_id(self, raw):
+        if raw in ('', None):
+            raise ValidationError('Building is required.')
+        if raw in self.building_ids:
+            return self.building_ids[raw]
+        if str(raw).isdigit() and int(raw) in self.building_pks:
+            return int(raw)
+        raise ValidationError(f'Unknown building "{raw}".')
+
+
+# ── writing ───────────────────────────────────────────────────────────
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, row_number, error):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            detail = error.message_dict if hasattr(error, 'error_dict') else {'__all__': error.messages}
+            self.errors.append({'row': row_number, 'errors': detail})
+
+    def as_dict(self):
+        return {'created': self.created, 'updated': self.updated,
+                'error_count': self.error_count, 'errors': self.errors}
+
+
+def import_rows(model, rows, *, batch_size=1000, dry_run=False) -> ImportResult:
+    """
+    Rows with an `id` update that record (only the columns present in the
+    file); rows without one are created. Each batch commits on its own, so
+    an unreadable file part-way through keeps the batches already written.
+    """
+    result = ImportResult()
+    cleaner = None
+    rows = iter(rows)
+    row_number = 1  # header row
+
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        if cleaner is None:
+            cleaner = RowCleaner(model, batch[0][0])
+
+        to_create, to_update = [], []
+        for _, row in batch:
+            row_number += 1
+            if not any(str(cell).strip() for cell in row):
+                continue
+            try:
+                pk, values = cleaner.clean(row)
+            except ValidationError as exc:
+                result.add_error(row_number, exc)
+                continue
+            (to_update if pk else to_create).append((row_number, pk, values))
+
+        if to_update:
+            existing = set(model.objects.filter(pk__in=[pk for _, pk, _ in to_update])
+                           .values_list('pk', flat=True))
+            for n, pk, _ in to_update:
+                if pk not in existing:
+                    result.add_error(n, ValidationError(f'No {model._meta.verbose_name} with id {pk}.'))
+            to_update = [(n, pk, v) for n, pk, v in to_update if pk in existing]
+
+        if dry_run:
+            result.created += len(to_create)
+            result.updated += len(to_update)
+            continue
+
+        with transaction.atomic():
+            written = model.objects.none()
+            if to_create:
+                # MySQL's bulk_create returns no ids, so the new rows are picked up
+                # by the pk range they were inserted into
+                last_pk = model.objects.aggregate(last=Max('pk'))['last'] or 0
+                model.objects.bulk_create([model(**v) for _, _, v in to_create], batch_size=batch_size)
+                result.created += len(to_create)
+                written |= model.objects.filter(pk__gt=last_pk)
+            if to_update:
+                objs = [model(pk=pk, **v) for _, pk, v in to_update]
+                model.objects.bulk_update(objs, [f.name for f in cleaner.fields], batch_size=batch_size)
+                result.updated += len(to_update)
+                written |= model.objects.filter(pk__in=[pk for _, pk, _ in to_update])
+            # bulk writes bypass the post_save handlers that keep these current
+            numbers.refresh(model, written)
+            if model is Unit:
+                odform_index.rematch_units(written.select_related('building'))
+
+    if not dry_run and (result.created or result.updated):
+        # nor do they reach the counter and cache-aside signals
+        counters.reconcile()
+        caching.bump('inventory')
+    return result
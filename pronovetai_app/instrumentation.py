@@ -0,0 +1,284 @@
+"""
+Per-request SQL/latency instrumentation.
+
+RequestMetricsMiddleware wraps every database call of a request
+(connection.execute_wrapper, so it works with DEBUG off) and records, per
+route name: request count, total latency, SQL time, query count and — for
+views using SerializerTimingMixin — serializer time. Each response gets a
+`Server-Timing` header; aggregates are served in Prometheus text format at
+/metrics. Requests over API_SLOW_REQUEST_MS or API_MAX_QUERIES are logged to
+`pronovetai_app.metrics` and counted in api_slow_requests_total.
+
+Streaming responses (exports) run most of their queries while the body is
+sent, so they are measured until the server closes them, and go without
+Server-Timing: their headers leave before the numbers exist.
+
+Aggregates are per process (each gunicorn worker reports its own); scrape
+every worker or sum in Prometheus.
+"""
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger('pronovetai_app.metrics')
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+
+
+def slow_request_ms() -> int:
+    return getattr(settings, 'API_SLOW_REQUEST_MS', 500)
+
+
+def max_queries() -> int:
+    return getattr(settings, 'API_MAX_QUERIES', 50)
+
+
+class RequestMetrics:
+    """Timings of one request; lives on `request.metrics`."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += time.perf_counter() - started
+            self.queries += 1
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+class _Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+class _RouteStats:
+    def __init__(self):
+        self.requests = {}  # (method, status) -> count
+        self.latency = _Histogram(LATENCY_BUCKETS)
+        self.queries = _Histogram(QUERY_BUCKETS)
+        self.sql_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.slow = {}  # reason -> count
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, method, status, metrics: RequestMetrics, elapsed, reasons):
+        with self._lock:
+            stats = self._routes.setdefault(route, _RouteStats())
+            key = (method, status)
+            stats.requests[key] = stats.requests.get(key, 0) + 1
+            stats.latency.observe(elapsed)
+            stats.queries.observe(metrics.queries)
+            stats.sql_seconds += metrics.sql_seconds
+            stats.serialize_seconds += metrics.serialize_seconds
+            for reason in reasons:
+                stats.slow[reason] = stats.slow.get(reason, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._routes = {}
+
+    def render(self) -> str:
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        def histogram(name, route, hist):
+            for bound, count in zip(hist.bounds, hist.counts):
+                lines.append(f'{name}_bucket{{route="{route}",le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{route="{route}",le="+Inf"}} {hist.count}')
+            lines.append(f'{name}_sum{{route="{route}"}} {hist.total:g}')
+            lines.append(f'{name}_count{{route="{route}"}} {hist.count}')
+
+        with self._lock:
+            routes = sorted(self._routes.items())
+
+            family('api_requests_total', 'counter', 'Requests by route, method and status.')
+            for route, s in routes:
+                for (method, status), n in sorted(s.requests.items()):
+                    lines.append(f'api_requests_total{{route="{route}",method="{method}",status="{status}"}} {n}')
+
+            family('api_request_duration_seconds', 'histogram', 'Total request latency.')
+            for route, s in routes:
+                histogram('api_request_duration_seconds', route, s.latency)
+
+            family('api_db_queries_per_request', 'histogram', 'SQL queries issued per request.')
+            for route, s in routes:
+                histogram('api_db_queries_per_request', route, s.queries)
+
+            family('api_db_duration_seconds_total', 'counter', 'Time spent in SQL.')
+            for route, s in routes:
+                lines.append(f'api_db_duration_seconds_total{{route="{route}"}} {s.sql_seconds:g}')
+
+            family('api_serialize_duration_seconds_total', 'counter', 'Time spent in DRF serializers.')
+            for route, s in routes:
+                lines.append(f'api_serialize_duration_seconds_total{{route="{route}"}} {s.serialize_seconds:g}')
+
+            family('api_slow_requests_total', 'counter', 'Requests over the latency or query-count threshold.')
+            for route, s in routes:
+                for reason, n in sorted(s.slow.items()):
+                    lines.append(f'api_slow_requests_total{{route="{route}",reason="{reason}"}} {n}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def _route(request) -> str:
+    match = getattr(request, 'resolver_match', None)
+    # unresolved paths share one label so 404 scans cannot blow up cardinality
+    return (match.view_name if match and match.view_name else None) or 'unmatched'
+
+
+class _RecordOnClose:
+    """
+    Body of a streaming response. Its queries run while it is sent, so the
+    query hooks stay on until the server closes the response (PEP 3333
+    close(), also when the client went away), and the request is recorded then.
+    """
+
+    def __init__(self, content, hooks, record):
+        self._content = iter(content)
+        self._hooks, self._record = hooks, record
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._content)
+
+    def close(self):
+        if self._hooks is None:
+            return
+        hooks, self._hooks = self._hooks, None
+        hooks.close()
+        self._record()
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = request.metrics = RequestMetrics()
+        with ExitStack() as hooks:
+            for connection in connections.all():
+                hooks.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+            if response.streaming and not response.is_async:
+                response.streaming_content = _RecordOnClose(
+                    response.streaming_content, hooks.pop_all(), lambda: self.record(request, response, metrics),
+                )
+                return response
+
+        elapsed = self.record(request, response, metrics)
+        if elapsed is not None:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={metrics.sql_seconds * 1000:.1f};desc="{metrics.queries} queries"',
+                f'serialize;dur={metrics.serialize_seconds * 1000:.1f}',
+                f'total;dur={elapsed * 1000:.1f}',
+            ])
+        return response
+
+    @staticmethod
+    def record(request, response, metrics):
+        """Count the request in /metrics and log it if slow; returns its latency (None for /metrics itself)."""
+        elapsed = metrics.elapsed
+        route = _route(request)
+        if route == 'metrics':
+            return None
+
+        reasons = []
+        if elapsed * 1000 > slow_request_ms():
+            reasons.append('latency')
+        if metrics.queries > max_queries():
+            reasons.append('queries')
+        if reasons:
+            logger.warning(
+                '%s %s (%s): %.0f ms, %d queries, %.0f ms SQL, %.0f ms serializing',
+                request.method, request.path, route, elapsed * 1000, metrics.queries,
+                metrics.sql_seconds * 1000, metrics.serialize_seconds * 1000,
+            )
+
+        registry.record(route, request.method, response.status_code, metrics, elapsed, reasons)
+        return elapsed
+
+
+class SerializerTimingMixin:
+    """
+    For DRF views: adds the time spent turning objects into primitives
+    (serializer.data) to the request's metrics.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        metrics = getattr(self.request, 'metrics', None)
+        if metrics is not None:
+            to_representation = serializer.to_representation
+
+            def timed(instance):
+                started = time.perf_counter()
+                try:
+                    return to_representation(instance)
+                finally:
+                    metrics.serialize_seconds += time.perf_counter() - started
+
+            serializer.to_representation = timed
+        return serializer
+
+
+def _has_metrics_token(request) -> bool:
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    scheme, _, credentials = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    return bool(token) and scheme.lower() == 'bearer' and constant_time_compare(credentials.strip(), token)
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint, for staff sessions and requests bearing
+    METRICS_TOKEN. METRICS_ALLOWED_IPS (empty by default) trusts REMOTE_ADDR,
+    which behind a reverse proxy on the same host is 127.0.0.1 for everyone.
+    """
+    user = getattr(request, 'user', None)
+    allowed = (
+        (user is not None and user.is_staff)
+        or _has_metrics_token(request)
+        or request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICS_ALLOWED_IPS', [])
+    )
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,35 +1,78 @@
+"""
+Login against pt_users.user_pass, whichever of its three formats a row is in:
+
+    5f4dcc3b5aa765d61d8327deb882cf99     bare MD5 written by the legacy app
+    pbkdf2_wrapped_md5$...               MD5 wrapped by `manage.py wrap_legacy_hashes`
+    pbkdf2_sha256$...                    Django's own hashers
+
+The format is read off the stored value and exactly one verifier runs, so a
+login costs one user lookup and one hash computation whatever the outcome.
+A successful login with either legacy format rewrites the hash with the
+preferred hasher. Once wrap_legacy_hashes has run, no bare MD5 is left and
+the MD5 branch below is dead code.
+"""
 import hashlib
-from django.contrib.auth.backends import BaseBackend
+import re
+
 from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.utils.crypto import constant_time_compare
+
+from .hashers import PBKDF2PasswordHasher
 
 User = get_user_model()
 
+LEGACY_MD5 = re.compile(r'^[0-9a-fA-F]{32}$')
+
+
+def md5_hexdigest(password: str) -> str:
+    return hashlib.md5(password.encode()).hexdigest()
+
+
+def is_legacy_md5(encoded: str) -> bool:
+    return bool(encoded) and LEGACY_MD5.match(encoded) is not None
+
 
-class LegacyHashBackend(BaseBackend):
+class PBKDF2WrappedMD5PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 over the legacy MD5 hex digest, so old hashes can be wrapped without the password."""
+
+    algorithm = 'pbkdf2_wrapped_md5'
+
+    def encode_md5_hash(self, md5_hash: str, salt: str, iterations=None) -> str:
+        return super().encode(md5_hash.lower(), salt, iterations)
+
+    def encode(self, password, salt, iterations=None):
+        return self.encode_md5_hash(md5_hexdigest(password), salt, iterations)
+
+
+class LegacyHashBackend(ModelBackend):
     """
-    Authenticates against pt_users.user_pass that are **MD5** hashes.
-    On first successful login rewrites the hash using Django's hasher.
+    Replaces ModelBackend (permissions come from it unchanged) and adds the
+    bare-MD5 format. Wrapped and Django hashes go through check_password(),
+    which identifies the hasher by prefix and upgrades non-preferred ones.
     """
 
     def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
         if username is None or password is None:
             return None
 
         try:
-            user = User.objects.get(username=username)
+            user = User._default_manager.get_by_natural_key(username)
         except User.DoesNotExist:
+            # hash once anyway so unknown usernames take as long as wrong passwords
+            User().set_password(password)
             return None
 
-        legacy_hash = user.password  # column is user_pass
-        if len(legacy_hash) == 32 and legacy_hash == hashlib.md5(password.encode()).hexdigest():
-            # ✅ Password matches the old MD5 hash → upgrade!
-            user.set_password(password)   # writes PBKDF2
-            user.save(update_fields=["password"])
-            return user
+        if is_legacy_md5(user.password):
+            matched = constant_time_compare(md5_hexdigest(password), user.password.lower())
+            if matched:
+                user.set_password(password)
+                user.save(update_fields=["password"])
+        else:
+            matched = user.check_password(password)
 
-        # either already upgraded or incorrect
+        if matched and self.user_can_authenticate(user):
+            return user
         return None
-
-    def user_can_authenticate(self, user):
-        # mimic Django’s default check (is_active etc.)
-        return getattr(user, "is_active", True)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from pronovetai_app import numbers
+
+
+class Command(BaseCommand):
+    help = "Parse the rent/price/area varchars of pt_buildings and pt_units into their numeric shadow tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--missing-only", action="store_true",
+                            help="only rows that have no shadow row yet (fast catch-up after raw SQL loads)")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for model in numbers.SHADOWS:
+            if options["missing_only"]:
+                written = numbers.refresh_missing(model, options["batch_size"])
+            else:
+                written = numbers.refresh(model, batch_size=options["batch_size"])
+            self.stdout.write(f"{model._meta.db_table}: {written} rows")
+        self.stdout.write(self.style.SUCCESS("Numeric shadow tables up to date"))
@@ -0,0 +1,74 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from pronovetai_app import fields
+from pronovetai_app.models import Building, Unit
+
+
+def dirty_corpus(size, seed=0):
+    """Values shaped like the ones in the legacy varchar columns, heavily repeated."""
+    rng = random.Random(seed)
+    templates = [
+        "{n}", "{n}.{d}", "{t}", "{t}.{d} sqm", "{t} sqm", "PHP {t}.00", "P{t}/sqm", " {n} ", "{n}-{m}",
+        "{n} basement", "approx. {n}", "{n}%", "", "0", "-", "TBA", "n/a", "{n}.{d}m", "1e{e}",
+    ]
+    pool = []
+    for _ in range(max(size // 20, 50)):  # ~5% distinct values
+        n = rng.randint(1, 9999)
+        pool.append(rng.choice(templates).format(
+            n=n, m=n + rng.randint(1, 5), d=rng.randint(0, 99),
+            t=f"{rng.randint(1, 999):,},{rng.randint(0, 999):03d}", e=rng.randint(1, 3),
+        ))
+    return [rng.choice(pool) for _ in range(size)]
+
+
+def column_corpus(limit):
+    """Raw strings from the BlankZero columns of pt_units / pt_buildings."""
+    values = []
+    with connection.cursor() as cursor:
+        for model in (Unit, Building):
+            for f in model._meta.concrete_fields:
+                if isinstance(f, (fields.BlankZeroDecimalField, fields.BlankZeroIntegerField)):
+                    cursor.execute(
+                        f"SELECT {connection.ops.quote_name(f.column)} FROM "
+                        f"{connection.ops.quote_name(model._meta.db_table)} LIMIT %s", [limit]
+                    )
+                    values.extend(str(v) for (v,) in cursor.fetchall() if v is not None)
+    return values
+
+
+class Command(BaseCommand):
+    help = "Time BlankZeroDecimalField/BlankZeroIntegerField conversions over a corpus of dirty values."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=200_000, help="synthetic corpus size")
+        parser.add_argument("--from-db", action="store_true", help="use values from the legacy columns instead")
+        parser.add_argument("--limit", type=int, default=50_000, help="rows per column with --from-db")
+
+    def handle(self, *args, **options):
+        corpus = column_corpus(options["limit"]) if options["from_db"] else dirty_corpus(options["size"])
+        if not corpus:
+            self.stdout.write("No values to convert")
+            return
+
+        converters = {
+            "decimal": fields.BlankZeroDecimalField(max_digits=14, decimal_places=2),
+            "integer": fields.BlankZeroIntegerField(),
+        }
+        for name, field in converters.items():
+            fields.parse_legacy_int.cache_clear()
+            fields.parse_legacy_decimal.cache_clear()
+            started = time.perf_counter()
+            for value in corpus:
+                field.from_db_value(value, None, connection)
+            elapsed = time.perf_counter() - started
+
+            info = (fields.parse_legacy_decimal if name == "decimal" else fields.parse_legacy_int).cache_info()
+            lookups = info.hits + info.misses
+            self.stdout.write(
+                f"{name:8} {len(corpus):>9,} values  {elapsed * 1000:8.1f} ms  "
+                f"{len(corpus) / elapsed:>12,.0f}/s  cache hit {info.hits / lookups if lookups else 0:.1%}"
+            )
@@ -0,0 +1,83 @@
+import copy
+import json
+import math
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from pronovetai_app import hashers
+
+
+def parse_cost(text):
+    """'pbkdf2.iterations=600000' -> ('pbkdf2', 'iterations', 600000)"""
+    try:
+        key, value = text.split("=", 1)
+        profile, name = key.split(".", 1)
+        return profile, name, int(value)
+    except ValueError:
+        raise CommandError(f"--cost takes profile.parameter=integer, not {text!r}")
+
+
+class Command(BaseCommand):
+    help = ("Measure password verifications per second on one core for each hasher profile (the hashing "
+            "part of a login), to size workers for a login spike.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profile", action="append", choices=sorted(hashers.PROFILES), dest="profiles",
+                            help="measure only this profile (repeatable); default: all")
+        parser.add_argument("--cost", action="append", default=[], metavar="PROFILE.PARAM=N",
+                            help="override a cost parameter, e.g. --cost pbkdf2.iterations=600000")
+        parser.add_argument("--seconds", type=float, default=3.0, help="measuring time per profile")
+        parser.add_argument("--peak", type=int, help="expected logins per second; reports the cores it needs")
+        parser.add_argument("--json", action="store_true", help="print the results as JSON")
+
+    def handle(self, *args, **options):
+        costs = copy.deepcopy(getattr(settings, "PASSWORD_HASHER_COSTS", {}))
+        for profile, name, value in map(parse_cost, options["cost"]):
+            if profile not in hashers.PROFILES:
+                raise CommandError(f"Unknown profile {profile!r} in --cost")
+            costs.setdefault(profile, {})[name] = value
+
+        results = {}
+        with override_settings(PASSWORD_HASHER_COSTS=costs):
+            for profile in options["profiles"] or list(hashers.PROFILES):
+                results[profile] = self.measure(hashers.PROFILES[profile](), options["seconds"], options["peak"])
+                if not options["json"]:
+                    self.report(profile, results[profile])
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
+
+    @staticmethod
+    def measure(hasher, seconds, peak):
+        try:
+            encoded = hasher.encode("correct horse battery staple", hasher.salt())
+        except ValueError as exc:  # hasher library not installed
+            return {"error": str(exc)}
+
+        rounds, elapsed, started = 0, 0.0, time.perf_counter()
+        while rounds < 3 or elapsed < seconds:
+            hasher.verify("correct horse battery staple", encoded)
+            rounds += 1
+            elapsed = time.perf_counter() - started
+        per_second = rounds / elapsed
+        result = {
+            "costs": hashers.costs(hasher),
+            "ms_per_login": elapsed / rounds * 1000,
+            "logins_per_second_per_core": per_second,
+        }
+        if peak:
+            result["cores_for_peak"] = math.ceil(peak / per_second)
+        return result
+
+    def report(self, profile, result):
+        if "error" in result:
+            self.stdout.write(f"{profile:8} skipped: {result['error']}")
+            return
+        params = " ".join(f"{name}={value}" for name, value in sorted(result["costs"].items()))
+        line = (f"{profile:8} {result['ms_per_login']:9.1f} ms/login  "
+                f"{result['logins_per_second_per_core']:8.1f} logins/s/core  ({params})")
+        if "cores_for_peak" in result:
+            line += f"  {result['cores_for_peak']} cores for peak"
+        self.stdout.write(line)
@@ -0,0 +1,107 @@
+import json
+import platform
+import subprocess
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from pronovetai_app.benchmarks import portfolio, runner
+from pronovetai_app.test_runner import UnmanagedModelTestRunner
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ("Load-test the REST API: build a throwaway test database, seed a synthetic portfolio and "
+            "write throughput and p50/p95/p99 latency per endpoint as JSON.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=sorted(portfolio.SCALES), default="small")
+        parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+        parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests per scenario")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--scenario", action="append", choices=sorted(runner.SCENARIOS), dest="scenarios",
+                            help="run only this scenario (repeatable); default: all")
+        parser.add_argument("--output", default="benchmark-results.json", help="JSON results file ('-' for stdout)")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests must be at least 1")
+        scale = portfolio.SCALES[options["scale"]]
+        names = options["scenarios"] or list(runner.SCENARIOS)
+
+        # same database setup as `manage.py test`: never touches the configured database itself;
+        # same cache tier, under its own key prefix so synthetic counters and indexes stay out
+        # of a dev server sharing that cache
+        isolated_caches = {
+            alias: {**conf, "KEY_PREFIX": f"{conf.get('KEY_PREFIX', '')}:benchmark"}
+            for alias, conf in settings.CACHES.items()
+        }
+        test_runner = UnmanagedModelTestRunner(verbosity=0, interactive=False)
+        test_runner.setup_test_environment()
+        cache_override = override_settings(CACHES=isolated_caches)
+        cache_override.enable()
+        old_config = test_runner.setup_databases()
+        try:
+            started = time.perf_counter()
+            rows = portfolio.generate(scale, seed=options["seed"])
+            self.stderr.write(f"Seeded {options['scale']} portfolio in {time.perf_counter() - started:.1f}s: "
+                              + ", ".join(f"{n:,} {name}" for name, n in rows.items()))
+
+            results = runner.run(names, options["requests"], options["warmup"], options["seed"],
+                                 on_result=self.report)
+            document = {
+                "meta": {
+                    "commit": git_commit(),
+                    "finished_at": timezone.now().isoformat(timespec="seconds"),
+                    "database": {"vendor": connection.vendor, "version": self.database_version()},
+                    "cache": settings.CACHES["default"]["BACKEND"],
+                    "python": platform.python_version(),
+                    "django": django.get_version(),
+                    "scale": {"name": options["scale"], **scale._asdict()},
+                    "rows": rows,
+                    "seed": options["seed"],
+                    "requests": options["requests"],
+                    "warmup": options["warmup"],
+                },
+                "scenarios": results,
+            }
+        finally:
+            test_runner.teardown_databases(old_config)
+            cache_override.disable()
+            test_runner.teardown_test_environment()
+
+        text = json.dumps(document, indent=2, sort_keys=True) + "\n"
+        if options["output"] == "-":
+            self.stdout.write(text, ending="")
+        else:
+            Path(options["output"]).write_text(text)
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def report(self, name, stats):
+        latency = stats["latency_ms"]
+        self.stderr.write(
+            f"{name:26} {stats['throughput_rps']:>9,.1f} req/s  p50 {latency['p50']:>8.2f}  "
+            f"p95 {latency['p95']:>8.2f}  p99 {latency['p99']:>8.2f} ms  "
+            f"{stats['queries']['mean'] or 0:>5.1f} queries  {stats['errors']} errors"
+        )
+
+    @staticmethod
+    def database_version():
+        version = connection.Database.sqlite_version if connection.vendor == "sqlite" else None
+        if version is None:
+            version = ".".join(map(str, getattr(connection, "mysql_version", ()))) or None
+        return version
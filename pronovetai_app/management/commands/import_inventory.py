@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pronovetai_app import imports
+
+
+class Command(BaseCommand):
+    help = "Bulk-load units or buildings from a CSV/XLSX spreadsheet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or XLSX file; the first row holds the column headers")
+        parser.add_argument("--target", choices=sorted(imports.TARGETS), default="units")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="validate and report without writing")
+
+    def handle(self, *args, **options):
+        model = imports.TARGETS[options["target"]]
+        try:
+            with open(options["path"], "rb") as fh:
+                result = imports.import_rows(
+                    model, imports.read_rows(fh, options["path"]),
+                    batch_size=options["batch_size"], dry_run=options["dry_run"],
+                )
+        except (OSError, imports.ImportFileError) as exc:
+            raise CommandError(str(exc))
+
+        for error in result.errors:
+            messages = "; ".join(f"{field}: {' '.join(msgs)}" for field, msgs in error["errors"].items())
+            self.stderr.write(f"row {error['row']}: {messages}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(f"... {result.error_count - len(result.errors)} more rejected rows not shown")
+
+        verb = "Would create" if options["dry_run"] else "Created"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result.created}, updated {result.updated}, rejected {result.error_count} "
+            f"{model._meta.verbose_name_plural}"
+        ))
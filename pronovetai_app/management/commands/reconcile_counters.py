@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from pronovetai_app import counters
+
+
+class Command(BaseCommand):
+    help = "Recount the dashboard totals and refresh the cached counters (run from cron)."
+
+    def handle(self, *args, **options):
+        snap = counters.reconcile()
+        for name, value in snap.values.items():
+            self.stdout.write(f"{name}: {value}")
+        self.stdout.write(self.style.SUCCESS("Dashboard counters reconciled"))
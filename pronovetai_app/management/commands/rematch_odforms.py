@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from pronovetai_app import matching
+from pronovetai_app.models import ODForm
+
+
+class Command(BaseCommand):
+    help = "Re-score vacant units against OD forms and store the top matches (run from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("ids", nargs="*", type=int, help="OD form ids (default: every active form)")
+        parser.add_argument("--limit", type=int, default=matching.STORED_LIMIT, help="matches kept per form")
+
+    def handle(self, *args, **options):
+        forms = ODForm.objects.filter(pk__in=options["ids"]) if options["ids"] else ODForm.objects.filter(
+            status="active")
+
+        started, total, count = time.perf_counter(), 0, 0
+        for form in forms.iterator():
+            total += matching.store(form, options["limit"])
+            count += 1
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Matched {count} OD forms ({total} matches stored) in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from pronovetai_app import auditlog
+
+
+class Command(BaseCommand):
+    help = "Insert the log rows the audit-log writer spooled to AUDIT_LOG_SPOOL."
+
+    def handle(self, *args, **options):
+        path = auditlog.spool_path()
+        if not path.exists():
+            self.stdout.write("Nothing spooled")
+            return
+
+        # moved aside first: rows that fail again are spooled afresh, not read twice
+        replaying = path.with_name(path.name + ".replaying")
+        path.replace(replaying)
+        entries = auditlog.read_spool(replaying)
+        still = auditlog.writer.write(entries)
+        replaying.unlink()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Replayed {len(entries) - still} of {len(entries)} spooled log rows"
+            + (f"; {still} failed again and are back in {path}" if still else "")
+        ))
@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from pronovetai_app.legacy_backends import LEGACY_MD5, PBKDF2WrappedMD5PasswordHasher
+from pronovetai_app.models import User
+
+
+class Command(BaseCommand):
+    help = ("Wrap the bare MD5 hashes left in pt_users in PBKDF2 (pbkdf2_wrapped_md5), batch by batch. "
+            "Safe to stop and re-run: every run picks up whatever MD5 hashes remain.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200, help="users hashed and written per transaction")
+        parser.add_argument("--workers", type=int, default=4,
+                            help="hashing threads (PBKDF2 releases the GIL, so one per core)")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or options["workers"] < 1:
+            raise CommandError("--batch-size and --workers must be at least 1")
+        hasher = get_hasher(PBKDF2WrappedMD5PasswordHasher.algorithm)
+        pending = User.objects.filter(password__regex=LEGACY_MD5.pattern).order_by("pk")
+
+        started, wrapped, skipped, last_pk = time.perf_counter(), 0, 0, 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            while True:
+                batch = list(pending.filter(pk__gt=last_pk).values_list("pk", "password")[:options["batch_size"]])
+                if not batch:
+                    break
+                last_pk = batch[-1][0]
+                # the slow part runs outside the transaction; rows stay unlocked while hashing
+                encoded = dict(zip(
+                    (pk for pk, _ in batch),
+                    pool.map(lambda row: hasher.encode_md5_hash(row[1], hasher.salt()), batch),
+                ))
+                done = self.write(dict(batch), encoded)
+                wrapped += done
+                skipped += len(batch) - done
+                self.stderr.write(f"  up to user {last_pk}: {wrapped} wrapped")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrapped {wrapped} MD5 hashes in {elapsed:.1f}s"
+            + (f" ({skipped} changed meanwhile and were left alone)" if skipped else "")
+        ))
+
+    @staticmethod
+    def write(old, encoded) -> int:
+        """Store the wrapped hashes of users whose hash is still the MD5 that was read."""
+        with transaction.atomic():
+            users = list(User.objects.select_for_update().filter(pk__in=list(old)).only("pk", "password"))
+            users = [user for user in users if user.password == old[user.pk]]
+            for user in users:
+                user.password = encoded[user.pk]
+            User.objects.bulk_update(users, ["password"])
+        return len(users)
@@ -0,0 +1,205 @@
+"""
+OD form → unit matching.
+
+Candidates are vacant units whose floor area falls inside the form's size
+range widened by TOLERANCE, and whose rent/price per sqm can still fit the
+budget; both checks are range conditions on the indexed shadow columns
+(numbers.py). Survivors are scored in the same query:
+
+    size      1.0 inside [min, max], else area/min or max/area
+    budget    1.0 if the total (rate × GFA) is within budget_maximum,
+              else budget/total; 0.5 when the unit has no usable price
+    location  1.0 if the building city or barangay is one of the
+              preferred locations
+
+score = 40·size + 40·budget + 20·location (0–100). The budget is compared to
+the monthly total for `rent`, the price for `buy`, and the better of the two
+for `both`. A criterion the form leaves blank scores 1.0.
+
+pt_odform_matches records every (active form, fitting unit) pair, up to
+STORED_LIMIT per form: `manage.py rematch_odforms` and OD form saves fill it
+per form, unit saves per unit (odform_index.py). /api/odforms/{id}/matches/
+scores live.
+"""
+import re
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast, Greatest
+from django.utils import timezone
+
+from .models import ODForm, ODFormMatch, Unit
+
+TOLERANCE = Decimal('0.25')
+WEIGHTS = {'size': 40, 'budget': 40, 'location': 20}
+VACANT_STATUSES = ('vacant', 'available')
+DEFAULT_LIMIT = 20
+STORED_LIMIT = 500
+
+_LOCATION_SPLIT = re.compile(r'[,;/]|\bor\b', re.IGNORECASE)
+
+
+def _as_float(lookup):
+    return Cast(lookup, FloatField())
+
+
+def _vacant():
+    return reduce(or_, (Q(vacancy_status__iexact=status) for status in VACANT_STATUSES))
+
+
+def _size(form):
+    """(fit expression, prefilter)"""
+    low, high = form.size_minimum, form.size_maximum
+    whens, window = [], Q()
+    if low:
+        window &= Q(numbers__gross_floor_area__gte=low * (1 - TOLERANCE))
+        whens.append(When(numbers__gross_floor_area__lt=low, then=F('area') / Value(float(low))))
+    if high:
+        window &= Q(numbers__gross_floor_area__lte=high * (1 + TOLERANCE))
+        whens.append(When(numbers__gross_floor_area__gt=high, then=Value(float(high)) / F('area')))
+    return Case(*whens, default=Value(1.0), output_field=FloatField()), window
+
+
+def _budget(form):
+    budget = form.budget_maximum
+    if not budget:
+        return Value(1.0, output_field=FloatField()), Q()
+
+    def fit(total):
+        return Case(
+            When(**{f'{total}__isnull': True}, then=Value(0.5)),
+            When(**{f'{total}__lte': float(budget)}, then=Value(1.0)),
+            default=Value(float(budget)) / F(total),
+            output_field=FloatField(),
+        )
+
+    def affordable(rate):
+        # rate × area >= rate × smallest acceptable area, so this bound never drops a fit
+        if not form.size_minimum:
+            return Q()
+        ceiling = budget * (1 + TOLERANCE) / (form.size_minimum * (1 - TOLERANCE))
+        return Q(**{f'numbers__{rate}__lte': ceiling}) | Q(**{f'numbers__{rate}__isnull': True})
+
+    if form.intent == 'rent':
+        return fit('rent_total'), affordable('asking_rent')
+    if form.intent == 'buy':
+        return fit('sale_total'), affordable('sale_price_office')
+    return Greatest(fit('rent_total'), fit('sale_total')), affordable('asking_rent') | affordable('sale_price_office')
+
+
+def _location(form):
+    places = split_locations(form.preferred_location)
+    if not places:
+        return Value(1.0, output_field=FloatField())
+    near = reduce(or_, (
+        Q(building__address_city__iexact=p) | Q(building__address_brgy__iexact=p) for p in places
+    ))
+    return Case(When(near, then=Value(1.0)), default=Value(0.0), output_field=FloatField())
+
+
+def split_locations(text) -> list[str]:
+    return [p.strip() for p in _LOCATION_SPLIT.split(text or '') if p.strip()]
+
+
+def score_unit(form, area, rent, sale, places):
+    """
+    Python twin of candidates() for one vacant unit, used by the reverse
+    matcher. `form` needs the ODForm range/intent attributes; `places` is
+    the unit's (city, barangay). Returns None outside the form's windows,
+    else (score, {size, budget, location}).
+    """
+    low, high, budget = form.size_minimum, form.size_maximum, form.budget_maximum
+    if (low or high) and area is None:
+        return None
+    if low and area < low * (1 - TOLERANCE) or high and area > high * (1 + TOLERANCE):
+        return None
+
+    rates = {'rent': [rent], 'buy': [sale]}.get(form.intent, [rent, sale])
+    if budget and low:
+        ceiling = budget * (1 + TOLERANCE) / (low * (1 - TOLERANCE))
+        if not any(rate is None or rate <= ceiling for rate in rates):
+            return None
+
+    if low and area < low:
+        size = float(area) / float(low)
+    elif high and area > high:
+        size = float(high) / float(area)
+    else:
+        size = 1.0
+
+    def budget_fit(rate):
+        if rate is None or area is None:
+            return 0.5
+        total = float(rate) * float(area)
+        return 1.0 if total <= budget else float(budget) / total
+
+    budget_score = max(budget_fit(rate) for rate in rates) if budget else 1.0
+
+    wanted = {p.casefold() for p in split_locations(form.preferred_location)}
+    location = 1.0 if not wanted or wanted & {(p or '').casefold() for p in places} else 0.0
+
+    fits = {'size': size, 'budget': budget_score, 'location': location}
+    return sum(WEIGHTS[k] * v for k, v in fits.items()), fits
+
+
+def candidates(form: ODForm):
+    """Vacant units for `form`, annotated with the fit components and `score`, best first."""
+    size_fit, size_window = _size(form)
+    budget_fit, budget_window = _budget(form)
+
+    return (
+        Unit.objects
+        .select_related('building', 'numbers')
+        .filter(_vacant(), size_window, budget_window)
+        .annotate(area=_as_float('numbers__gross_floor_area'))
+        .annotate(
+            rent_total=_as_float('numbers__asking_rent') * F('area'),
+            sale_total=_as_float('numbers__sale_price_office') * F('area'),
+        )
+        .annotate(size_fit=size_fit, budget_fit=budget_fit, location_fit=_location(form))
+        .annotate(score=(
+            F('size_fit') * WEIGHTS['size']
+            + F('budget_fit') * WEIGHTS['budget']
+            + F('location_fit') * WEIGHTS['location']
+        ))
+        .order_by('-score', 'pk')
+    )
+
+
+def top_matches(form: ODForm, limit: int = DEFAULT_LIMIT):
+    return list(candidates(form)[:limit])
+
+
+def describe(unit) -> dict:
+    numbers = getattr(unit, 'numbers', None)
+    return {
+        'unit': unit.pk,
+        'name': unit.name,
+        'building': unit.building_id,
+        'building_name': unit.building.name,
+        'city': unit.building.address_city,
+        'gross_floor_area': numbers.gross_floor_area if numbers else None,
+        'asking_rent': numbers.asking_rent if numbers else None,
+        'sale_price_office': numbers.sale_price_office if numbers else None,
+        'score': round(unit.score, 1),
+        'fit': {
+            'size': round(unit.size_fit, 3),
+            'budget': round(unit.budget_fit, 3),
+            'location': round(unit.location_fit, 3),
+        },
+    }
+
+
+def store(form: ODForm, limit: int = STORED_LIMIT) -> int:
+    """Replace the stored matches of one form with its current top `limit`."""
+    units = top_matches(form, limit) if form.status == 'active' else []
+    matched_at = timezone.now()
+    with transaction.atomic():
+        ODFormMatch.objects.filter(od_form=form).delete()
+        ODFormMatch.objects.bulk_create([
+            ODFormMatch(od_form=form, unit=u, score=round(u.score, 2), matched_at=matched_at) for u in units
+        ])
+    return len(units)
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+# ────────────────────────────
+#  Lease-date indexes on pt_units
+#    • expiry queries filter unit_lease_end by range (dashboard, calendar)
+#    • building_id rides along so per-building windows stay in the index
+# ────────────────────────────
+CREATE_SQL = [
+    "CREATE INDEX pt_units_lease_end_idx ON pt_units (unit_lease_end, building_id);",
+    "CREATE INDEX pt_units_lease_start_idx ON pt_units (unit_lease_start);",
+]
+
+DROP_SQL = [
+    "DROP INDEX pt_units_lease_start_idx ON pt_units;",
+    "DROP INDEX pt_units_lease_end_idx ON pt_units;",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pronovetai_app", "0010_pt_building_logs"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=CREATE_SQL, reverse_sql=DROP_SQL),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+# ────────────────────────────
+#  FULLTEXT indexes for /api/search/ and ?search=
+#    column lists must match search.FULLTEXT_FIELDS exactly,
+#    otherwise MySQL refuses MATCH ... AGAINST
+# ────────────────────────────
+CREATE_SQL = [
+    """
+    CREATE FULLTEXT INDEX pt_buildings_search_ft ON pt_buildings (
+        building_name, building_address_street, building_address_brgy,
+        building_address_city, building_notes
+    );
+    """,
+    """
+    CREATE FULLTEXT INDEX pt_companies_search_ft ON pt_companies (
+        company_name, company_industry, company_address_bldg,
+        company_address_street, company_address_brgy, company_address_city
+    );
+    """,
+    """
+    CREATE FULLTEXT INDEX pt_contacts_search_ft ON pt_contacts (
+        contact_first_name, contact_last_name, contact_email, contact_notes
+    );
+    """,
+    "CREATE FULLTEXT INDEX pt_units_search_ft ON pt_units (unit_name, unit_notes);",
+]
+
+DROP_SQL = [
+    "DROP INDEX pt_units_search_ft ON pt_units;",
+    "DROP INDEX pt_contacts_search_ft ON pt_contacts;",
+    "DROP INDEX pt_companies_search_ft ON pt_companies;",
+    "DROP INDEX pt_buildings_search_ft ON pt_buildings;",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pronovetai_app", "0011_pt_units_lease_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=CREATE_SQL, reverse_sql=DROP_SQL),
+    ]
@@ -0,0 +1,65 @@
+from django.db import migrations
+
+# ────────────────────────────
+#  Numeric shadow tables for the free-text rent / price / area varchars
+#    • one row per building / unit, PK = the legacy id
+#    • filled by `manage.py backfill_numbers`, kept current by numbers.py
+# ────────────────────────────
+CREATE_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS `pt_building_numbers` (
+      `building_id` BIGINT NOT NULL,
+      `office_rent` DECIMAL(16,2) NULL,
+      `rent_1` DECIMAL(16,2) NULL,
+      `rent_2` DECIMAL(16,2) NULL,
+      `sale_price_php` DECIMAL(16,2) NULL,
+      `lot_area` DECIMAL(16,2) NULL,
+      `assoc_dues` DECIMAL(16,2) NULL,
+      `gfa` DECIMAL(16,2) NULL,
+      `gla` DECIMAL(16,2) NULL,
+      PRIMARY KEY (`building_id`),
+      KEY `pt_building_numbers_office_rent` (`office_rent`),
+      KEY `pt_building_numbers_sale_price_php` (`sale_price_php`),
+      KEY `pt_building_numbers_lot_area` (`lot_area`),
+      KEY `pt_building_numbers_gfa` (`gfa`),
+      KEY `pt_building_numbers_gla` (`gla`),
+      CONSTRAINT `pt_building_numbers_building_fk`
+        FOREIGN KEY (`building_id`) REFERENCES `pt_buildings` (`building_id`) ON DELETE CASCADE
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS `pt_unit_numbers` (
+      `unit_id` BIGINT NOT NULL,
+      `asking_rent` DECIMAL(16,2) NULL,
+      `price_per_parking_slot` DECIMAL(16,2) NULL,
+      `sale_price_office` DECIMAL(16,2) NULL,
+      `sale_price_parking` DECIMAL(16,2) NULL,
+      `dues` DECIMAL(16,2) NULL,
+      `gross_floor_area` DECIMAL(16,2) NULL,
+      `net_floor_area` DECIMAL(16,2) NULL,
+      PRIMARY KEY (`unit_id`),
+      KEY `pt_unit_numbers_asking_rent` (`asking_rent`),
+      KEY `pt_unit_numbers_sale_price_office` (`sale_price_office`),
+      KEY `pt_unit_numbers_gross_floor_area` (`gross_floor_area`),
+      KEY `pt_unit_numbers_net_floor_area` (`net_floor_area`),
+      CONSTRAINT `pt_unit_numbers_unit_fk`
+        FOREIGN KEY (`unit_id`) REFERENCES `pt_units` (`unit_id`) ON DELETE CASCADE
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+]
+
+DROP_SQL = [
+    "DROP TABLE IF EXISTS `pt_unit_numbers`;",
+    "DROP TABLE IF EXISTS `pt_building_numbers`;",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pronovetai_app", "0012_fulltext_search_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=CREATE_SQL, reverse_sql=DROP_SQL),
+    ]
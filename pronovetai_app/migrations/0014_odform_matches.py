@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# ────────────────────────────
+#  pt_odform_matches: stored top units per OD form (matching.py)
+#    • od_form_id: INT    (matches pt_od_forms.od_form_id)
+#    • unit_id   : BIGINT (matches pt_units.unit_id)
+# ────────────────────────────
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS `pt_odform_matches` (
+  `id` BIGINT NOT NULL AUTO_INCREMENT,
+  `od_form_id` INT NOT NULL,
+  `unit_id` BIGINT NOT NULL,
+  `score` DECIMAL(5,2) NOT NULL,
+  `matched_at` DATETIME NOT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `pt_odform_matches_form_unit` (`od_form_id`, `unit_id`),
+  KEY `pt_odform_matches_unit_score` (`unit_id`, `score`),
+  CONSTRAINT `pt_odform_matches_od_form_fk`
+    FOREIGN KEY (`od_form_id`) REFERENCES `pt_od_forms` (`od_form_id`) ON DELETE CASCADE,
+  CONSTRAINT `pt_odform_matches_unit_fk`
+    FOREIGN KEY (`unit_id`) REFERENCES `pt_units` (`unit_id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+"""
+
+DROP_SQL = "DROP TABLE IF EXISTS `pt_odform_matches`;"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pronovetai_app", "0013_numeric_shadow_tables"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=CREATE_SQL, reverse_sql=DROP_SQL),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+# ────────────────────────────
+#  Indexes on the simplejwt token tables
+#    • prune_tokens deletes by expires_at
+#    • denylist.py reads new blacklist entries by blacklisted_at
+# ────────────────────────────
+CREATE_SQL = [
+    "CREATE INDEX token_blacklist_outstanding_expires_idx ON token_blacklist_outstandingtoken (expires_at);",
+    "CREATE INDEX token_blacklist_blacklisted_at_idx ON token_blacklist_blacklistedtoken (blacklisted_at);",
+]
+
+DROP_SQL = [
+    "DROP INDEX token_blacklist_blacklisted_at_idx ON token_blacklist_blacklistedtoken;",
+    "DROP INDEX token_blacklist_outstanding_expires_idx ON token_blacklist_outstandingtoken;",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pronovetai_app", "0014_odform_matches"),
+        ("token_blacklist", "0012_alter_outstandingtoken_user"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=CREATE_SQL, reverse_sql=DROP_SQL),
+    ]
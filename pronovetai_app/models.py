@@ -156,6 +156,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self) -> str:
         return self.username
 
+    def get_full_name(self) -> str:
+        return f"{self.first_name or ''} {self.last_name or ''}".strip()
+
 
 class UserLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="logs", db_column="user_id")
@@ -363,13 +366,13 @@ class Building(models.Model):
 
     @property
     def grade_desc(self) -> str | None:
-        row = BuildingGrade.objects.filter(code=self.grade).first()
-        return row.description if row else None
+        from .reference import building_grades
+        return building_grades.description(self.grade)
 
     @property
     def building_type_desc(self) -> str | None:
-        row = BuildingType.objects.filter(code=self.building_type).first()
-        return row.description if row else None
+        from .reference import building_types
+        return building_types.description(self.building_type)
 
 
 class BuildingLog(models.Model):
@@ -440,6 +443,11 @@ class Unit(models.Model):
     class Meta:
         db_table = "pt_units"
         managed = False
+        # created by migration 0011 (RunSQL, since the table is unmanaged)
+        indexes = [
+            models.Index(fields=["lease_expiry_date", "building"], name="pt_units_lease_end_idx"),
+            models.Index(fields=["lease_commencement_date"], name="pt_units_lease_start_idx"),
+        ]
 
     def clean(self):
         if self.net_floor_area and self.gross_floor_area and self.net_floor_area > self.gross_floor_area:
@@ -455,6 +463,44 @@ class Unit(models.Model):
         return f"{self.name} ({self.building.name})"
 
 
+# Parsed copies of the free-text money/area varchars, one row per building/unit,
+# so range filters and sorts run in SQL. Maintained by numbers.py (save hook,
+# imports, `manage.py backfill_numbers`); field names mirror the source fields.
+class BuildingNumbers(models.Model):
+    building = models.OneToOneField(
+        Building, primary_key=True, on_delete=models.CASCADE, related_name="numbers", db_column="building_id"
+    )
+    office_rent = models.DecimalField(max_digits=16, decimal_places=2, null=True, db_index=True)
+    rent_1 = models.DecimalField(max_digits=16, decimal_places=2, null=True)
+    rent_2 = models.DecimalField(max_digits=16, decimal_places=2, null=True)
+    sale_price_php = models.DecimalField(max_digits=16, decimal_places=2, null=True, db_index=True)
+    lot_area = models.DecimalField(max_digits=16, decimal_places=2, null=True, db_index=True)
+    assoc_dues = models.DecimalField(max_digits=16, decimal_places=2, null=True)
+    gfa = models.DecimalField(max_digits=16, decimal_places=2, null=True, db_index=True)
+    gla = models.DecimalField(max_digits=16, decimal_places=2, null=True, db_index=True)
+
+    class Meta:
+        db_table = "pt_building_numbers"
+        managed = False
+
+
+class UnitNumbers(models.Model):
+    unit = models.OneToOneField(
+        Unit, primary_key=True, on_delete=models.CASCADE, related_name="numbers", db_column="unit_id"
+    )
+    asking_rent = models.DecimalField(max_digits=16, decimal_places=2, null=True, db_index=True)
+    price_per_parking_slot = models.DecimalField(max_digits=16, decimal_places=2, null=True)
+    sale_price_office = models.DecimalField(max_digits=16, decimal_places=2, null=True, db_index=True)
+    sale_price_parking = models.DecimalField(max_digits=16, decimal_places=2, null=True)
+    dues = models.DecimalField(max_digits=16, decimal_places=2, null=True)
+    gross_floor_area = models.DecimalField(max_digits=16, decimal_places=2, null=True, db_index=True)
+    net_floor_area = models.DecimalField(max_digits=16, decimal_places=2, null=True, db_index=True)
+
+    class Meta:
+        db_table = "pt_unit_numbers"
+        managed = False
+
+
 # -----------------------------------------------------------------------------
 # OD Forms (unchanged except for safety)
 # -----------------------------------------------------------------------------
@@ -546,6 +592,21 @@ class ODForm(models.Model):
         return f"OD Form {self.id} – {self.contact}"
 
 
+class ODFormMatch(models.Model):
+    """Stored top units for an OD form (see matching.py)."""
+    id = models.BigAutoField(primary_key=True)
+    od_form = models.ForeignKey(ODForm, on_delete=models.CASCADE, related_name="matches", db_column="od_form_id")
+    unit = models.ForeignKey(Unit, on_delete=models.CASCADE, related_name="od_form_matches", db_column="unit_id")
+    score = models.DecimalField(max_digits=5, decimal_places=2)
+    matched_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "pt_odform_matches"
+        managed = False
+        ordering = ["-score"]
+        constraints = [models.UniqueConstraint(fields=["od_form", "unit"], name="pt_odform_matches_form_unit")]
+
+
 # -----------------------------------------------------------------------------
 # Generic notes/images + dedicated image tables
 # -----------------------------------------------------------------------------
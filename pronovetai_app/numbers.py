@@ -0,0 +1,83 @@
+"""
+Numeric shadow rows for the free-text money/area columns.
+
+pt_buildings / pt_units keep rents, prices and areas as varchars ("PHP 850/sqm",
+"1,200.50"), which MySQL can neither range-filter nor sort numerically. The
+side tables pt_building_numbers / pt_unit_numbers hold the parsed values
+(same rules as BlankZeroDecimalField), indexed, one row per record.
+
+Rows are written by the post_save hook in signals.py, after each import batch,
+and in bulk by `manage.py backfill_numbers`.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db import connections
+
+from .fields import parse_legacy_decimal
+from .models import Building, BuildingNumbers, Unit, UnitNumbers
+
+SHADOWS = {Building: BuildingNumbers, Unit: UnitNumbers}
+
+_CENTS = Decimal('0.01')
+
+
+def source_fields(model) -> list[str]:
+    """Field names shared by the model and its shadow (the shadow mirrors them)."""
+    shadow = SHADOWS[model]
+    return [f.name for f in shadow._meta.concrete_fields if not f.primary_key]
+
+
+def to_number(value, max_digits=16):
+    if value in ('', None):
+        return None
+    parsed = value if isinstance(value, Decimal) else parse_legacy_decimal(str(value).strip())
+    if parsed is None:
+        return None
+    try:
+        parsed = parsed.quantize(_CENTS)
+    except InvalidOperation:
+        return None
+    # anything too wide for DECIMAL(16,2) is junk ("1e40"), not a price
+    return parsed if len(parsed.as_tuple().digits) <= max_digits else None
+
+
+def _shadow(model, pk, values):
+    shadow = SHADOWS[model]
+    return shadow(pk=pk, **{name: to_number(v) for name, v in zip(source_fields(model), values)})
+
+
+def _upsert(model, rows, batch_size=1000):
+    shadow = SHADOWS[model]
+    options = {'update_conflicts': True, 'update_fields': source_fields(model), 'batch_size': batch_size}
+    if connections[shadow.objects.db].features.supports_update_conflicts_with_target:
+        options['unique_fields'] = [shadow._meta.pk.name]
+    shadow.objects.bulk_create(rows, **options)
+
+
+def sync(instance) -> None:
+    """Upsert the shadow row for one saved Building/Unit (one query)."""
+    model = type(instance)
+    values = [getattr(instance, name) for name in source_fields(model)]
+    _upsert(model, [_shadow(model, instance.pk, values)])
+
+
+def refresh(model, queryset=None, batch_size=1000) -> int:
+    """Recompute shadow rows for `queryset` (default: every row). Returns rows written."""
+    queryset = model.objects.all() if queryset is None else queryset
+    rows = queryset.values_list('pk', *source_fields(model)).order_by().iterator(chunk_size=batch_size)
+
+    written, batch = 0, []
+    for pk, *values in rows:
+        batch.append(_shadow(model, pk, values))
+        if len(batch) == batch_size:
+            _upsert(model, batch, batch_size)
+            written, batch = written + len(batch), []
+    if batch:
+        _upsert(model, batch, batch_size)
+        written += len(batch)
+    return written
+
+
+def refresh_missing(model, batch_size=1000) -> int:
+    """Fill in records that have no shadow row yet (bulk_create, raw SQL, legacy app)."""
+    return refresh(model, model.objects.filter(numbers__isnull=True), batch_size)
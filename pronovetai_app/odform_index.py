@@ -0,0 +1,158 @@
+"""
+Reverse matching: which active OD forms does this unit fit?
+
+Active forms are held in a centered interval tree over their size windows
+(size range widened by matching.TOLERANCE), so a unit save finds the forms
+whose window contains its floor area in O(log n + k) instead of scoring
+every form. The k hits are then checked and scored in Python with
+matching.score_unit(), the twin of the SQL scorer, and written to
+pt_odform_matches.
+
+Like the company autocomplete index, the tree loads once per process and
+reloads when the shared version key in the cache moves; OD form saves and
+deletes bump it (signals.py).
+"""
+import math
+import threading
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from . import matching, numbers
+from .models import ODForm, ODFormMatch
+
+VERSION_KEY = 'matching:odform:version'
+
+FormTerms = namedtuple(
+    'FormTerms', 'pk size_minimum size_maximum budget_maximum intent preferred_location'
+)
+
+
+class IntervalTree:
+    """Static centered interval tree of (low, high, value); stab(x) yields every value with low <= x <= high."""
+
+    __slots__ = ('center', 'by_low', 'by_high', 'left', 'right')
+
+    def __init__(self, intervals):
+        lows_highs = sorted(v for low, high, _ in intervals for v in (low, high) if math.isfinite(v))
+        self.center = lows_highs[len(lows_highs) // 2] if lows_highs else 0.0
+
+        here, left, right = [], [], []
+        for item in intervals:
+            low, high, _ = item
+            if high < self.center:
+                left.append(item)
+            elif low > self.center:
+                right.append(item)
+            else:
+                here.append(item)
+        self.by_low = sorted(here, key=lambda i: i[0])
+        self.by_high = sorted(here, key=lambda i: -i[1])
+        self.left = IntervalTree(left) if left else None
+        self.right = IntervalTree(right) if right else None
+
+    def stab(self, x):
+        node = self
+        while node is not None:
+            if x < node.center:
+                for low, _, value in node.by_low:
+                    if low > x:
+                        break
+                    yield value
+                node = node.left
+            else:
+                for _, high, value in node.by_high:
+                    if high < x:
+                        break
+                    yield value
+                node = node.right if x > node.center else None
+
+
+class ODFormIndex:
+    def __init__(self, queryset):
+        self.queryset = queryset
+        self._lock = threading.RLock()
+        self._tree = None
+        self._open = []  # forms with no size range: every unit is in their window
+        self._version = None
+
+    def rebuild(self):
+        # read before the forms: one committed while they load moves the
+        # version past this one, so the next lookup reloads
+        version = cache.get_or_set(VERSION_KEY, 0, timeout=None)
+        bounded, open_ = [], []
+        fields = FormTerms._fields
+        for row in self.queryset.values_list(*fields):
+            form = FormTerms(*row)
+            low, high = form.size_minimum, form.size_maximum
+            if not low and not high:
+                open_.append(form)
+                continue
+            bounded.append((
+                float(low * (1 - matching.TOLERANCE)) if low else -math.inf,
+                float(high * (1 + matching.TOLERANCE)) if high else math.inf,
+                form,
+            ))
+        tree = IntervalTree(bounded) if bounded else None
+        with self._lock:
+            self._tree, self._open = tree, open_
+            self._version = version
+
+    def _ensure_current(self):
+        if self._version is None or cache.get(VERSION_KEY) != self._version:
+            self.rebuild()
+
+    def invalidate(self):
+        """Called after an OD form changes; every process reloads on its next lookup."""
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.set(VERSION_KEY, 0, timeout=None)
+        with self._lock:
+            self._version = None
+
+    def forms_for_area(self, area) -> list[FormTerms]:
+        self._ensure_current()
+        with self._lock:
+            hits = list(self._open)
+            if area is not None and self._tree is not None:
+                hits.extend(self._tree.stab(float(area)))
+            return hits
+
+
+active_forms = ODFormIndex(ODForm.objects.filter(status='active'))
+
+
+def _is_vacant(unit) -> bool:
+    return (unit.vacancy_status or '').strip().casefold() in matching.VACANT_STATUSES
+
+
+def rematch_units(units) -> int:
+    """Replace the stored matches of `units` (Unit instances, building loaded). Returns rows written."""
+    units = list(units)
+    if not units:
+        return 0
+
+    matched_at, rows = timezone.now(), []
+    for unit in units:
+        if not _is_vacant(unit):
+            continue
+        area = numbers.to_number(unit.gross_floor_area)
+        rent, sale = numbers.to_number(unit.asking_rent), numbers.to_number(unit.sale_price_office)
+        places = (unit.building.address_city, unit.building.address_brgy)
+        for form in active_forms.forms_for_area(area):
+            hit = matching.score_unit(form, area, rent, sale, places)
+            if hit is not None:
+                rows.append(ODFormMatch(od_form_id=form.pk, unit=unit, score=round(hit[0], 2),
+                                        matched_at=matched_at))
+
+    with transaction.atomic():
+        ODFormMatch.objects.filter(unit__in=units).delete()
+        ODFormMatch.objects.bulk_create(rows)
+    return len(rows)
+
+
+def rematch_unit(unit) -> int:
+    return rematch_units([unit])
@@ -0,0 +1,164 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .filters import is_datatables_request, datatables_search_value
+
+
+class DataTablesPagination(PageNumberPagination):
+    """
+    Plain clients page with `?page=&page_size=` and get the usual
+    {count, next, previous, results}.
+
+    DataTables (serverSide: true) sends `draw`, `start` and `length` and gets
+    {draw, recordsTotal, recordsFiltered, data} back, sliced in SQL.
+    """
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.datatables = is_datatables_request(request)
+        if not self.datatables:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.draw = self._int_param(request, 'draw', 0)
+        start = self._int_param(request, 'start', 0)
+        # length=-1 ("show all") is capped like any other oversized page
+        length = min(self._int_param(request, 'length', 0) or self.max_page_size, self.max_page_size)
+
+        self.records_filtered = queryset.count()
+        if view is not None and datatables_search_value(request):
+            self.records_total = view.get_queryset().count()
+        else:
+            self.records_total = self.records_filtered
+        return list(queryset[start:start + length])
+
+    def get_paginated_response(self, data):
+        if not self.datatables:
+            return super().get_paginated_response(data)
+        return Response({
+            'draw': self.draw,
+            'recordsTotal': self.records_total,
+            'recordsFiltered': self.records_filtered,
+            'data': data,
+        })
+
+    @staticmethod
+    def _int_param(request, name, default):
+        try:
+            return _positive_int(request.query_params[name])
+        except (KeyError, ValueError):
+            return default
+
+
+class KeysetPagination(BasePagination):
+    """
+    Seek pagination on a unique ordering such as (timestamp, id) or pk.
+
+    Each page is `WHERE (keyset) < (last row) ORDER BY keyset LIMIT n+1`, so
+    page N costs the same as page 1 and no COUNT(*) is issued. The view picks
+    the keyset with a `keyset` attribute; it must end in a unique column.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    keyset = ('-pk',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        keyset = getattr(view, 'keyset', self.keyset)
+        self.fields = [(term.lstrip('-'), term.startswith('-')) for term in keyset]
+
+        queryset = queryset.order_by(*keyset)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self._after(position))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.last_position = [getattr(rows[-1], name) for name, _ in self.fields] if rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(request.query_params[self.page_size_query_param],
+                                 strict=True, cutoff=self.max_page_size)
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last_position))
+
+    def _after(self, position):
+        """(a, b) > (x, y)  ≡  a > x OR (a = x AND b > y), per-column direction."""
+        condition = Q()
+        for i, (name, descending) in enumerate(self.fields):
+            step = Q(**{f'{name}__lt' if descending else f'{name}__gt': position[i]})
+            for j in range(i):
+                step &= Q(**{self.fields[j][0]: position[j]})
+            condition |= step
+        return condition
+
+    @staticmethod
+    def encode_cursor(position):
+        raw = json.dumps([v.isoformat() if hasattr(v, 'isoformat') else str(v) for v in position])
+        return urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(urlsafe_b64decode(encoded.encode()).decode())
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError
+            opts = model._meta
+            return [
+                (opts.pk if name == 'pk' else opts.get_field(name)).to_python(value)
+                for (name, _), value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, ValidationError, binascii.Error, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class OptionalKeysetPagination(DataTablesPagination):
+    """
+    DataTablesPagination by default; `?pagination=cursor` (and any `?cursor=`)
+    switches to KeysetPagination for infinite-scroll clients.
+    """
+    mode_query_param = 'pagination'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if (KeysetPagination.cursor_query_param in request.query_params
+                or request.query_params.get(self.mode_query_param) == 'cursor'):
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
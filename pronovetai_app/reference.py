@@ -0,0 +1,130 @@
+"""
+Process-local copies of the small lookup tables (building grades and types,
+user types), so resolving a code or id to its description is a dict lookup
+instead of a query per row.
+
+Each table is read whole and kept for REFERENCE_DATA_MAX_AGE seconds. Saves
+and deletes through Django drop this process's copy at once and, on commit,
+bump a version key in the shared cache, which every process reads at most
+once per VERSION_CHECK_INTERVAL (one cache read per request, not per row)
+and reloads when it moved. Rows written outside Django (legacy app, SQL
+console) show up within one max-age. With REFERENCE_DATA_SHARED set the rows
+themselves are also kept in Django's cache under that version, so a fresh
+worker loads them without touching MySQL.
+
+Codes are matched case-insensitively, as MySQL's collation on the code
+columns does.
+"""
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, CharField, Value, When
+
+from .models import BuildingGrade, BuildingType, UserType
+
+Row = namedtuple('Row', 'pk code description')
+
+# seconds between reads of the shared version key
+VERSION_CHECK_INTERVAL = 1.0
+
+
+def _code_key(code):
+    return code.casefold() if isinstance(code, str) else code
+
+
+def max_age() -> int:
+    return getattr(settings, 'REFERENCE_DATA_MAX_AGE', 300)
+
+
+def shared() -> bool:
+    return getattr(settings, 'REFERENCE_DATA_SHARED', False)
+
+
+class ReferenceTable:
+    def __init__(self, model, code_field=None):
+        self.model = model
+        self.code_field = code_field
+        self.version_key = f'reference:{model._meta.db_table}:version'
+        self._data = None  # (by_pk, by_code, version), swapped as a whole
+        self._expires = 0.0
+        self._check_at = 0.0
+
+    def _rows_key(self, version):
+        return f'reference:{self.model._meta.db_table}:rows:{version}'
+
+    def _query(self):
+        fields = ('pk', self.code_field or 'pk', 'description')
+        return [Row(*values) for values in self.model.objects.order_by('pk').values_list(*fields)]
+
+    def load(self):
+        version = cache.get_or_set(self.version_key, 0, timeout=None)
+        rows = cache.get(self._rows_key(version)) if shared() else None
+        if rows is None:
+            rows = self._query()
+            if shared():
+                cache.set(self._rows_key(version), rows, timeout=max_age())
+        by_code = {}
+        for row in rows:
+            by_code.setdefault(_code_key(row.code), row)  # duplicate codes: lowest id wins
+        self._data = {row.pk: row for row in rows}, by_code, version
+        now = time.monotonic()
+        self._expires = now + max_age()
+        self._check_at = now + VERSION_CHECK_INTERVAL
+        return self._data
+
+    def _current(self):
+        data = self._data
+        now = time.monotonic()
+        if data is None or now >= self._expires:
+            return self.load()
+        if now >= self._check_at:
+            # another process committed a write since our load
+            if cache.get(self.version_key) != data[2]:
+                return self.load()
+            self._check_at = now + VERSION_CHECK_INTERVAL
+        return data
+
+    def discard(self):
+        """Forget this process's copy; the next lookup reloads."""
+        self._data = None
+
+    def invalidate(self):
+        """After a committed write: make every process reload."""
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, 0, timeout=None)
+        self.discard()
+
+    # ── lookups ──────────────────────────────────────────────────────
+    def rows(self) -> list[Row]:
+        return list(self._current()[0].values())
+
+    def get(self, pk) -> Row | None:
+        return self._current()[0].get(pk)
+
+    def description(self, code) -> str | None:
+        """Description for a code (or the pk, for tables without one)."""
+        if code is None:
+            return None
+        row = self._current()[1].get(_code_key(code))
+        return row.description if row else None
+
+    def codes_by_description(self) -> dict[str, str]:
+        """{description.lower(): code}, for reading exported files back in."""
+        return {row.description.lower(): row.code for row in reversed(self.rows())}
+
+    def description_expression(self, code_field):
+        """SQL CASE mapping `code_field` to its description, for ordering and exports."""
+        whens = [When(**{f'{code_field}__iexact': row.code}, then=Value(row.description))
+                 for row in self._current()[1].values()]
+        return Case(*whens, default=Value(None), output_field=CharField())
+
+
+building_grades = ReferenceTable(BuildingGrade, code_field='code')
+building_types = ReferenceTable(BuildingType, code_field='code')
+user_types = ReferenceTable(UserType)
+
+TABLES = {table.model: table for table in (building_grades, building_types, user_types)}
@@ -0,0 +1,147 @@
+"""
+Cross-table search for typeahead and the `?search=` filter.
+
+On MySQL the queries use the FULLTEXT indexes created by migration 0012
+(MATCH ... AGAINST in boolean mode, every word required, prefix-matched).
+Terms shorter than InnoDB's minimum token size, or any other database
+backend, fall back to `icontains` so results stay correct everywhere.
+SEARCH_FULLTEXT=0 forces the fallback, for a database without the indexes.
+"""
+import re
+from functools import reduce
+from operator import and_, or_
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, F, FloatField, Func, Q, Value, When
+from django.urls import reverse
+
+from .models import Building, Company, Contact, Unit
+
+# model -> columns of its FULLTEXT index; MATCH() must list exactly these
+FULLTEXT_FIELDS = {
+    Building: ('name', 'address_street', 'address_brgy', 'address_city', 'notes'),
+    Company: ('name', 'industry', 'address_bldg', 'address_street', 'address_brgy', 'address_city'),
+    Contact: ('first_name', 'last_name', 'email', 'notes'),
+    Unit: ('name', 'notes'),
+}
+
+# innodb_ft_min_token_size default; shorter words are not in the index
+MIN_TOKEN_SIZE = 3
+
+_BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]+')
+
+
+class Match(Func):
+    """MATCH (col, ...) AGAINST (%s IN BOOLEAN MODE) — MySQL only."""
+    template = 'MATCH (%(expressions)s) AGAINST (%(against)s IN BOOLEAN MODE)'
+    output_field = FloatField()
+
+    def __init__(self, *expressions, against):
+        super().__init__(*expressions)
+        self.against = against
+
+    def as_sql(self, compiler, connection, **extra_context):
+        extra_context['against'] = '%s'
+        sql, params = super().as_sql(compiler, connection, **extra_context)
+        return sql, (*params, self.against)
+
+
+def tokenize(text: str) -> list[str]:
+    return _BOOLEAN_OPERATORS.sub(' ', text).split()
+
+
+def fulltext_enabled() -> bool:
+    return getattr(settings, 'SEARCH_FULLTEXT', True)
+
+
+def fulltext_available(queryset, terms) -> bool:
+    return (
+        fulltext_enabled()
+        and connections[queryset.db].vendor == 'mysql'
+        and queryset.model in FULLTEXT_FIELDS
+        and bool(terms)
+        and all(len(t) >= MIN_TOKEN_SIZE for t in terms)
+    )
+
+
+def boolean_query(terms) -> str:
+    return ' '.join(f'+{t}*' for t in terms)
+
+
+def match(queryset, terms):
+    """Annotate `score` and keep matching rows, best first."""
+    model = queryset.model
+    fields = FULLTEXT_FIELDS[model]
+    if fulltext_available(queryset, terms):
+        columns = [F(name) for name in fields]
+        return (
+            queryset
+            .annotate(score=Match(*columns, against=boolean_query(terms)))
+            .filter(score__gt=0)
+            .order_by('-score')
+        )
+
+    # every term must hit some column; rows whose first column starts with
+    # the query rank above substring hits
+    condition = reduce(and_, (
+        reduce(or_, (Q(**{f'{name}__icontains': term}) for name in fields)) for term in terms
+    ))
+    return (
+        queryset
+        .filter(condition)
+        .annotate(score=Case(
+            When(**{f'{fields[0]}__istartswith': terms[0]}, then=Value(2.0)),
+            default=Value(1.0),
+            output_field=FloatField(),
+        ))
+        .order_by('-score', fields[0])
+    )
+
+
+# ── Typed results for /api/search/ ─────────────────────────────────────
+def _building(b):
+    return b.name, b.address
+
+
+def _company(c):
+    return c.name, c.industry or c.full_address
+
+
+def _contact(c):
+    return c.full_name or c.email or '', c.company.name if c.company else c.email
+
+
+def _unit(u):
+    return u.name, u.building.name
+
+
+SEARCH_TYPES = {
+    'building': (Building.objects.all(), _building, 'building-detail'),
+    'company': (Company.objects.all(), _company, 'company-detail'),
+    'contact': (Contact.objects.select_related('company'), _contact, 'contact-detail'),
+    'unit': (Unit.objects.select_related('building'), _unit, 'unit-detail'),
+}
+
+
+def search(text: str, types=None, limit: int = 10) -> list[dict]:
+    """Top `limit` hits per type, merged and ranked by score."""
+    terms = tokenize(text)
+    if not terms:
+        return []
+
+    hits = []
+    for kind in types or SEARCH_TYPES:
+        queryset, describe, route = SEARCH_TYPES[kind]
+        for obj in match(queryset, terms)[:limit]:
+            label, detail = describe(obj)
+            hits.append({
+                'type': kind,
+                'id': obj.pk,
+                'label': label,
+                'detail': detail or '',
+                'score': float(obj.score),
+                'url': reverse(route, args=[obj.pk]),
+            })
+    hits.sort(key=lambda h: -h['score'])
+    return hits
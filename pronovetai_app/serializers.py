@@ -10,13 +10,13 @@ from .models import (
     Company,
     Contact,
     Building,
-    BuildingType,
     BuildingImage,
     Unit,
     ODForm,
     UnitImage,
     BuildingLog,
 )
+from . import reference
 from decimal import InvalidOperation
 
 
@@ -97,12 +97,17 @@ class ManagerRegistrationSerializer(serializers.ModelSerializer):
 
 
 class UserSerializer(serializers.ModelSerializer):
-    user_type = UserTypeSerializer(read_only=True)
+    user_type = serializers.SerializerMethodField()
 
     class Meta:
         model = User
         fields = ["id", "username", "email", "first_name", "last_name", "date_joined", "user_type"]
 
+    def get_user_type(self, obj):
+        # same shape as UserTypeSerializer, read from reference.py instead of a join
+        row = reference.user_types.get(obj.user_type_id)
+        return {"id": row.pk, "description": row.description} if row else None
+
 
 class UserLogSerializer(serializers.ModelSerializer):
     class Meta:
@@ -224,7 +229,7 @@ class BuildingImageSerializer(serializers.ModelSerializer):
 
 class BuildingLogSerializer(serializers.ModelSerializer):
     user_display = serializers.SerializerMethodField()
-    building_id = serializers.IntegerField(source='building_id', read_only=True)
+    building_id = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = BuildingLog
@@ -237,8 +242,9 @@ class BuildingLogSerializer(serializers.ModelSerializer):
 
 
 class BuildingSerializer(serializers.ModelSerializer):
+    # descriptions come from the in-process lookup tables (reference.py)
     grade_desc = serializers.ReadOnlyField()
-    building_type_desc = serializers.SerializerMethodField()
+    building_type_desc = serializers.ReadOnlyField()
 
     # Image helpers: allow upload to pt_building_images and expose a URL back
     main_image = serializers.ImageField(write_only=True, required=False)
@@ -290,13 +296,15 @@ class BuildingSerializer(serializers.ModelSerializer):
             "main_image_url",
         ]
 
-    def get_building_type_desc(self, obj):
-        row = BuildingType.objects.filter(code=obj.building_type).first()
-        return row.description if row else None
-
     def get_main_image_url(self, obj):
-        img = obj.images.order_by("id").first()
-        return img.image.url if img and getattr(img.image, "url", None) else None
+        if hasattr(obj, "main_image_name"):
+            name = obj.main_image_name
+        else:
+            img = obj.images.order_by("id").first()
+            name = img.image.name if img else None
+        if not name:
+            return None
+        return BuildingImage._meta.get_field("image").storage.url(name)
 
     def create(self, validated_data):
         image = validated_data.pop("main_image", None)
@@ -1,9 +1,13 @@
-from django.db.models.signals import pre_delete
+from django.db import transaction
+from django.db.models.signals import pre_delete, post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from django.contrib.auth.hashers import make_password
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
 
-from .models import User, UserType, Company, ODForm
+from . import autocomplete, caching, counters, matching, numbers, odform_index, reference
+from .denylist import denylist
+from .models import User, UserType, Company, ODForm, Building, BuildingGrade, BuildingType, Unit
 
 
 def _default_usertype():
@@ -41,3 +45,102 @@ def reassign_user_fks(sender, instance: User, **kwargs):
     ODForm.objects.filter(created_by=instance).update(created_by=sentinel)
     ODForm.objects.filter(edited_by=instance).update(edited_by=sentinel)
     ODForm.objects.filter(account_manager=instance).update(account_manager=sentinel)
+
+
+# ── Dashboard counters ───────────────────────────────────────────────
+@receiver(post_save)
+def count_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and sender in counters.COUNTED_MODELS.values():
+        transaction.on_commit(lambda: counters.adjust(sender, 1))
+
+
+@receiver(post_delete)
+def count_deleted(sender, instance, **kwargs):
+    if sender in counters.COUNTED_MODELS.values():
+        transaction.on_commit(lambda: counters.adjust(sender, -1))
+
+
+# ── Company autocomplete index ──────────────────────────────────────
+@receiver(post_save, sender=Company)
+def index_company(sender, instance, raw=False, **kwargs):
+    if not raw:
+        pk, name = instance.pk, instance.name
+        transaction.on_commit(lambda: autocomplete.companies.upsert(pk, name))
+
+
+@receiver(post_delete, sender=Company)
+def unindex_company(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete.companies.remove(pk))
+
+
+# ── Lookup tables ───────────────────────────────────────────────────
+@receiver(post_save, sender=BuildingGrade)
+@receiver(post_save, sender=BuildingType)
+@receiver(post_save, sender=UserType)
+@receiver(post_delete, sender=BuildingGrade)
+@receiver(post_delete, sender=BuildingType)
+@receiver(post_delete, sender=UserType)
+def reload_reference_table(sender, **kwargs):
+    table = reference.TABLES[sender]
+    table.discard()  # this process sees its own write straight away
+    transaction.on_commit(table.invalidate)
+
+
+# ── Cache-aside namespaces (caching.py) ─────────────────────────────
+ASIDE_NAMESPACES = {Building: 'inventory', Unit: 'inventory', ODForm: 'odforms'}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_aside_namespace(sender, raw=False, **kwargs):
+    namespace = ASIDE_NAMESPACES.get(sender)
+    if namespace and not raw:
+        transaction.on_commit(lambda: caching.bump(namespace))
+
+
+# ── Numeric shadow rows ─────────────────────────────────────────────
+@receiver(post_save, sender=Building)
+@receiver(post_save, sender=Unit)
+def sync_numbers(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(numbers.source_fields(sender)):
+        return
+    numbers.sync(instance)
+
+
+# ── OD form matching ────────────────────────────────────────────────
+MATCHED_UNIT_FIELDS = {'vacancy_status', 'gross_floor_area', 'asking_rent', 'sale_price_office', 'building'}
+
+
+@receiver(post_save, sender=Unit)
+def rematch_unit(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not set(update_fields) & MATCHED_UNIT_FIELDS):
+        return
+    odform_index.rematch_unit(instance)
+
+
+@receiver(post_save, sender=ODForm)
+def rematch_odform(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(odform_index.active_forms.invalidate)
+        transaction.on_commit(lambda: matching.store(instance))
+
+
+@receiver(post_delete, sender=ODForm)
+def unindex_odform(sender, instance, **kwargs):
+    transaction.on_commit(odform_index.active_forms.invalidate)
+
+
+# ── Refresh-token denylist (denylist.py) ────────────────────────────
+@receiver(post_save, sender=BlacklistedToken)
+def denylist_token(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        jti = instance.token.jti
+
+        def publish():
+            denylist.add(jti)  # this process refuses it straight away
+            denylist.invalidate()
+
+        transaction.on_commit(publish)
@@ -0,0 +1,64 @@
+import re
+from importlib import import_module
+
+from django.apps import apps
+from django.db import connections
+from django.db.models.signals import post_migrate
+from django.test.runner import DiscoverRunner
+
+# RunSQL migrations whose indexes change query results, not just speed
+# (MATCH ... AGAINST fails without its FULLTEXT index), keyed by vendor
+RESULT_INDEX_MIGRATIONS = {
+    "mysql": ["pronovetai_app.migrations.0012_fulltext_search_indexes"],
+}
+
+_CREATE_INDEX = re.compile(r"CREATE\s+(?:\w+\s+)?INDEX\s+(\w+)\s+ON\s+(\w+)", re.IGNORECASE)
+
+
+def create_result_indexes(sender, using, **kwargs):
+    """post_migrate: syncdb skips RunSQL, so run their CREATE_SQL here (once, for --keepdb)."""
+    if sender.name != "pronovetai_app":
+        return
+    connection = connections[using]
+    statements = [
+        sql for path in RESULT_INDEX_MIGRATIONS.get(connection.vendor, [])
+        for sql in import_module(path).CREATE_SQL
+    ]
+    if not statements:
+        return
+    with connection.cursor() as cursor:
+        for sql in statements:
+            index, table = _CREATE_INDEX.search(sql).groups()
+            if index not in connection.introspection.get_constraints(cursor, table):
+                cursor.execute(sql)
+
+
+class UnmanagedModelTestRunner(DiscoverRunner):
+    """
+    The pt_* tables are owned by the legacy schema, so every model here is
+    `managed = False` and the test database would otherwise be empty.
+    Flip them to managed for the duration of the run so syncdb creates them.
+    The indexes in RESULT_INDEX_MIGRATIONS are added once the tables exist,
+    before any parallel clones are taken.
+    """
+
+    def setup_test_environment(self, *args, **kwargs):
+        self.unmanaged_models = [
+            m for m in apps.get_app_config("pronovetai_app").get_models(include_auto_created=True)
+            if not m._meta.managed
+        ]
+        for m in self.unmanaged_models:
+            m._meta.managed = True
+        super().setup_test_environment(*args, **kwargs)
+
+    def setup_databases(self, **kwargs):
+        post_migrate.connect(create_result_indexes, dispatch_uid="test_runner.create_result_indexes")
+        try:
+            return super().setup_databases(**kwargs)
+        finally:
+            post_migrate.disconnect(dispatch_uid="test_runner.create_result_indexes")
+
+    def teardown_test_environment(self, *args, **kwargs):
+        super().teardown_test_environment(*args, **kwargs)
+        for m in self.unmanaged_models:
+            m._meta.managed = False
@@ -1,3 +1,1651 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import queue
+import random
+import tempfile
+import threading
+import time
+import unittest
+import zipfile
+from unittest import mock
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
 
-# Create your tests here.
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import identify_hasher
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import (
+    User, UserType, UserLog, Address, Company, Building, BuildingGrade, BuildingType, BuildingImage,
+    BuildingLog, Unit, UnitNumbers, UnitImage, Contact, ODForm, ODFormMatch, Note, Image,
+)
+from . import urls as app_urls
+from . import (
+    auditlog, authentication, autocomplete, caching, counters, denylist, exports, fields, hashers, imports, instrumentation, legacy_backends, matching,
+    odform_index, reference, search,
+)
+from .benchmarks import portfolio, runner as bench
+from .fields import BlankZeroDecimalField, BlankZeroIntegerField
+
+
+def make_user(username="tester", **extra):
+    user_type = UserType.objects.first() or UserType.objects.create(
+        description="Administrator", created_at=timezone.now()
+    )
+    return User.objects.create_user(username, "pass1234", user_type=user_type, **extra)
+
+
+def make_building(name, **extra):
+    return Building.objects.create(name=name, marketing_status="active", **extra)
+
+
+class BuildingListQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user(is_staff=True)
+        BuildingGrade.objects.create(code="A", description="Grade A")
+        BuildingType.objects.create(code="OFC", description="Office")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def seed(self, count, offset=0):
+        for i in range(offset, offset + count):
+            b = make_building(f"Tower {i}", grade="A", building_type="OFC")
+            BuildingImage.objects.create(building=b, image=f"building_images/{i}-1.jpg")
+            BuildingImage.objects.create(building=b, image=f"building_images/{i}-2.jpg")
+
+    def test_list_runs_constant_queries(self):
+        # one COUNT(*) for the paginator, one SELECT for the page
+        self.seed(3)
+        with self.assertNumQueries(2):
+            small = self.client.get("/api/buildings/?page_size=100")
+        self.seed(20, offset=3)
+        with self.assertNumQueries(2):
+            large = self.client.get("/api/buildings/?page_size=100")
+
+        self.assertEqual(len(small.json()["results"]), 3)
+        self.assertEqual(len(large.json()["results"]), 23)
+
+    def test_list_resolves_descriptions_and_first_image(self):
+        self.seed(1)
+        make_building("Bare")
+
+        rows = {r["name"]: r for r in self.client.get("/api/buildings/").json()["results"]}
+
+        self.assertEqual(rows["Tower 0"]["grade_desc"], "Grade A")
+        self.assertEqual(rows["Tower 0"]["building_type_desc"], "Office")
+        self.assertTrue(rows["Tower 0"]["main_image_url"].endswith("building_images/0-1.jpg"))
+        self.assertIsNone(rows["Bare"]["grade_desc"])
+        self.assertIsNone(rows["Bare"]["main_image_url"])
+
+    def test_detail_matches_list(self):
+        self.seed(1)
+        b = Building.objects.get(name="Tower 0")
+
+        row = self.client.get(f"/api/buildings/{b.pk}/").json()
+
+        self.assertEqual(row["grade_desc"], "Grade A")
+        self.assertEqual(row["building_type_desc"], "Office")
+
+
+class ListPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user(is_staff=True)
+        for i, industry in enumerate(["Banking", "BPO", "Retail"] * 10):
+            Company.objects.create(name=f"Company {i:02d}", industry=industry)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_page_number_mode(self):
+        body = self.client.get("/api/companies/?page=2&page_size=10").json()
+
+        self.assertEqual(body["count"], 30)
+        self.assertEqual([r["name"] for r in body["results"]][:2], ["Company 10", "Company 11"])
+        self.assertIsNotNone(body["next"])
+
+    def test_plain_search_and_ordering(self):
+        body = self.client.get("/api/companies/?search=retail&ordering=-name").json()
+
+        self.assertEqual(body["count"], 10)
+        self.assertEqual(body["results"][0]["name"], "Company 29")
+
+    def test_datatables_protocol(self):
+        params = {
+            "draw": "3",
+            "start": "5",
+            "length": "5",
+            "columns[0][data]": "id",
+            "columns[1][data]": "name",
+            "order[0][column]": "1",
+            "order[0][dir]": "desc",
+            "search[value]": "bpo",
+        }
+        body = self.client.get("/api/companies/", params).json()
+
+        self.assertEqual(body["draw"], 3)
+        self.assertEqual(body["recordsTotal"], 30)
+        self.assertEqual(body["recordsFiltered"], 10)
+        self.assertEqual([r["name"] for r in body["data"]],
+                         ["Company 13", "Company 10", "Company 07", "Company 04", "Company 01"])
+
+    def test_datatables_length_is_capped(self):
+        body = self.client.get("/api/companies/", {"draw": "1", "start": "0", "length": "-1"}).json()
+
+        self.assertEqual(body["recordsFiltered"], 30)
+        self.assertEqual(len(body["data"]), 30)
+
+    def test_datatables_ignores_unknown_columns(self):
+        params = {"draw": "1", "columns[0][data]": "nope", "order[0][column]": "0", "order[0][dir]": "desc"}
+        body = self.client.get("/api/companies/", params).json()
+
+        self.assertEqual(body["data"][0]["name"], "Company 00")
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        cls.building = make_building("Tower")
+        Unit.objects.bulk_create(Unit(name=f"U{i}", building=cls.building) for i in range(7))
+
+        # several logs share a timestamp, so the id tie-breaker matters
+        base = timezone.now().replace(microsecond=0)
+        for i in range(7):
+            log = UserLog.objects.create(user=cls.user, message=f"log {i}")
+            UserLog.objects.filter(pk=log.pk).update(timestamp=base - timedelta(minutes=i // 3))
+            BuildingLog.objects.create(building=cls.building, user=cls.user, message=f"log {i}",
+                                       timestamp=base - timedelta(minutes=i // 3))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk(self, url):
+        seen, pages = [], 0
+        while url:
+            body = self.client.get(url).json()
+            seen += [r["id"] for r in body["results"]]
+            url, pages = body["next"], pages + 1
+        return seen, pages
+
+    def test_units_walk_by_primary_key(self):
+        seen, pages = self.walk("/api/units/?pagination=cursor&page_size=3")
+
+        self.assertEqual(seen, list(Unit.objects.order_by("pk").values_list("pk", flat=True)))
+        self.assertEqual(pages, 3)
+
+    def test_user_logs_walk_by_timestamp_then_id(self):
+        seen, _ = self.walk("/api/users/me/logs/?pagination=cursor&page_size=2")
+
+        expected = UserLog.objects.order_by("-timestamp", "-id").values_list("pk", flat=True)
+        self.assertEqual(seen, list(expected))
+
+    def test_building_logs_walk(self):
+        seen, _ = self.walk(f"/api/buildings/{self.building.pk}/logs/?pagination=cursor&page_size=2")
+
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+
+    def test_cursor_pages_skip_count_query(self):
+        first = self.client.get("/api/units/?pagination=cursor&page_size=3").json()
+        with self.assertNumQueries(1):
+            self.client.get(first["next"])
+
+    def test_default_mode_is_page_number(self):
+        body = self.client.get("/api/units/").json()
+
+        self.assertEqual(body["count"], 7)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get("/api/units/?cursor=garbage").status_code, 404)
+
+
+class DashboardCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        make_building("Tower")
+        Company.objects.create(name="Acme")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cached_totals_skip_count_queries(self):
+        first = self.client.get("/api/dashboard/")
+        self.assertEqual(first.json()["buildings"], 1)
+        self.assertEqual(first.json()["users"], 1)
+        self.assertIn("max_staleness", first.json())
+
+        with self.assertNumQueries(0):
+            self.client.get("/api/dashboard/")
+
+    def test_signals_adjust_totals(self):
+        self.client.get("/api/dashboard/")
+        with self.captureOnCommitCallbacks(execute=True):
+            Contact.objects.create(first_name="Ana")
+            make_building("Annex")
+        with self.captureOnCommitCallbacks(execute=True):
+            Company.objects.get(name="Acme").delete()
+
+        body = self.client.get("/api/dashboard/").json()
+
+        self.assertEqual(body["contact"], 1)
+        self.assertEqual(body["buildings"], 2)
+        self.assertEqual(body["companies"], 0)
+
+    def test_reconcile_catches_bulk_writes(self):
+        self.client.get("/api/dashboard/")
+        Company.objects.bulk_create([Company(name="Bulk 1"), Company(name="Bulk 2")])
+
+        with self.settings(DASHBOARD_COUNTERS_MAX_AGE=-1):
+            body = self.client.get("/api/dashboard/").json()
+
+        self.assertEqual(body["companies"], 3)
+
+    def test_etag_revalidation(self):
+        first = self.client.get("/api/dashboard/")
+        etag = first["ETag"]
+
+        again = self.client.get("/api/dashboard/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_building("Annex")
+        changed = self.client.get("/api/dashboard/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+
+    def test_missing_cache_falls_back_to_recount(self):
+        counters.reconcile()
+        cache.delete(f"{counters.KEY_PREFIX}:units")
+
+        self.assertEqual(self.client.get("/api/dashboard/").json()["units"], 0)
+
+
+class ExpiringContactTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        today = timezone.now().date()
+        acme = Company.objects.create(name="Acme")
+        building = make_building("Tower", address_city="Makati")
+
+        cls.expiries = [today + timedelta(days=d) for d in (300, 5, 40, 800, -3)]
+        for i, expiry in enumerate(cls.expiries):
+            unit = Unit.objects.create(name=f"U{i}", building=building, lease_expiry_date=expiry,
+                                       gross_floor_area="1200.50")
+            unit.contacts.add(Contact.objects.create(first_name=f"C{i}", company=acme if i % 2 else None))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def fetch(self, url):
+        response = self.client.get(url)
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_streams_window_in_date_order(self):
+        with self.assertNumQueries(1):
+            rows = self.fetch("/api/contacts/expiring?days=365")
+
+        self.assertEqual([r["unit_name"] for r in rows], ["U1", "U2", "U0"])
+        self.assertEqual(rows[0], {
+            "id": rows[0]["id"],
+            "company": "Acme",
+            "location": "Makati",
+            "building": "Tower",
+            "unit_name": "U1",
+            "lease_expiry": self.expiries[1].strftime("%m/%d/%Y"),
+            "gfa": "1,200.50",
+        })
+        self.assertEqual(rows[1]["company"], "")
+
+    def test_default_horizon(self):
+        self.assertEqual([r["unit_name"] for r in self.fetch("/api/contacts/expiring")], ["U1", "U2"])
+
+    def test_paginated(self):
+        body = self.client.get("/api/contacts/expiring?days=1000&page=2&page_size=2").json()
+
+        self.assertEqual(body["count"], 4)
+        self.assertEqual([r["unit_name"] for r in body["results"]], ["U0", "U3"])
+
+    def test_rejects_bad_horizon(self):
+        self.assertEqual(self.client.get("/api/contacts/expiring?days=soon").status_code, 400)
+
+
+class ExpiryCalendarTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        cls.tower = make_building("Tower")
+        annex = make_building("Annex")
+        cls.month_start = timezone.now().date().replace(day=1)
+        for days, gfa, building in [(0, "100", cls.tower), (1, "1,050.5 sqm", annex), (40, "200", cls.tower),
+                                    (-40, "999", cls.tower), (3000, "999", cls.tower)]:
+            Unit.objects.create(name=f"U{days}", building=building, gross_floor_area=gfa,
+                                lease_expiry_date=cls.month_start + timedelta(days=days))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_monthly_buckets_from_one_query(self):
+        with self.assertNumQueries(1):
+            body = self.client.get("/api/units/expiry-calendar/").json()
+
+        self.assertEqual(len(body["results"]), 24)
+        self.assertEqual(body["results"][0]["period"], self.month_start.strftime("%Y-%m"))
+        self.assertEqual(body["results"][0]["units"], 2)
+        self.assertEqual(body["results"][0]["gfa"], 1150.5)  # the varchar parsed, not cast to 1
+        self.assertEqual(body["total_units"], 3)
+        self.assertEqual(body["total_gfa"], 1350.5)
+
+    def test_quarter_buckets_and_building_filter(self):
+        body = self.client.get(f"/api/units/expiry-calendar/?bucket=quarter&months=12"
+                               f"&building={self.tower.pk}").json()
+
+        self.assertTrue(body["results"][0]["period"].endswith(f"Q{(self.month_start.month - 1) // 3 + 1}"))
+        self.assertEqual(body["total_units"], 2)
+
+    def test_rejects_unknown_bucket(self):
+        self.assertEqual(self.client.get("/api/units/expiry-calendar/?bucket=week").status_code, 400)
+
+    def test_rejects_non_integer_building(self):
+        response = self.client.get("/api/units/expiry-calendar/?building=abc")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("building", response.json())
+
+
+# InnoDB leaves uncommitted rows out of FULLTEXT results, so TestCase data is
+# only searchable through icontains; FullTextSearchTests covers MATCH
+@override_settings(SEARCH_FULLTEXT=False)
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        acme = Company.objects.create(name="Acme Holdings", industry="Banking")
+        Company.objects.create(name="Pacific Acme", industry="BPO")
+        Contact.objects.create(first_name="Ana", last_name="Acmeson", company=acme)
+        tower = make_building("Acme Tower", address_city="Taguig")
+        Unit.objects.create(name="Acme 12F", building=tower)
+        make_building("Zenith", address_city="Makati")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_typed_ranked_results(self):
+        body = self.client.get("/api/search/?q=acme").json()
+
+        types = {(r["type"], r["label"]) for r in body["results"]}
+        self.assertEqual(types, {
+            ("company", "Acme Holdings"), ("company", "Pacific Acme"), ("contact", "Ana Acmeson"),
+            ("building", "Acme Tower"), ("unit", "Acme 12F"),
+        })
+        # prefix hits outrank substring hits
+        companies = [r["label"] for r in body["results"] if r["type"] == "company"]
+        self.assertEqual(companies, ["Acme Holdings", "Pacific Acme"])
+        self.assertTrue(body["results"][0]["url"].startswith("/api/"))
+
+    def test_every_word_must_match(self):
+        body = self.client.get("/api/search/?q=acme taguig&types=building").json()
+
+        self.assertEqual([r["label"] for r in body["results"]], ["Acme Tower"])
+
+    def test_query_count_is_per_type(self):
+        with self.assertNumQueries(2):
+            self.client.get("/api/search/?q=acme&types=company,unit")
+
+    def test_rejects_unknown_type(self):
+        self.assertEqual(self.client.get("/api/search/?q=x&types=planet").status_code, 400)
+
+    def test_viewset_search_param(self):
+        body = self.client.get("/api/companies/?search=acme").json()
+
+        self.assertEqual(body["count"], 2)
+
+    def test_boolean_query_strips_operators(self):
+        self.assertEqual(search.tokenize('+acme -"tower" (x)'), ["acme", "tower", "x"])
+        self.assertEqual(search.boolean_query(["acme", "tower"]), "+acme* +tower*")
+
+
+@unittest.skipUnless(connection.vendor == "mysql", "MATCH ... AGAINST is MySQL only")
+class FullTextSearchTests(TransactionTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(make_user())
+        make_building("Acme Annex", address_city="Makati")
+        make_building("Acme Tower", address_city="Taguig", notes="Acme Tower sits on the Acme grounds")
+        # words in every row rank 0 in InnoDB, so keep some rows that do not match
+        for name in ["Zenith", "Summit", "Orion"]:
+            make_building(name, address_city="Pasig")
+
+    def test_ranked_by_relevance(self):
+        with CaptureQueriesContext(connection) as ctx:
+            body = self.client.get("/api/search/?q=acme&types=building").json()
+
+        self.assertTrue(any("MATCH (" in q["sql"] for q in ctx.captured_queries))
+        self.assertEqual([r["label"] for r in body["results"]], ["Acme Tower", "Acme Annex"])
+
+    def test_every_word_must_match(self):
+        body = self.client.get("/api/search/?q=acme taguig&types=building").json()
+
+        self.assertEqual([r["label"] for r in body["results"]], ["Acme Tower"])
+
+
+class ChangesDuringLoad:
+    """Queryset stand-in: `change` runs once, after the rows are read, as another process would."""
+
+    def __init__(self, queryset, change):
+        self.queryset, self.change = queryset, change
+
+    def values_list(self, *fields):
+        rows = list(self.queryset.values_list(*fields))
+        change, self.change = self.change, lambda: None
+        change()
+        return rows
+
+
+class CompanyAutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        for name in ["Acme Holdings", "Pacific Acme", "Ácmé Realty", "Zenith Corp"]:
+            Company.objects.create(name=name)
+
+    def setUp(self):
+        cache.clear()  # forces a fresh load of the per-process index
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def names(self, q, limit=10):
+        return [r["name"] for r in autocomplete.companies.lookup(q, limit)]
+
+    def test_whole_name_prefix_before_inner_word(self):
+        self.assertEqual(self.names("acme"), ["Acme Holdings", "Ácmé Realty", "Pacific Acme"])
+        self.assertEqual(self.names("acme r"), ["Ácmé Realty"])
+        self.assertEqual(self.names("acme", limit=1), ["Acme Holdings"])
+
+    def test_hot_path_skips_database(self):
+        self.names("a")
+        with self.assertNumQueries(0):
+            self.names("zen")
+
+    def test_signals_update_index_in_place(self):
+        self.names("a")
+        with self.captureOnCommitCallbacks(execute=True):
+            Company.objects.create(name="Acme Logistics")
+            Company.objects.filter(name="Zenith Corp").get().delete()
+
+        with self.assertNumQueries(0):
+            self.assertIn("Acme Logistics", self.names("acme"))
+            self.assertEqual(self.names("zenith"), [])
+
+    def test_write_in_an_unloaded_process_reaches_loaded_ones(self):
+        loaded, idle = autocomplete.PrefixIndex(Company.objects.all()), autocomplete.PrefixIndex(Company.objects.all())
+        self.assertIn("Zenith Corp", [r["name"] for r in loaded.lookup("zen")])
+
+        company = Company.objects.get(name="Zenith Corp")
+        company.name = "Nadir Corp"
+        company.save()
+        idle.upsert(company.pk, company.name)  # what its post_save receiver does
+        self.assertEqual([r["name"] for r in loaded.lookup("zen")], [])
+
+        company.delete()
+        idle.remove(company.pk)
+        self.assertEqual([r["name"] for r in loaded.lookup("nadir")], [])
+
+    def test_change_committed_during_rebuild_is_picked_up(self):
+        def other_process():
+            Company.objects.create(name="Acme Logistics")
+            cache.set(autocomplete.VERSION_KEY, cache.get(autocomplete.VERSION_KEY, 0) + 1, timeout=None)
+
+        index = autocomplete.PrefixIndex(ChangesDuringLoad(Company.objects.all(), other_process))
+        self.assertNotIn("Acme Logistics", [r["name"] for r in index.lookup("acme", 10)])
+        self.assertIn("Acme Logistics", [r["name"] for r in index.lookup("acme", 10)])
+
+    def test_endpoint(self):
+        body = self.client.get("/api/companies/autocomplete/?q=pac").json()
+
+        self.assertEqual([r["name"] for r in body["results"]], ["Pacific Acme"])
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        BuildingGrade.objects.create(code="A", description="Grade A")
+        for i in range(5):
+            b = make_building(f"Tower {i}", grade="A", address_city="Makati" if i % 2 else "Taguig")
+            Unit.objects.create(name=f"{i}F", building=b, gross_floor_area="250.5",
+                                notes="line one\nline \x01two & <more>")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def read(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_csv_honours_list_filters(self):
+        reference.building_grades.rows()  # lookup tables load once per process, not per export
+        reference.building_types.rows()
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/buildings/export/?format=csv&search=makati&ordering=-name")
+            rows = list(csv.reader(io.StringIO(self.read(response).decode("utf-8-sig"))))
+
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn("attachment;", response["Content-Disposition"])
+        self.assertEqual(rows[0][:5], ["ID", "Name", "Marketing status", "Grade", "Type"])
+        self.assertEqual([r[1] for r in rows[1:]], ["Tower 3", "Tower 1"])
+        self.assertEqual(rows[1][3], "Grade A")
+
+    def test_chunks_keep_the_list_order(self):
+        tower, day = Building.objects.get(name="Tower 0"), timezone.now().date()
+        for name, ends in [("a", None), ("b", day), ("c", None), ("d", day), ("e", day - timedelta(days=1))]:
+            Unit.objects.create(name=name, building=tower, lease_expiry_date=ends)
+        orderings = [("lease_expiry_date",), ("-lease_expiry_date",), ("-building__name", "lease_expiry_date"),
+                     ("building__address_city", "-name")]
+        for ordering in orderings:
+            units = Unit.objects.order_by(*ordering)
+            expected = list(units.order_by(*ordering, "pk").values_list("name", "lease_expiry_date"))  # ties by pk
+            with self.assertNumQueries(len(expected) // 2 + 1):
+                self.assertEqual(list(exports.keyset_rows(units, ["name", "lease_expiry_date"], 2)), expected,
+                                 ordering)
+
+    def test_xlsx_is_a_readable_workbook(self):
+        response = self.client.get("/api/units/export/?format=xlsx")
+        self.assertTrue(response["Content-Disposition"].endswith('.xlsx"'))
+
+        with zipfile.ZipFile(io.BytesIO(self.read(response))) as zf:
+            self.assertIn("xl/workbook.xml", zf.namelist())
+            sheet = zf.read("xl/worksheets/sheet1.xml").decode()
+
+        self.assertEqual(sheet.count("<row>"), 6)
+        self.assertIn('<c t="n"><v>250.50</v></c>', sheet)
+        self.assertIn("line two &amp; &lt;more&gt;", sheet)
+
+    def test_export_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get("/api/units/export/?format=csv").status_code, 401)
+
+    def test_every_export_resource_streams(self):
+        for url in ["/api/contacts/export/", "/api/odforms/export/?format=xlsx"]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.read(response)
+
+
+class ImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("admin", is_staff=True)
+        cls.building = make_building("Alpha Tower")
+        BuildingGrade.objects.create(code="A", description="Grade A")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def upload(self, content, name="units.csv", **data):
+        upload = io.BytesIO(content if isinstance(content, bytes) else content.encode("utf-8-sig"))
+        upload.name = name
+        return self.client.post("/api/import/", {"file": upload, **data}, format="multipart")
+
+    def test_creates_valid_rows_and_reports_the_rest(self):
+        sheet = (
+            "Unit,Building,GFA,NFA,Lease start,Lease end,Parking slots\n"
+            "10F,Alpha Tower,\"1,200 sqm\",900,2026-01-01,2028-12-31,3\n"
+            f"11F,{self.building.pk},500,600,,,\n"
+            "12F,Nowhere Plaza,500,,,,\n"
+            "14F,Alpha Tower,,,2026-01-01,not a date,\n"
+            ",,,,,,\n"
+            "15F,Alpha Tower,,,,,\n"
+        )
+        response = self.upload(sheet)
+        body = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((body["created"], body["updated"], body["error_count"]), (2, 0, 3))
+        self.assertEqual([e["row"] for e in body["errors"]], [3, 4, 5])
+        self.assertIn("__all__", body["errors"][0]["errors"])  # Unit.clean(): NFA > GFA
+        self.assertIn("building", body["errors"][1]["errors"])
+        self.assertIn("lease_expiry_date", body["errors"][2]["errors"])
+
+        unit = Unit.objects.get(name="10F")
+        self.assertEqual(unit.gross_floor_area, 1200)
+        self.assertEqual(unit.allocated_parking_slot, 3)
+        self.assertEqual(unit.lease_expiry_date.isoformat(), "2028-12-31")
+
+    def test_building_ids_must_exist(self):
+        make_building("2024")
+        response = self.upload(
+            "Unit,Building\n"
+            f"1F,{self.building.pk}\n"
+            "2F,999999\n"
+            "3F,2024\n"
+        )
+        body = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((body["created"], body["error_count"]), (2, 1))
+        self.assertEqual(body["errors"][0]["row"], 3)
+        self.assertIn("building", body["errors"][0]["errors"])
+        self.assertEqual(Unit.objects.get(name="3F").building.name, "2024")
+
+    def test_rows_with_id_update_only_their_columns(self):
+        unit = Unit.objects.create(name="9F", building=self.building, floor="9", asking_rent="850")
+        response = self.upload(f"id,asking_rent\n{unit.pk},900\n999999,100\n")
+
+        self.assertEqual(response.json()["updated"], 1)
+        self.assertEqual(response.json()["errors"][0]["row"], 3)
+        unit.refresh_from_db()
+        self.assertEqual((unit.asking_rent, unit.floor), ("900", "9"))
+
+    def test_export_round_trips_through_import(self):
+        make_building("Beta Tower", grade="A")
+        export = self.client.get("/api/buildings/export/?format=xlsx")
+        response = self.upload(b"".join(export.streaming_content), name="buildings.xlsx",
+                               target="buildings", dry_run="1")
+
+        self.assertEqual(response.json()["updated"], 2)
+        self.assertEqual(response.json()["error_count"], 0)
+
+    def test_batches_use_bulk_writes(self):
+        rows = "".join(f"{i}F,Alpha Tower,100\n" for i in range(300))
+        upload = io.BytesIO(("Unit,Building,GFA\n" + rows).encode())
+        with CaptureQueriesContext(connection) as ctx:
+            result = imports.import_rows(Unit, imports.read_rows(upload, "units.csv"), batch_size=100)
+
+        self.assertEqual(result.created, 300)
+        self.assertLess(len(ctx.captured_queries), 50)  # a fixed dozen or so per batch, not per row
+
+    def test_rejects_unreadable_files_and_non_admins(self):
+        self.assertEqual(self.upload(b"PK\x03\x04junk", name="units.xlsx").status_code, 400)
+        self.assertEqual(self.upload("colour,shape\nred,round\n").status_code, 400)
+
+        self.client.force_authenticate(make_user("staffless"))
+        self.assertEqual(self.upload("Unit,Building\n1F,Alpha Tower\n").status_code, 403)
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as fh:
+            fh.write("Unit,Building\n1F,Alpha Tower\n2F,\n")
+        out, err = io.StringIO(), io.StringIO()
+        call_command("import_inventory", fh.name, stdout=out, stderr=err)
+
+        self.assertIn("Created 1", out.getvalue())
+        self.assertIn("row 3: building", err.getvalue())
+        self.assertTrue(Unit.objects.filter(name="1F").exists())
+
+
+class LegacyFieldCleanerTests(TestCase):
+    def test_decimal_keeps_the_first_number(self):
+        field = BlankZeroDecimalField(max_digits=12, decimal_places=2)
+        cases = {
+            "1,200.50 sqm": Decimal("1200.50"), "3-5": Decimal("3"), "PHP 12,500/sqm": Decimal("12500"),
+            " 250.5 ": Decimal("250.5"), "-1.5": Decimal("-1.5"), ".75": Decimal(".75"), "1e3": Decimal("1e3"),
+            "TBA": None, "-": None, "": None, None: None, Decimal("9.90"): Decimal("9.90"), 0.1: Decimal("0.1"),
+        }
+        for raw, expected in cases.items():
+            self.assertEqual(field.to_python(raw), expected, raw)
+
+    def test_integer_keeps_the_first_whole_number(self):
+        field = BlankZeroIntegerField()
+        cases = {
+            "1,200 sqm": 1200, "3-5": 3, "12.5": 12, "2 basement": 2, "-4": -4, "1,2": 1,
+            "0": None, "n/a": None, "": None, 7: 7,
+        }
+        for raw, expected in cases.items():
+            self.assertEqual(field.to_python(raw), expected, raw)
+
+    def test_repeated_values_hit_the_cache(self):
+        fields.parse_legacy_decimal.cache_clear()
+        field = BlankZeroDecimalField(max_digits=12, decimal_places=2)
+        for _ in range(100):
+            field.from_db_value("1,200.50", None, None)
+        self.assertEqual(fields.parse_legacy_decimal.cache_info().misses, 1)
+
+    def test_benchmark_command(self):
+        out = io.StringIO()
+        call_command("bench_field_cleaners", size=2000, stdout=out)
+        self.assertIn("decimal", out.getvalue())
+        self.assertIn("cache hit", out.getvalue())
+
+
+class NumericShadowTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        cls.building = make_building("Alpha Tower", office_rent="PHP 1,050/sqm", gfa="25,000 sqm")
+        for name, rent in [("1F", "850"), ("2F", "PHP 900.00 / sqm"), ("3F", "1,200.50"), ("4F", "TBA")]:
+            Unit.objects.create(name=name, building=cls.building, asking_rent=rent, gross_floor_area="100")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_save_hook_keeps_shadow_rows_current(self):
+        unit = Unit.objects.get(name="3F")
+        self.assertEqual(unit.numbers.asking_rent, Decimal("1200.50"))
+        self.assertIsNone(Unit.objects.get(name="4F").numbers.asking_rent)
+        self.assertEqual(self.building.numbers.gfa, Decimal("25000"))
+
+        unit.asking_rent = "P 700"
+        unit.save()
+        self.assertEqual(UnitNumbers.objects.get(pk=unit.pk).asking_rent, Decimal("700"))
+
+    def test_range_filter_and_numeric_sort_run_in_sql(self):
+        response = self.client.get("/api/units/?asking_rent_max=1000&ordering=-numbers__asking_rent")
+        self.assertEqual([u["name"] for u in response.json()["results"]], ["2F", "1F"])
+
+        response = self.client.get("/api/buildings/?office_rent_min=1,000")
+        self.assertEqual(response.json()["count"], 1)
+        self.assertEqual(self.client.get("/api/units/?asking_rent_min=cheap").status_code, 400)
+
+    def test_backfill_repairs_rows_written_behind_the_orm(self):
+        Unit.objects.filter(name="1F").update(asking_rent="999")
+        UnitNumbers.objects.filter(unit__name="2F").delete()
+
+        call_command("backfill_numbers", "--missing-only", stdout=io.StringIO())
+        self.assertEqual(UnitNumbers.objects.get(unit__name="2F").asking_rent, Decimal("900"))
+        self.assertEqual(UnitNumbers.objects.get(unit__name="1F").asking_rent, Decimal("850"))
+
+        call_command("backfill_numbers", stdout=io.StringIO())
+        self.assertEqual(UnitNumbers.objects.get(unit__name="1F").asking_rent, Decimal("999"))
+
+    def test_import_writes_shadow_rows(self):
+        upload = io.BytesIO(b"Unit,Building,asking_rent\n5F,Alpha Tower,\"1,100\"\n")
+        imports.import_rows(Unit, imports.read_rows(upload, "units.csv"))
+        self.assertEqual(Unit.objects.get(name="5F").numbers.asking_rent, Decimal("1100"))
+
+
+def make_odform(**extra):
+    fields = dict(created=timezone.now(), type_of_call="inbound", source_of_call="website",
+                  type_of_caller="direct", intent="rent", purpose="new_office", status="active")
+    fields.update(extra)
+    return ODForm.objects.create(**fields)
+
+
+class ODFormMatchingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cache.clear()  # drop any OD form index left over from another test
+        cls.user = make_user()
+        makati = make_building("Makati Tower", address_city="Makati")
+        taguig = make_building("BGC Point", address_city="Taguig")
+        for name, building, gfa, rent, vacancy in [
+            ("fit", makati, "200", "800", "Vacant"),
+            ("far", taguig, "210", "800", "vacant"),
+            ("pricey", makati, "200", "1,500", "Vacant"),
+            ("small", makati, "170", "700", "Vacant"),
+            ("tiny", makati, "50", "700", "Vacant"),
+            ("leased", makati, "200", "800", "Occupied"),
+        ]:
+            Unit.objects.create(name=name, building=building, gross_floor_area=gfa, asking_rent=rent,
+                                vacancy_status=vacancy)
+        cls.form = make_odform(size_minimum=180, size_maximum=250, budget_maximum=200_000,
+                               preferred_location="Makati, Ortigas")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_ranks_vacant_units_in_one_query(self):
+        with self.assertNumQueries(1):
+            ranked = matching.top_matches(self.form)
+
+        # tiny is outside the size window, leased is not vacant
+        self.assertEqual([u.name for u in ranked], ["fit", "small", "pricey", "far"])
+        self.assertEqual(ranked[0].score, 100)
+        self.assertAlmostEqual(ranked[1].size_fit, 170 / 180)
+        self.assertAlmostEqual(ranked[2].budget_fit, 200_000 / 300_000)
+        self.assertEqual(ranked[3].location_fit, 0)
+
+    def test_blank_criteria_score_full_marks(self):
+        form = make_odform(intent="both")
+        self.assertEqual(len(matching.top_matches(form, limit=100)), 5)
+        self.assertTrue(all(u.score == 100 for u in matching.top_matches(form)))
+
+    def test_endpoint(self):
+        response = self.client.get(f"/api/odforms/{self.form.pk}/matches/?limit=2")
+        body = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["name"] for r in body["results"]], ["fit", "small"])
+        self.assertEqual(body["results"][0]["fit"], {"size": 1.0, "budget": 1.0, "location": 1.0})
+        self.assertEqual(self.client.get(f"/api/odforms/{self.form.pk}/matches/?limit=x").status_code, 400)
+
+    def test_rematch_command_stores_top_matches(self):
+        make_odform(status="inactive", size_minimum=1)
+        call_command("rematch_odforms", "--limit", "2", stdout=io.StringIO())
+
+        stored = ODFormMatch.objects.order_by("-score")
+        self.assertEqual([m.unit.name for m in stored], ["fit", "small"])
+        self.assertTrue(all(m.od_form_id == self.form.pk for m in stored))
+
+
+class ReverseMatchingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        cls.building = make_building("Makati Tower", address_city="Makati")
+        cls.fits = make_odform(size_minimum=180, size_maximum=250, budget_maximum=200_000,
+                               preferred_location="Makati")
+        cls.open = make_odform(intent="both")
+        cls.too_big = make_odform(size_minimum=1000)
+        cls.inactive = make_odform(status="inactive")
+
+    def setUp(self):
+        cache.clear()  # the index version lives in the cache; force a reload per test
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_interval_tree_matches_brute_force(self):
+        rng = random.Random(7)
+        intervals = []
+        for i in range(300):
+            low = rng.uniform(0, 1000)
+            intervals.append((low, low + rng.uniform(0, 300), i))
+        intervals.append((-float("inf"), 50, "below"))
+        intervals.append((900, float("inf"), "above"))
+        tree = odform_index.IntervalTree(intervals)
+
+        for x in [-10, 0, 49.5, 50, 333.3, 999, 1500] + [rng.uniform(0, 1300) for _ in range(200)]:
+            expected = {v for low, high, v in intervals if low <= x <= high}
+            self.assertEqual(set(tree.stab(x)), expected, x)
+
+    def test_form_committed_during_rebuild_is_picked_up(self):
+        def other_process():
+            self.late = make_odform(size_minimum=1500, size_maximum=1600)
+            cache.set(odform_index.VERSION_KEY, cache.get(odform_index.VERSION_KEY, 0) + 1, timeout=None)
+
+        index = odform_index.ODFormIndex(ChangesDuringLoad(ODForm.objects.filter(status="active"), other_process))
+        first = [form.pk for form in index.forms_for_area(1550)]
+        self.assertNotIn(self.late.pk, first)
+        self.assertIn(self.late.pk, [form.pk for form in index.forms_for_area(1550)])
+
+    def test_unit_becoming_vacant_records_matching_forms(self):
+        unit = Unit.objects.create(name="5F", building=self.building, gross_floor_area="200",
+                                   asking_rent="800", vacancy_status="Occupied")
+        self.assertFalse(ODFormMatch.objects.filter(unit=unit).exists())
+
+        unit.vacancy_status = "Vacant"
+        unit.save()
+        stored = dict(ODFormMatch.objects.filter(unit=unit).values_list("od_form_id", "score"))
+        self.assertEqual(stored, {self.fits.pk: 100, self.open.pk: 100})
+
+        unit.vacancy_status = "Occupied"
+        unit.save(update_fields=["vacancy_status"])
+        self.assertFalse(ODFormMatch.objects.filter(unit=unit).exists())
+
+    def test_imported_units_are_matched(self):
+        occupied = Unit.objects.create(name="4F", building=self.building, gross_floor_area="200",
+                                       asking_rent="800", vacancy_status="Occupied")
+        upload = io.BytesIO((
+            "id,Unit,Building,GFA,Asking rent,Vacancy\n"
+            f"{occupied.pk},4F,Makati Tower,200,800,Vacant\n"
+            ",7F,Makati Tower,200,800,Vacant\n"
+        ).encode())
+        imports.import_rows(Unit, imports.read_rows(upload, "units.csv"))
+
+        created = Unit.objects.get(name="7F")
+        for unit in (occupied, created):
+            stored = set(ODFormMatch.objects.filter(unit=unit).values_list("od_form_id", flat=True))
+            self.assertEqual(stored, {self.fits.pk, self.open.pk}, unit.name)
+
+    def test_python_scores_agree_with_sql(self):
+        for name, gfa, rent in [("a", "170", "700"), ("b", "300", "900"), ("c", "200", "1,500")]:
+            Unit.objects.create(name=name, building=self.building, gross_floor_area=gfa, asking_rent=rent,
+                                vacancy_status="Vacant")
+        sql = {u.pk: round(u.score, 2) for u in matching.candidates(self.fits)}
+        stored = dict(ODFormMatch.objects.filter(od_form=self.fits).values_list("unit_id", "score"))
+        self.assertEqual({pk: float(score) for pk, score in stored.items()}, sql)
+
+    def test_save_cost_does_not_grow_with_active_forms(self):
+        unit = Unit.objects.create(name="6F", building=self.building, gross_floor_area="200",
+                                   asking_rent="800", vacancy_status="Vacant")
+        odform_index.active_forms.forms_for_area(0)  # warm
+        with CaptureQueriesContext(connection) as few:
+            unit.save()
+
+        for i in range(40):
+            make_odform(size_minimum=5000 + i)
+        odform_index.active_forms.invalidate()
+        odform_index.active_forms.forms_for_area(0)
+        with CaptureQueriesContext(connection) as many:
+            unit.save()
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+
+    def test_endpoint_lists_active_forms_best_first(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            unit = Unit.objects.create(name="7F", building=self.building, gross_floor_area="170",
+                                       asking_rent="800", vacancy_status="Vacant")
+            self.open.save()  # stores its matches and invalidates the index
+
+        body = self.client.get(f"/api/units/{unit.pk}/matching-odforms/").json()
+        self.assertEqual([r["od_form"] for r in body["results"]], [self.open.pk, self.fits.pk])
+        self.assertLess(float(body["results"][1]["score"]), 100)
+
+
+class InstrumentationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user(is_staff=True)
+        for i in range(3):
+            make_building(f"Tower {i}")
+
+    def setUp(self):
+        instrumentation.registry.reset()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_reports_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/buildings/")
+
+        timing = response["Server-Timing"]
+        self.assertIn(f'desc="{len(ctx.captured_queries)} queries"', timing)
+        self.assertRegex(timing, r"serialize;dur=\d+\.\d, total;dur=\d+\.\d")
+
+    def test_metrics_endpoint_aggregates_by_route(self):
+        self.client.get("/api/buildings/")
+        self.client.get("/api/buildings/")
+        self.client.get("/api/nowhere/")
+
+        self.client.force_login(self.user)
+        body = self.client.get("/metrics").content.decode()
+        self.assertIn('api_requests_total{route="building-list",method="GET",status="200"} 2', body)
+        self.assertIn('api_request_duration_seconds_count{route="building-list"} 2', body)
+        self.assertIn('api_db_queries_per_request_bucket{route="building-list",le="+Inf"} 2', body)
+        self.assertIn('route="unmatched"', body)
+        self.assertNotIn('route="metrics"', body)
+
+    def test_streaming_responses_are_recorded_once_sent(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/buildings/export/?format=csv")
+            self.assertNotIn("building-export", instrumentation.registry.render())
+            b"".join(response.streaming_content)
+
+        self.assertNotIn("Server-Timing", response)
+        self.assertIn(f'api_db_queries_per_request_sum{{route="building-export"}} {len(ctx.captured_queries)}',
+                      instrumentation.registry.render())
+
+    @override_settings(API_MAX_QUERIES=1)
+    def test_flags_requests_over_threshold(self):
+        with self.assertLogs("pronovetai_app.metrics", "WARNING") as logs:
+            self.client.get("/api/buildings/")
+        self.assertIn("building-list", logs.output[0])
+        self.assertIn('api_slow_requests_total{route="building-list",reason="queries"} 1',
+                      instrumentation.registry.render())
+
+    @override_settings(METRICS_TOKEN="s3cret", METRICS_ALLOWED_IPS=[])
+    def test_metrics_restricted_to_staff_and_token(self):
+        # behind a proxy every request comes from 127.0.0.1
+        self.assertEqual(Client(REMOTE_ADDR="127.0.0.1").get("/metrics").status_code, 403)
+        self.assertEqual(Client().get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+        self.assertEqual(Client().get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret").status_code, 200)
+        client = Client()
+        client.force_login(self.user)
+        self.assertEqual(client.get("/metrics").status_code, 200)
+
+        with override_settings(METRICS_TOKEN=""):
+            self.assertEqual(Client().get("/metrics", HTTP_AUTHORIZATION="Bearer ").status_code, 403)
+        with override_settings(METRICS_ALLOWED_IPS=["10.0.0.5"]):
+            self.assertEqual(Client(REMOTE_ADDR="10.0.0.5").get("/metrics").status_code, 200)
+
+
+def _app_routes(patterns=None):
+    """(name, callback, kwarg names) for every named GET-able route in pronovetai_app.urls."""
+    for entry in app_urls.urlpatterns if patterns is None else patterns:
+        if isinstance(entry, URLResolver):
+            yield from _app_routes(entry.url_patterns)
+        elif entry.name:
+            pattern = entry.pattern
+            kwargs = set(getattr(pattern, "converters", {}) or pattern.regex.groupindex)
+            if "format" not in kwargs:
+                yield entry.name, entry.callback, kwargs
+
+
+class QueryScalingTests(TestCase):
+    """
+    Seeds N then 10N rows of every model and GETs every named route in
+    pronovetai_app/urls.py; the query count of each must not change.
+    Lists are requested with page_size=100 so the 10N page really holds
+    ten times the rows.
+    """
+    N = 2
+    PARAMS = {
+        "api_search": {"q": "tower"},
+        "company-autocomplete": {"q": "acme"},
+        "api_dashboard": {},
+        "building-export": {"format": "csv"},
+        "unit-export": {"format": "xlsx"},
+    }
+    # detail routes whose view has no class-level queryset
+    PK_MODELS = {"building_log_delete": BuildingLog}
+
+    @classmethod
+    def setUpTestData(cls):
+        cache.clear()
+        cls.admin = make_user("harness-admin", is_staff=True, is_superuser=True)
+        BuildingGrade.objects.create(code="A", description="Grade A")
+        BuildingType.objects.create(code="OFC", description="Office")
+        make_odform(size_minimum=50, size_maximum=500, preferred_location="Makati")
+
+    def seed(self, count, offset):
+        user_type = UserType.objects.first()
+        building_ct = ContentType.objects.get_for_model(Building)
+        for i in range(offset, offset + count):
+            user = User.objects.create_user(f"agent{i}", "pass1234", user_type=user_type)
+            UserLog.objects.create(user=self.admin, message=f"log {i}")
+            Address.objects.create(city="Makati", street_address=f"{i} Ayala Ave")
+            company = Company.objects.create(name=f"Acme {i}", created_by=user, edited_by=user)
+            contact = Contact.objects.create(company=company, first_name=f"Ann {i}", last_name="Cruz",
+                                             email=f"ann{i}@example.com")
+            building = make_building(f"Tower {i}", grade="A", building_type="OFC", address_city="Makati",
+                                     office_rent="850")
+            BuildingImage.objects.create(building=building, image=f"building_images/{i}.jpg")
+            BuildingLog.objects.create(building=building, user=self.admin, message=f"log {i}")
+            Note.objects.create(content_type=building_ct, object_id=building.pk, text="note",
+                                created_at=timezone.now())
+            Image.objects.create(content_type=building_ct, object_id=building.pk, image=f"images/{i}.jpg")
+            unit = Unit.objects.create(
+                name=f"{i}F", building=building, gross_floor_area="200", asking_rent="800",
+                vacancy_status="Vacant", lease_expiry_date=timezone.localdate() + timedelta(days=30 + i),
+            )
+            unit.contacts.add(contact)
+            UnitImage.objects.create(unit=unit, image=f"unit_images/{i}.jpg")
+            make_odform(contact=contact, account_manager=user, created_by=user, size_minimum=100,
+                        size_maximum=300, preferred_location="Makati")
+        with self.captureOnCommitCallbacks(execute=True):
+            ODForm.objects.first().save()  # re-store the first form's matches
+
+    def url(self, name, callback, kwargs):
+        model = self.PK_MODELS.get(name)
+        if model is None:
+            view = getattr(callback, "cls", None) or getattr(callback, "view_class", None)
+            queryset = getattr(view, "queryset", None)
+            model = queryset.model if queryset is not None else None
+        values = {}
+        if "building_id" in kwargs:
+            values["building_id"] = Building.objects.order_by("pk").first().pk
+        if "pk" in kwargs:
+            values["pk"] = model.objects.order_by("pk").first().pk
+        params = self.PARAMS.get(name, {"page_size": 100} if name.endswith("list") else {})
+        return reverse(name, kwargs=values), params
+
+    def query_counts(self, routes):
+        counts = {}
+        for name, callback, kwargs in routes:
+            path, params = self.url(name, callback, kwargs)
+            cache.clear()  # counters and in-process indexes reload the same way every time
+            for table in reference.TABLES.values():
+                table.discard()
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(path, params)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+            counts[name] = (len(ctx.captured_queries), response.status_code)
+        return counts
+
+    def test_query_count_does_not_grow_with_rows(self):
+        routes = list(_app_routes())
+        self.client.force_login(self.admin)
+
+        self.seed(self.N, 0)
+        small = self.query_counts(routes)
+        self.seed(self.N * 9, self.N)
+        large = self.query_counts(routes)
+
+        self.assertGreater(len(routes), 40)
+        for name, (queries, status) in small.items():
+            with self.subTest(route=name):
+                self.assertLess(status, 500)
+                self.assertEqual(large[name][0], queries,
+                                 f"{name}: {queries} queries at N={self.N}, {large[name][0]} at {self.N * 10}")
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(bench.percentile(values, 50), 50)
+        self.assertEqual(bench.percentile(values, 99), 99)
+        self.assertEqual(bench.percentile([7], 95), 7)
+        self.assertIsNone(bench.percentile([], 50))
+
+    def test_tiny_portfolio_runs_every_scenario_cleanly(self):
+        rows = portfolio.generate(portfolio.SCALES["tiny"], seed=1)
+        self.assertEqual(rows["units"], 50)
+        self.assertEqual(UnitNumbers.objects.count(), 50)
+
+        results = bench.run(list(bench.SCENARIOS), requests=3, seed=1)
+
+        self.assertEqual(set(results), set(bench.SCENARIOS))
+        for name, stats in results.items():
+            with self.subTest(scenario=name):
+                self.assertEqual(stats["errors"], 0, stats["status"])
+                self.assertLessEqual(stats["latency_ms"]["p50"], stats["latency_ms"]["p99"])
+                self.assertIsNotNone(stats["queries"]["mean"])
+
+
+class ConditionalRequestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user(is_staff=True)
+        cls.grade = BuildingGrade.objects.create(code="A", description="Grade A")
+        cls.building = make_building("Tower One", grade="A")
+        cls.unit = Unit.objects.create(name="10F", building=cls.building)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_unchanged_object_answers_304_without_serializing(self):
+        first = self.client.get(f"/api/buildings/{self.building.pk}/")
+        etag = first["ETag"]
+
+        with self.assertNumQueries(1):
+            again = self.client.get(f"/api/buildings/{self.building.pk}/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+        self.assertEqual(again["ETag"], etag)
+        self.assertIn("no-cache", first["Cache-Control"])
+
+    def test_tag_follows_related_values_the_serializer_reads(self):
+        building_tag = self.client.get(f"/api/buildings/{self.building.pk}/")["ETag"]
+        unit_tag = self.client.get(f"/api/units/{self.unit.pk}/")["ETag"]
+
+        self.grade.description = "Premium"
+        self.grade.save()
+        self.assertNotEqual(self.client.get(f"/api/buildings/{self.building.pk}/")["ETag"], building_tag)
+
+        Building.objects.filter(pk=self.building.pk).update(name="Tower Uno")  # bypasses signals
+        self.assertEqual(
+            self.client.get(f"/api/units/{self.unit.pk}/", HTTP_IF_NONE_MATCH=unit_tag).status_code, 200,
+        )
+
+    def test_stale_if_match_is_rejected(self):
+        etag = self.client.get(f"/api/buildings/{self.building.pk}/")["ETag"]
+        Building.objects.filter(pk=self.building.pk).update(address_city="Makati")
+
+        stale = self.client.patch(f"/api/buildings/{self.building.pk}/", {"name": "Mine"}, format="json",
+                                  HTTP_IF_MATCH=etag)
+        self.assertEqual(stale.status_code, 412)
+        self.assertEqual(Building.objects.get(pk=self.building.pk).name, "Tower One")
+
+        fresh = self.client.get(f"/api/buildings/{self.building.pk}/")["ETag"]
+        ok = self.client.patch(f"/api/buildings/{self.building.pk}/", {"name": "Mine"}, format="json",
+                               HTTP_IF_MATCH=fresh)
+        self.assertEqual(ok.status_code, 200)
+        # clients that do not send If-Match keep working
+        self.assertEqual(self.client.patch(f"/api/buildings/{self.building.pk}/", {"name": "Ours"},
+                                           format="json").status_code, 200)
+
+    def test_odform_last_modified(self):
+        form = make_odform()
+        response = self.client.get(f"/api/odforms/{form.pk}/")
+
+        self.assertIn("Last-Modified", response)
+        again = self.client.get(f"/api/odforms/{form.pk}/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(again.status_code, 304)
+
+
+class ReferenceDataTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user(is_staff=True)
+        cls.grade = BuildingGrade.objects.create(code="A", description="Grade A")
+        BuildingGrade.objects.create(code="B", description="Grade B")
+        BuildingType.objects.create(code="OFC", description="Office")
+
+    def setUp(self):
+        cache.clear()
+        for table in reference.TABLES.values():
+            table.discard()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_descriptions_resolve_without_queries_once_loaded(self):
+        building = make_building("Tower", grade="A", building_type="OFC")
+        with self.assertNumQueries(2):  # one load per table
+            self.assertEqual(building.grade_desc, "Grade A")
+            self.assertEqual(building.building_type_desc, "Office")
+        with self.assertNumQueries(0):
+            self.assertEqual(building.grade_desc, "Grade A")
+            self.assertIsNone(Building(grade="Z").grade_desc)
+
+    def test_save_reloads_the_table(self):
+        self.assertEqual(reference.building_grades.description("A"), "Grade A")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grade.description = "Premium"
+            self.grade.save()
+        self.assertEqual(reference.building_grades.description("A"), "Premium")
+
+    @mock.patch.object(reference, "VERSION_CHECK_INTERVAL", 0)
+    def test_write_in_another_process_reloads_before_max_age(self):
+        other = reference.ReferenceTable(BuildingGrade, code_field="code")  # another worker's copy
+        self.assertEqual(other.description("A"), "Grade A")
+
+        BuildingGrade.objects.filter(pk=self.grade.pk).update(description="Premium")
+        reference.building_grades.invalidate()  # what the post_save receiver does on commit
+        self.assertEqual(other.description("A"), "Premium")
+
+    def test_codes_match_case_insensitively(self):
+        make_building("Tower", grade="a", building_type="ofc")
+        self.assertEqual(Building.objects.get().grade_desc, "Grade A")
+
+        ordered = Building.objects.annotate(
+            g=reference.building_grades.description_expression("grade"),
+            t=reference.building_types.description_expression("building_type"),
+        )
+        self.assertEqual(list(ordered.values_list("g", "t")), [("Grade A", "Office")])
+
+    @override_settings(REFERENCE_DATA_SHARED=True)
+    def test_shared_rows_survive_a_fresh_process(self):
+        reference.building_grades.rows()
+        reference.building_grades.discard()  # as if another worker starts up
+        with self.assertNumQueries(0):
+            self.assertEqual(reference.building_grades.description("B"), "Grade B")
+
+        reference.building_grades.invalidate()
+        with self.assertNumQueries(1):
+            reference.building_grades.rows()
+
+    def test_building_list_sorts_by_cached_description(self):
+        make_building("First", grade="B")
+        make_building("Second", grade="A")
+        rows = self.client.get("/api/buildings/?ordering=grade_description").json()["results"]
+        self.assertEqual([r["grade_desc"] for r in rows], ["Grade A", "Grade B"])
+
+    def test_user_type_comes_from_the_lookup_table(self):
+        body = self.client.get("/api/users/me/").json()
+        self.assertEqual(body["user_type"], {"id": self.user.user_type_id, "description": "Administrator"})
+
+
+class CacheAsideTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user(is_staff=True)
+        cls.building = make_building("Tower")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_computes_once_per_namespace_version(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return None  # cached like any other value
+
+        for _ in range(2):
+            self.assertIsNone(caching.get_or_compute(("inventory",), ("probe", 1), compute))
+        self.assertEqual(len(calls), 1)
+
+        caching.bump("odforms")
+        caching.get_or_compute(("inventory",), ("probe", 1), compute)
+        self.assertEqual(len(calls), 1)
+
+        caching.bump("inventory")
+        caching.get_or_compute(("inventory",), ("probe", 1), compute)
+        self.assertEqual(len(calls), 2)
+
+    def test_expiry_calendar_is_served_from_cache_until_a_unit_changes(self):
+        url = "/api/units/expiry-calendar/?months=6"
+        expiry = timezone.localdate() + timedelta(days=40)
+        Unit.objects.create(name="1F", building=self.building, lease_expiry_date=expiry)
+
+        first = self.client.get(url).json()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).json(), first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Unit.objects.create(name="2F", building=self.building, lease_expiry_date=expiry)
+        self.assertEqual(self.client.get(url).json()["total_units"], first["total_units"] + 1)
+
+
+class LegacyHashTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("legacy")
+        User.objects.filter(pk=cls.user.pk).update(password=legacy_backends.md5_hexdigest("old-secret"))
+
+    def password(self):
+        return User.objects.values_list("password", flat=True).get(pk=self.user.pk)
+
+    def test_md5_login_checks_once_and_upgrades(self):
+        with self.assertNumQueries(2):  # the user, the rehash
+            user = authenticate(None, username="legacy", password="old-secret")
+        self.assertEqual(user, self.user)
+        self.assertEqual(identify_hasher(self.password()).algorithm, "pbkdf2_sha256")
+        self.assertIsNotNone(authenticate(None, username="legacy", password="old-secret"))
+
+    def test_failed_login_is_one_lookup_and_leaves_hash_alone(self):
+        before = self.password()
+        with self.assertNumQueries(1):
+            self.assertIsNone(authenticate(None, username="legacy", password="wrong"))
+        with self.assertNumQueries(1):
+            self.assertIsNone(authenticate(None, username="nobody", password="wrong"))
+        self.assertEqual(self.password(), before)
+
+    def test_inactive_users_are_refused(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNone(authenticate(None, username="legacy", password="old-secret"))
+
+    def test_wrap_command_is_resumable_and_wrapped_hashes_log_in(self):
+        other = make_user("legacy2")
+        User.objects.filter(pk=other.pk).update(password=legacy_backends.md5_hexdigest("other"))
+        out = io.StringIO()
+        call_command("wrap_legacy_hashes", batch_size=1, workers=2, stdout=out, stderr=io.StringIO())
+        self.assertIn("Wrapped 2 MD5 hashes", out.getvalue())
+        self.assertTrue(self.password().startswith("pbkdf2_wrapped_md5$"))
+
+        out = io.StringIO()
+        call_command("wrap_legacy_hashes", stdout=out, stderr=io.StringIO())
+        self.assertIn("Wrapped 0 MD5 hashes", out.getvalue())
+
+        self.assertIsNone(authenticate(None, username="legacy", password="wrong"))
+        self.assertIsNotNone(authenticate(None, username="legacy", password="old-secret"))
+        self.assertEqual(identify_hasher(self.password()).algorithm, "pbkdf2_sha256")
+
+
+FAST_COSTS = {
+    "pbkdf2": {"iterations": 1000},
+    "scrypt": {"work_factor": 2 ** 10, "block_size": 8, "parallelism": 1},
+}
+
+
+@override_settings(PASSWORD_HASHER_COSTS=FAST_COSTS)
+class HasherProfileTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with override_settings(PASSWORD_HASHER_COSTS=FAST_COSTS):
+            cls.user = make_user("hasher")
+
+    def password(self):
+        return User.objects.values_list("password", flat=True).get(pk=self.user.pk)
+
+    def test_costs_come_from_settings(self):
+        self.assertTrue(self.password().startswith("pbkdf2_sha256$1000$"))
+        self.assertEqual(hashers.costs(hashers.PBKDF2PasswordHasher()), {"iterations": 1000})
+
+    def test_login_rehashes_when_cost_changes(self):
+        with override_settings(PASSWORD_HASHER_COSTS={**FAST_COSTS, "pbkdf2": {"iterations": 1200}}):
+            self.assertIsNotNone(authenticate(None, username="hasher", password="pass1234"))
+            self.assertTrue(self.password().startswith("pbkdf2_sha256$1200$"))
+
+    def test_login_rehashes_when_profile_changes(self):
+        scrypt_first = [
+            "pronovetai_app.hashers.ScryptPasswordHasher",
+            "pronovetai_app.hashers.PBKDF2PasswordHasher",
+        ]
+        with override_settings(PASSWORD_HASHERS=scrypt_first):
+            self.assertIsNotNone(authenticate(None, username="hasher", password="pass1234"))
+            self.assertTrue(self.password().startswith("scrypt$1024$"))
+            self.assertIsNotNone(authenticate(None, username="hasher", password="pass1234"))
+
+    def test_bench_login_reports_each_profile(self):
+        out = io.StringIO()
+        call_command("bench_login", seconds=0, peak=100, json=True, cost=["pbkdf2.iterations=500"], stdout=out)
+        results = json.loads(out.getvalue())
+        self.assertEqual(set(results), set(hashers.PROFILES))
+        self.assertEqual(results["pbkdf2"]["costs"], {"iterations": 500})
+        self.assertGreater(results["scrypt"]["logins_per_second_per_core"], 0)
+        self.assertGreaterEqual(results["pbkdf2"]["cores_for_peak"], 1)
+
+
+class StatelessTokenTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("token", is_staff=True, first_name="Tess")
+        cls.contact = Contact.objects.create(first_name="Ana")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def login(self):
+        body = self.client.post("/api/login/", {"username": "token", "password": "pass1234"}, format="json").json()
+        self.client.logout()  # the JWT alone from here on
+        return body
+
+    def user_queries(self, path):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(path).status_code, 200)
+        return [q["sql"] for q in ctx.captured_queries if "pt_users" in q["sql"]]
+
+    def test_read_endpoints_skip_the_user_lookup(self):
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(self.user_queries("/api/buildings/"), [])
+
+        # access tokens from /api/token/refresh/ carry the claims as well
+        refreshed = self.client.post("/api/token/refresh/", {"refresh": tokens["refresh"]}, format="json").json()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refreshed['access']}")
+        self.assertEqual(self.user_queries("/api/search/?q=ab"), [])
+
+        with override_settings(JWT_STATELESS_USER=False):
+            self.assertEqual(len(self.user_queries("/api/buildings/")), 1)
+
+    def test_tokens_without_claims_fall_back_to_the_database(self):
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(len(self.user_queries("/api/buildings/")), 1)
+
+    def test_writes_get_the_full_user(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.login()['access']}")
+        response = self.client.post("/api/odforms/", {
+            "created": timezone.now().isoformat(), "contact": self.contact.pk, "type_of_call": "inbound",
+            "source_of_call": "website", "type_of_caller": "direct", "intent": "rent", "purpose": "new_office",
+            "status": "active",
+        }, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        form = ODForm.objects.get(pk=response.json()["id"])
+        self.assertEqual((form.account_manager, form.created_by), (self.user, self.user))
+
+    def test_writes_check_the_current_user(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.login()['access']}")
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.assertEqual(self.client.get(f"/api/contacts/{self.contact.pk}/").status_code, 200)
+        response = self.client.patch(f"/api/contacts/{self.contact.pk}/", {"first_name": "Eve"}, format="json")
+        self.assertEqual(response.status_code, 401)
+        self.contact.refresh_from_db()
+        self.assertEqual(self.contact.first_name, "Ana")
+
+    def test_claims_user(self):
+        refresh = RefreshToken.for_user(self.user)
+        authentication.add_user_claims(refresh, self.user)
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        user, _ = authentication.StatelessJWTAuthentication().authenticate(request)
+        self.assertIsInstance(user, authentication.TokenClaimsUser)
+        self.assertEqual((user.pk, user.username, user.is_staff, user.get_full_name()),
+                         (self.user.pk, "token", True, "Tess"))
+        self.assertEqual(authentication.full_user(user), self.user)
+
+
+class DenylistTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("refresher")
+
+    def setUp(self):
+        cache.clear()
+        denylist.denylist.discard()
+        self.client = APIClient()
+
+    def refresh(self, token):
+        return self.client.post("/api/token/refresh/", {"refresh": str(token)}, format="json")
+
+    def blacklist_queries(self, token):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.refresh(token)
+        return response, [q["sql"] for q in ctx.captured_queries if "blacklistedtoken" in q["sql"]]
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = denylist.BloomFilter(1000)
+        members = [f"jti-{i}" for i in range(1000)]
+        for jti in members:
+            bloom.add(jti)
+        self.assertTrue(all(jti in bloom for jti in members))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+        self.assertLess(false_positives, 300)
+
+    def test_clean_tokens_skip_the_blacklist_query(self):
+        revoked = RefreshToken.for_user(self.user)
+        revoked.blacklist()
+        self.refresh(RefreshToken.for_user(self.user))  # loads the filter
+
+        response, queries = self.blacklist_queries(RefreshToken.for_user(self.user))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, [])
+        self.assertEqual(self.refresh(revoked).status_code, 401)
+
+    def test_new_blacklist_entries_are_refused(self):
+        token = RefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(token).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            token.blacklist()
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    @override_settings(TOKEN_DENYLIST_MAX_AGE=0)
+    def test_entries_written_outside_django_are_picked_up_within_max_age(self):
+        token = RefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(token).status_code, 200)
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=OutstandingToken.objects.get(jti=token["jti"]))])
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_prune_deletes_expired_tokens_in_batches(self):
+        live = RefreshToken.for_user(self.user)
+        past = timezone.now() - timedelta(days=1)
+        for i in range(5):
+            expired = OutstandingToken.objects.create(user=self.user, jti=f"old-{i}", token="x", expires_at=past)
+            if i % 2:
+                BlacklistedToken.objects.create(token=expired)
+
+        out = io.StringIO()
+        call_command("prune_tokens", batch_size=2, stdout=out)
+        self.assertIn("Deleted 5 tokens", out.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.values_list("jti", flat=True)), [live["jti"]])
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+
+class AuditLogTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("auditor", first_name="Ada")
+        cls.building = make_building("Tower")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.spool = Path(tempfile.mkdtemp()) / "audit.jsonl"
+
+    def test_post_returns_before_the_insert(self):
+        url = f"/api/buildings/{self.building.pk}/logs/"
+        with self.captureOnCommitCallbacks() as callbacks, CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(url, {"message": "Viewed"}, format="json")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual((response.json()["id"], response.json()["user_display"]), (None, "Ada"))
+        self.assertFalse([q for q in ctx.captured_queries if q["sql"].startswith("INSERT")])
+        self.assertEqual(len(callbacks), 1)  # hands the row to the writer after commit
+
+        with override_settings(AUDIT_LOG_ASYNC=False), self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {"message": "Inline"}, format="json")
+        self.assertEqual(list(BuildingLog.objects.values_list("message", "user")), [("Inline", self.user.pk)])
+
+    def test_rejected_rows_are_spooled_and_replayed(self):
+        good = BuildingLog(building=self.building, user=self.user, message="ok", timestamp=timezone.now())
+        bad = UserLog(user=self.user, message=None)
+        with override_settings(AUDIT_LOG_SPOOL=str(self.spool)), self.assertLogs("pronovetai_app.auditlog"):
+            self.assertEqual(auditlog.writer.write([good, bad]), 1)
+            self.assertTrue(BuildingLog.objects.filter(message="ok").exists())
+
+            later = UserLog(user=self.user, message="from the spool")
+            auditlog.writer.spool([later])
+            out = io.StringIO()
+            call_command("replay_audit_log", stdout=out)
+        self.assertIn("Replayed 1 of 2", out.getvalue())
+        self.assertTrue(UserLog.objects.filter(message="from the spool").exists())
+        self.assertEqual(len(self.spool.read_text().splitlines()), 1)  # the NULL message failed again
+
+
+class AuditLogWriterThreadTests(TransactionTestCase):
+    @override_settings(AUDIT_LOG_BATCH_SIZE=3, AUDIT_LOG_FLUSH_MS=50)
+    def test_background_thread_flushes_in_batches(self):
+        user = make_user("writer")
+        building = make_building("Annex")
+        with CaptureQueriesContext(connection) as ctx:
+            for i in range(7):
+                auditlog.log_building(building.pk, user, f"event {i}")
+        self.assertEqual(ctx.captured_queries, [])
+
+        deadline = time.monotonic() + 5
+        while BuildingLog.objects.count() < 6 and time.monotonic() < deadline:
+            time.sleep(0.01)  # two full batches go out without waiting for the interval
+        auditlog.writer.flush()
+        self.assertEqual(sorted(BuildingLog.objects.values_list("message", flat=True)),
+                         [f"event {i}" for i in range(7)])
+
+    @override_settings(AUDIT_LOG_FLUSH_MS=10)
+    def test_rows_outlive_failed_writes_and_dead_threads(self):
+        user, building = make_user("writer"), make_building("Annex")
+        rows = [BuildingLog(building=building, user=user, message=f"event {i}", timestamp=timezone.now())
+                for i in range(4)]
+        writer = auditlog.AuditLogWriter()
+        write, failures = writer.write, [OSError(28, "No space left on device")]
+
+        def full_disk_once(entries):
+            if failures:
+                raise failures.pop()
+            return write(entries)
+        writer.write = full_disk_once
+
+        with self.assertLogs("pronovetai_app.auditlog", "ERROR"):
+            writer.enqueue(rows[0])
+            deadline = time.monotonic() + 5
+            while not BuildingLog.objects.exists() and time.monotonic() < deadline:
+                time.sleep(0.01)  # the same thread retries the batch
+        self.assertTrue(BuildingLog.objects.exists())
+        writer.flush()
+
+        # a thread that died holding a batch, with more rows queued behind it
+        dead = threading.Thread(target=lambda: None)
+        dead.start()
+        dead.join()
+        writer._thread, writer._pid, writer._queue = dead, os.getpid(), queue.Queue()
+        writer._unwritten.append(rows[1])
+        writer._queue.put(rows[2])
+        writer.enqueue(rows[3])
+        writer.flush()
+        self.assertEqual(sorted(BuildingLog.objects.values_list("message", flat=True)),
+                         [f"event {i}" for i in range(4)])
@@ -4,10 +4,12 @@ from django.contrib.auth.decorators import login_required
 from rest_framework import routers
 from rest_framework_simplejwt.views import TokenRefreshView
 
+from pronovetai_app.instrumentation import metrics_view
 from pronovetai_app.views import (
     AddressViewSet, UserViewSet, CompanyViewSet, ContactViewSet,
     BuildingViewSet, UnitViewSet, ODFormViewSet, BuildingImageViewSet,
     UnitImageViewSet, ExpiringContactView,
+    BuildingLogListCreateView, BuildingLogDestroyView, SearchView, ImportView,
 
     StaffRegistrationView, ManagerRegistrationView,
     CurrentUserLogsView, ChangePasswordView,
@@ -36,6 +38,11 @@ urlpatterns = [
     # ── DRF router ──────────────────────────────
     path("api/", include(router.urls)),
 
+    # ── Building logs ───────────────────────────
+    path("api/buildings/<int:building_id>/logs/", BuildingLogListCreateView.as_view(), name="building_logs"),
+    path("api/buildings/<int:building_id>/logs/<int:pk>/", BuildingLogDestroyView.as_view(),
+         name="building_log_delete"),
+
     # ── Auth (session + JWT) ────────────────────
     path("api/login/", LoginView.as_view(), name="api_login"),
     path("api/logout/", LogoutView.as_view(), name="api_logout"),
@@ -52,7 +59,12 @@ urlpatterns = [
     path("api/dashboard/", dashboard_stats, name="api_dashboard"),
 
     # ── Back-end Routes ──────────────────
-    path("api/contacts/expiring", ExpiringContactView.as_view()),
+    path("api/contacts/expiring", ExpiringContactView.as_view(), name="expiring_contacts"),
+    path("api/search/", SearchView.as_view(), name="api_search"),
+    path("api/import/", ImportView.as_view(), name="api_import"),
+
+    # Prometheus scrape target
+    path("metrics", metrics_view, name="metrics"),
 
     # ── Front-end templates (session required) ──
     path("", TemplateView.as_view(template_name='login.html'), name='login_page'),
@@ -1,16 +1,22 @@
+import json
 from datetime import timedelta
 
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import TruncMonth, TruncQuarter
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from django.utils.timezone import now
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
 
 from rest_framework import generics, viewsets, permissions, status
 
 from rest_framework.authentication import SessionAuthentication
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
@@ -20,7 +26,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 
 from .models import (
     Address, User, Company, Contact, Building, Unit, ODForm,
-    BuildingImage, UnitImage, BuildingLog,
+    BuildingImage, UnitImage, BuildingLog, ODFormMatch,
 )
 from .serializers import (
     AddressSerializer, UserSerializer, CompanySerializer, ContactSerializer,
@@ -28,8 +34,23 @@ from .serializers import (
     UnitImageSerializer, StaffRegistrationSerializer, ManagerRegistrationSerializer,
     UserLogSerializer, ChangePasswordSerializer, BuildingLogSerializer,
 )
+from .authentication import StatelessJWTAuthentication, add_user_claims, full_user
+from .conditional import ConditionalObjectMixin
+from .exports import ExportMixin
+from .instrumentation import SerializerTimingMixin
+from .filters import is_datatables_request
+from .pagination import DataTablesPagination, OptionalKeysetPagination
+from . import auditlog, autocomplete, caching, counters, imports, matching, reference, search
 
 API_AUTH = [JWTAuthentication, SessionAuthentication]
+# read-heavy endpoints: request.user comes from the token claims, no pt_users query (authentication.py)
+STATELESS_API_AUTH = [StatelessJWTAuthentication, SessionAuthentication]
+
+
+def _add_months(d, months):
+    """First-of-month arithmetic for the expiry calendar."""
+    index = d.year * 12 + d.month - 1 + months
+    return d.replace(year=index // 12, month=index % 12 + 1, day=1)
 
 
 @login_required
@@ -39,21 +60,35 @@ def dashboard_page(request):
 
 
 @api_view(['GET'])
+@authentication_classes(STATELESS_API_AUTH)
 @permission_classes([IsAuthenticated])
 def dashboard_stats(request):
-    return Response({
-        'buildings': Building.objects.count(),
-        'units': Unit.objects.count(),
-        'companies': Company.objects.count(),
-        'contact': Contact.objects.count(),
-        'odforms': ODForm.objects.count(),
-        'users': User.objects.count(),
-    })
-
-
-class AdminUserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all().order_by('username')
+    snap = counters.snapshot()
+    etag = quote_etag(snap.etag)
+    last_modified = int(snap.modified_at)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = Response({
+            **snap.values,
+            # totals can lag bulk writes by at most max_staleness seconds
+            'as_of': http_date(snap.reconciled_at),
+            'max_staleness': counters.max_age(),
+        })
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class AdminUserViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
+    queryset = User.objects.all()
     serializer_class = UserSerializer
+    search_fields = ['username', 'email', 'first_name', 'last_name']
+    ordering_fields = ['id', 'username', 'email', 'first_name', 'last_name', 'date_joined',
+                       'user_type__description', 'is_staff', 'is_superuser', 'is_active']
+    ordering_aliases = {'user_type_desc': 'user_type__description'}
+    ordering = ['username']
     authentication_classes = [SessionAuthentication, JWTAuthentication]
     permission_classes = [IsAuthenticated, IsAdminUser]
 
@@ -75,16 +110,10 @@ class LoginView(APIView):
                             status=status.HTTP_400_BAD_REQUEST)
         login(request, user)
         refresh = RefreshToken.for_user(user)
+        # on the refresh token, so access tokens from /api/token/refresh/ carry them too
+        add_user_claims(refresh, user)
         access = refresh.access_token
 
-        access['is_staff'] = user.is_staff
-        access['is_superuser'] = user.is_superuser
-
-        access['username'] = user.username
-        access['user_login'] = user.username
-        access['first_name'] = user.first_name or ''
-        access['last_name'] = user.last_name or ''
-
         return Response({
             'access': str(access),
             'refresh': str(refresh),
@@ -99,7 +128,7 @@ class LogoutView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class StaffRegistrationView(generics.CreateAPIView):
+class StaffRegistrationView(SerializerTimingMixin, generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = StaffRegistrationSerializer
     authentication_classes = [SessionAuthentication, JWTAuthentication]
@@ -125,7 +154,7 @@ class StaffRegistrationView(generics.CreateAPIView):
         })
 
 
-class ManagerRegistrationView(generics.CreateAPIView):
+class ManagerRegistrationView(SerializerTimingMixin, generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = ManagerRegistrationSerializer
     authentication_classes = [SessionAuthentication, JWTAuthentication]
@@ -135,13 +164,14 @@ class ManagerRegistrationView(generics.CreateAPIView):
         return {'request': self.request}
 
 
-class AddressViewSet(viewsets.ModelViewSet):
+class AddressViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     queryset = Address.objects.all()
     serializer_class = AddressSerializer
+    ordering = ['id']
 
 
 # This view is used to get the current logged-in user's data.
-class UserViewSet(generics.RetrieveAPIView):
+class UserViewSet(SerializerTimingMixin, generics.RetrieveAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
 
@@ -149,15 +179,17 @@ class UserViewSet(generics.RetrieveAPIView):
         return self.request.user
 
 
-class CurrentUserLogsView(generics.ListAPIView):
+class CurrentUserLogsView(SerializerTimingMixin, generics.ListAPIView):
     serializer_class = UserLogSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OptionalKeysetPagination
+    keyset = ('-timestamp', '-id')
 
     def get_queryset(self):
         return self.request.user.logs.all().order_by('-timestamp')
 
 
-class ChangePasswordView(generics.UpdateAPIView):
+class ChangePasswordView(SerializerTimingMixin, generics.UpdateAPIView):
     serializer_class = ChangePasswordSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -165,38 +197,100 @@ class ChangePasswordView(generics.UpdateAPIView):
         return self.request.user
 
 
-class CompanyViewSet(viewsets.ModelViewSet):
+class CompanyViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
-
-
-class ContactViewSet(viewsets.ModelViewSet):
+    search_fields = ['name', 'industry', 'address_bldg', 'address_city']
+    fulltext_search = True
+    ordering_fields = ['id', 'name', 'industry', 'address_bldg', 'address_city']
+    ordering = ['name']
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """?q=<prefix>&limit=10 — answered from the in-process prefix index."""
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer.'})
+        return Response({'results': autocomplete.companies.lookup(request.query_params.get('q', ''), limit)})
+
+
+class ContactViewSet(SerializerTimingMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = Contact.objects.select_related('company')
     serializer_class = ContactSerializer
+    search_fields = ['first_name', 'last_name', 'email', 'company__name', 'phone_number', 'mobile_number']
+    ordering_fields = ['id', 'first_name', 'last_name', 'email', 'position', 'company__name',
+                       'phone_number', 'mobile_number']
+    ordering_aliases = {'full_name': 'first_name'}
+    ordering = ['first_name', 'last_name']
+    export_columns = (
+        ('ID', 'id'), ('Title', 'title'), ('First name', 'first_name'), ('Last name', 'last_name'),
+        ('Position', 'position'), ('Company', 'company__name'), ('Email', 'email'),
+        ('Phone', 'phone_number'), ('Mobile', 'mobile_number'), ('Fax', 'fax_number'), ('Notes', 'notes'),
+    )
     permission_classes = [IsAuthenticated]
-    authentication_classes = API_AUTH
+    authentication_classes = STATELESS_API_AUTH
 
 
-class BuildingViewSet(viewsets.ModelViewSet):
+class BuildingViewSet(SerializerTimingMixin, ConditionalObjectMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = Building.objects.all()
     serializer_class = BuildingSerializer
+    etag_fields = ('grade_desc', 'building_type_desc', 'main_image_name')
+    authentication_classes = STATELESS_API_AUTH
     parser_classes = (MultiPartParser, FormParser, JSONParser)
+    search_fields = ['name', 'address_street', 'address_brgy', 'address_city', 'grade', 'building_type']
+    fulltext_search = True
+    ordering_fields = ['id', 'name', 'marketing_status', 'grade', 'grade_description', 'building_type',
+                       'building_type_description', 'address_city', 'numbers__office_rent',
+                       'numbers__sale_price_php', 'numbers__lot_area', 'numbers__gfa', 'numbers__gla']
+    ordering_aliases = {'grade_desc': 'grade_description', 'building_type_desc': 'building_type_description',
+                        'office_rent': 'numbers__office_rent', 'sale_price_php': 'numbers__sale_price_php',
+                        'lot_area': 'numbers__lot_area', 'gfa': 'numbers__gfa', 'gla': 'numbers__gla'}
+    # numeric shadow columns (numbers.py): ?office_rent_max=900&gfa_min=10000
+    range_filters = {'office_rent': 'numbers__office_rent', 'sale_price_php': 'numbers__sale_price_php',
+                     'lot_area': 'numbers__lot_area', 'gfa': 'numbers__gfa', 'gla': 'numbers__gla'}
+    ordering = ['name']
+    export_columns = (
+        ('ID', 'id'), ('Name', 'name'), ('Marketing status', 'marketing_status'),
+        ('Grade', 'grade_description'), ('Type', 'building_type_description'), ('PEZA', 'peza'),
+        ('Strata', 'strata'), ('Year built', 'year_built'), ('Street', 'address_street'),
+        ('Barangay', 'address_brgy'), ('City', 'address_city'), ('ZIP', 'address_zip'),
+        ('Total levels', 'total_levels'), ('Plate area', 'plate_area'), ('GFA', 'gfa'), ('GLA', 'gla'),
+        ('Office rent', 'office_rent'), ('Sale price (PHP)', 'sale_price_php'), ('Lot area', 'lot_area'),
+        ('Association dues', 'assoc_dues'),
+    )
+
+    def get_queryset(self):
+        # the first image comes back as a correlated subquery so the serializer
+        # never goes back to the DB per row; grade/type descriptions are a CASE
+        # over the cached lookup tables (reference.py), used for sorting and exports
+        image = BuildingImage.objects.filter(building=OuterRef('pk')).order_by('id').values('image')[:1]
+        return super().get_queryset().annotate(
+            grade_description=reference.building_grades.description_expression('grade'),
+            building_type_description=reference.building_types.description_expression('building_type'),
+            main_image_name=Subquery(image),
+        )
 
 
-class BuildingLogListCreateView(generics.ListCreateAPIView):
+class BuildingLogListCreateView(SerializerTimingMixin, generics.ListCreateAPIView):
     serializer_class = BuildingLogSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OptionalKeysetPagination
+    keyset = ('-timestamp', '-id')
 
     def get_queryset(self):
         bldg_id = self.kwargs['building_id']
         return BuildingLog.objects.select_related('user').filter(building_id=bldg_id)
 
-    def perform_create(self, serializer):
-        bldg_id = self.kwargs['building_id']
-        serializer.save(building_id=bldg_id, user=self.request.user)
+    def create(self, request, *args, **kwargs):
+        # written by the audit-log thread (auditlog.py); the entry has no id yet
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        entry = auditlog.log_building(self.kwargs['building_id'], request.user, serializer.validated_data['message'])
+        return Response(self.get_serializer(entry).data, status=status.HTTP_202_ACCEPTED)
 
 
-class BuildingLogDestroyView(generics.DestroyAPIView):
+class BuildingLogDestroyView(SerializerTimingMixin, generics.DestroyAPIView):
     serializer_class = BuildingLogSerializer
     permission_classes = [IsAdminUser]
 
@@ -205,24 +299,156 @@ class BuildingLogDestroyView(generics.DestroyAPIView):
         return BuildingLog.objects.filter(building_id=bldg_id)
 
 
-class UnitPagination(PageNumberPagination):
-    page_size_query_param = 'page_size'
-    max_page_size = 100
-
-
-class UnitViewSet(viewsets.ModelViewSet):
+class UnitViewSet(SerializerTimingMixin, ConditionalObjectMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = Unit.objects.select_related('building')
     serializer_class = UnitSerializer
-    pagination_class = UnitPagination
-
+    etag_fields = ('building.name',)
+    authentication_classes = STATELESS_API_AUTH
+    pagination_class = OptionalKeysetPagination
+    keyset = ('pk',)
+    search_fields = ['name', 'building__name', 'floor', 'marketing_status', 'vacancy_status']
+    ordering_fields = ['id', 'name', 'building__name', 'floor', 'marketing_status', 'vacancy_status',
+                       'foreclosed', 'gross_floor_area', 'net_floor_area', 'lease_expiry_date',
+                       'numbers__asking_rent', 'numbers__sale_price_office', 'numbers__gross_floor_area',
+                       'numbers__net_floor_area']
+    ordering_aliases = {'marketing_status_display': 'marketing_status',
+                        'vacancy_status_display': 'vacancy_status',
+                        'asking_rent': 'numbers__asking_rent', 'sale_price_office': 'numbers__sale_price_office',
+                        'gross_floor_area': 'numbers__gross_floor_area', 'net_floor_area': 'numbers__net_floor_area'}
+    # numeric shadow columns (numbers.py): ?asking_rent_max=900&gross_floor_area_min=200
+    range_filters = {'asking_rent': 'numbers__asking_rent', 'sale_price_office': 'numbers__sale_price_office',
+                     'gross_floor_area': 'numbers__gross_floor_area', 'net_floor_area': 'numbers__net_floor_area',
+                     'dues': 'numbers__dues'}
+    ordering = ['building__name', 'name']
+    export_columns = (
+        ('ID', 'id'), ('Unit', 'name'), ('Building', 'building__name'), ('City', 'building__address_city'),
+        ('Floor', 'floor'), ('Marketing status', 'marketing_status'), ('Vacancy', 'vacancy_status'),
+        ('Foreclosed', 'foreclosed'), ('GFA', 'gross_floor_area'), ('NFA', 'net_floor_area'),
+        ('Lease start', 'lease_commencement_date'), ('Lease end', 'lease_expiry_date'),
+        ('Asking rent', 'asking_rent'), ('Parking slots', 'allocated_parking_slot'),
+        ('Dues', 'dues'), ('Sale price (office)', 'sale_price_office'), ('Notes', 'notes'),
+    )
+
+    CALENDAR_BUCKETS = {'month': (TruncMonth, 1), 'quarter': (TruncQuarter, 3)}
+
+    @action(detail=True, methods=['get'], url_path='matching-odforms')
+    def matching_odforms(self, request, pk=None):
+        """Active OD forms this unit fits, best first (kept current on save by odform_index.py)."""
+        unit = self.get_object()
+        matches = (
+            ODFormMatch.objects
+            .filter(unit=unit, od_form__status='active')
+            .select_related('od_form__contact__company', 'od_form__account_manager')
+            .order_by('-score', 'od_form_id')
+        )
+        return Response({
+            'unit': unit.pk,
+            'results': [{
+                'od_form': m.od_form_id,
+                'contact': m.od_form.contact.full_name if m.od_form.contact else None,
+                'company': m.od_form.contact.company.name if m.od_form.contact and m.od_form.contact.company else None,
+                'account_manager': m.od_form.account_manager.username if m.od_form.account_manager else None,
+                'intent': m.od_form.intent,
+                'size_minimum': m.od_form.size_minimum,
+                'size_maximum': m.od_form.size_maximum,
+                'budget_maximum': m.od_form.budget_maximum,
+                'preferred_location': m.od_form.preferred_location,
+                'score': m.score,
+                'matched_at': m.matched_at,
+            } for m in matches],
+        })
 
-class ODFormViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'], url_path='expiry-calendar')
+    def expiry_calendar(self, request):
+        """
+        Lease expiries bucketed by month or quarter from one GROUP BY query.
+        ?months= (default 24), ?bucket=month|quarter, optional ?building=<id>.
+        Empty buckets are filled in so the pipeline renders without gaps.
+        Cached until the next building/unit write (caching.py).
+        """
+        bucket = request.query_params.get('bucket', 'month')
+        if bucket not in self.CALENDAR_BUCKETS:
+            raise ValidationError({'bucket': 'Must be "month" or "quarter".'})
+        try:
+            months = min(max(int(request.query_params.get('months', 24)), 1), 120)
+        except ValueError:
+            raise ValidationError({'months': 'Must be an integer.'})
+        try:
+            building = int(request.query_params['building']) if request.query_params.get('building') else None
+        except ValueError:
+            raise ValidationError({'building': 'Must be an integer.'})
+
+        today = now().date()
+        return Response(caching.get_or_compute(
+            ('inventory',), ('expiry-calendar', today, bucket, months, building),
+            lambda: self._expiry_calendar(today, bucket, months, building),
+        ))
+
+    def _expiry_calendar(self, today, bucket, months, building):
+        trunc, step = self.CALENDAR_BUCKETS[bucket]
+        first = _add_months(today.replace(day=1), -((today.month - 1) % step))
+        end = _add_months(today.replace(day=1), months)
+
+        units = Unit.objects.filter(lease_expiry_date__gte=first, lease_expiry_date__lt=end)
+        if building is not None:
+            units = units.filter(building_id=building)
+        totals = {
+            row['period']: row
+            for row in units
+            .annotate(period=trunc('lease_expiry_date'))
+            .values('period')
+            # the numeric shadow column (numbers.py): unit_gfa itself is a varchar like '1,200.50 sqm'
+            .annotate(units=Count('id'), gfa=Sum('numbers__gross_floor_area'))
+            .order_by('period')
+        }
+
+        results = []
+        period = first
+        while period < end:
+            row = totals.get(period, {})
+            results.append({
+                'period': (f'{period.year}-Q{(period.month - 1) // 3 + 1}' if bucket == 'quarter'
+                           else period.strftime('%Y-%m')),
+                'start': period,
+                'units': row.get('units', 0),
+                'gfa': row.get('gfa') or 0,
+            })
+            period = _add_months(period, step)
+
+        return {
+            'bucket': bucket,
+            'start': first,
+            'end': end,
+            'total_units': sum(r['units'] for r in results),
+            'total_gfa': sum(r['gfa'] for r in results),
+            'results': results,
+        }
+
+
+class ODFormViewSet(SerializerTimingMixin, ConditionalObjectMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = ODForm.objects.all()
     serializer_class = ODFormSerializer
+    last_modified_field = 'edited_date'
     permission_classes = [IsAuthenticated]
+    authentication_classes = STATELESS_API_AUTH
+    search_fields = ['call_taken_by', 'preferred_location', 'notes',
+                     'contact__first_name', 'contact__last_name', 'contact__company__name']
+    ordering_fields = ['id', 'created', 'edited_date', 'call_taken_by', 'intent', 'status',
+                       'size_minimum', 'size_maximum', 'budget_minimum', 'budget_maximum']
+    ordering = ['-created']
+    export_columns = (
+        ('ID', 'id'), ('Created', 'created'), ('Contact first name', 'contact__first_name'),
+        ('Contact last name', 'contact__last_name'), ('Company', 'contact__company__name'),
+        ('Call taken by', 'call_taken_by'), ('Call type', 'type_of_call'), ('Source', 'source_of_call'),
+        ('Caller type', 'type_of_caller'), ('Intent', 'intent'), ('Purpose', 'purpose'),
+        ('Size min', 'size_minimum'), ('Size max', 'size_maximum'),
+        ('Budget min', 'budget_minimum'), ('Budget max', 'budget_maximum'),
+        ('Preferred location', 'preferred_location'), ('Status', 'status'),
+        ('Account manager', 'account_manager__username'), ('Notes', 'notes'),
+    )
 
     def perform_create(self, serializer):
-        user = self.request.user
+        user = full_user(self.request.user)
         serializer.save(
             account_manager=user,
             created_by=user,
@@ -230,46 +456,158 @@ class ODFormViewSet(viewsets.ModelViewSet):
         )
 
     def perform_update(self, serializer):
-        serializer.save(edited_by=self.request.user)
+        serializer.save(edited_by=full_user(self.request.user))
+
+    @action(detail=True, methods=['get'])
+    def matches(self, request, pk=None):
+        """
+        Best vacant units for this OD form, scored live. ?limit=20 (max 100)
+        Cached until the next building/unit/OD form write (caching.py).
+        """
+        try:
+            limit = min(max(int(request.query_params.get('limit', matching.DEFAULT_LIMIT)), 1), 100)
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer.'})
+
+        form = self.get_object()
+        return Response({
+            'od_form': form.pk,
+            'results': caching.get_or_compute(
+                ('inventory', 'odforms'), ('odform-matches', form.pk, limit),
+                lambda: [matching.describe(unit) for unit in matching.top_matches(form, limit)],
+            ),
+        })
 
 
-class BuildingImageViewSet(viewsets.ModelViewSet):
+class BuildingImageViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     queryset = BuildingImage.objects.all()
     serializer_class = BuildingImageSerializer
+    ordering = ['id']
     authentication_classes = API_AUTH
 
 
-class UnitImageViewSet(viewsets.ModelViewSet):
+class UnitImageViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     queryset = UnitImage.objects.all()
     serializer_class = UnitImageSerializer
+    ordering = ['id']
     authentication_classes = API_AUTH
 
 
-class ExpiringContactView(APIView):
+class ExpiringContactView(SerializerTimingMixin, generics.GenericAPIView):
+    """
+    Contacts attached to units whose lease ends within `?days=` (default ≈ six
+    months). One query over pt_unit_contacts ⋈ units ⋈ buildings ⋈ companies,
+    ordered by the real expiry date in SQL.
+
+    Without paging params the whole window is streamed as a JSON array;
+    `?page=` / DataTables params return a single page instead.
+    """
     permission_classes = [IsAuthenticated]
-    authentication_classes = API_AUTH
+    authentication_classes = STATELESS_API_AUTH
+    pagination_class = DataTablesPagination
+    default_horizon_days = 183
+    max_horizon_days = 3650
+    chunk_size = 2000
+
+    COLUMNS = (
+        'contact_id', 'contact__company__name', 'unit__building__address_city',
+        'unit__building__name', 'unit__name', 'unit__lease_expiry_date', 'unit__gross_floor_area',
+    )
+
+    def get_horizon_days(self):
+        try:
+            days = int(self.request.query_params.get('days', self.default_horizon_days))
+        except ValueError:
+            raise ValidationError({'days': 'Must be an integer.'})
+        if days < 0:
+            raise ValidationError({'days': 'Must not be negative.'})
+        return min(days, self.max_horizon_days)
 
-    def get(self, request):
-        horizon = now().date() + timedelta(days=183)  # ≈ six months
-        units = (
-            Unit.objects
-            .filter(lease_expiry_date__range=[now().date(), horizon])
-            .select_related('building')
-            .prefetch_related('contacts', 'contacts__company')
+    def get_queryset(self):
+        today = now().date()
+        horizon = today + timedelta(days=self.get_horizon_days())
+        return (
+            Unit.contacts.through.objects
+            .filter(unit__lease_expiry_date__range=[today, horizon])
+            .order_by('unit__lease_expiry_date', 'unit_id', 'contact_id')
+            .values_list(*self.COLUMNS)
         )
 
-        rows = []
-        for unit in units:
-            for contact in unit.contacts.all():
-                rows.append({
-                    "id": contact.id,
-                    "company": contact.company.name if contact.company else "",
-                    "location": unit.building.address_city,
-                    "building": unit.building.name,
-                    "unit_name": unit.name,
-                    "lease_expiry": unit.lease_expiry_date.strftime("%m/%d/%Y"),
-                    "gfa": f"{unit.gross_floor_area:,}" if unit.gross_floor_area else "",
-                })
-
-        rows.sort(key=lambda r: r["lease_expiry"])
-        return Response(rows)
+    @staticmethod
+    def to_row(values):
+        contact_id, company, city, building, unit_name, expiry, gfa = values
+        return {
+            "id": contact_id,
+            "company": company or "",
+            "location": city,
+            "building": building,
+            "unit_name": unit_name,
+            "lease_expiry": expiry.strftime("%m/%d/%Y"),
+            "gfa": f"{gfa:,}" if gfa else "",
+        }
+
+    def get(self, request):
+        queryset = self.get_queryset()
+
+        if 'page' in request.query_params or is_datatables_request(request):
+            page = self.paginate_queryset(queryset)
+            return self.get_paginated_response([self.to_row(r) for r in page])
+
+        def stream():
+            yield '['
+            for i, values in enumerate(queryset.iterator(chunk_size=self.chunk_size)):
+                yield (',' if i else '') + json.dumps(self.to_row(values))
+            yield ']'
+
+        return StreamingHttpResponse(stream(), content_type='application/json')
+
+
+class SearchView(APIView):
+    """
+    Typeahead across buildings, companies, contacts and units.
+    ?q=<text>&types=building,company&limit=10
+    """
+    permission_classes = [IsAuthenticated]
+    authentication_classes = STATELESS_API_AUTH
+    max_limit = 50
+
+    def get(self, request):
+        types = [t for t in request.query_params.get('types', '').split(',') if t]
+        unknown = set(types) - set(search.SEARCH_TYPES)
+        if unknown:
+            raise ValidationError({'types': f'Unknown type(s): {", ".join(sorted(unknown))}'})
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), self.max_limit)
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer.'})
+
+        q = request.query_params.get('q', '').strip()
+        return Response({'q': q, 'results': search.search(q, types or None, limit)})
+
+
+class ImportView(APIView):
+    """
+    Bulk-load a CSV/XLSX sheet into units or buildings (admin only).
+    POST multipart: file=<upload>, target=units|buildings, dry_run=1 to validate only.
+    """
+    permission_classes = [IsAdminUser]
+    authentication_classes = API_AUTH
+    parser_classes = (MultiPartParser, FormParser)
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'This field is required.'})
+        target = request.data.get('target', 'units')
+        if target not in imports.TARGETS:
+            raise ValidationError({'target': f'Must be one of: {", ".join(imports.TARGETS)}.'})
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+
+        try:
+            result = imports.import_rows(
+                imports.TARGETS[target], imports.read_rows(upload.file, upload.name), dry_run=dry_run,
+            )
+        except imports.ImportFileError as exc:
+            raise ValidationError({'file': str(exc)})
+
+        return Response({'target': target, 'dry_run': dry_run, **result.as_dict()})
@@ -21,13 +21,16 @@
     // State
     let dt;
     let currentLogsBuildingId = null;
+    let editingEtag = null;  // sent back as If-Match so a concurrent edit is not overwritten
 
     // DataTable
     dt = $('#buildings-table').DataTable({
+        serverSide: true,   // paging/sorting/search happen in the API
+        processing: true,
         ajax: {
             url: '/api/buildings/',
             headers: auth,
-            dataSrc: j => Array.isArray(j) ? j : j.results
+            dataSrc: 'data'
         },
         columns: [
             {data: 'name'},
@@ -77,6 +80,7 @@
     $('#btn-add-building').on('click', () => {
         $('#buildingModalTitle').text('Add Building');
         $('#building_id').val('');
+        editingEtag = null;
         $('#buildingForm')[0].reset();
         new bootstrap.Modal(document.getElementById('buildingModal')).show();
     });
@@ -88,6 +92,7 @@
             const r = await fetch(`/api/buildings/${id}/`, {headers: auth});
             if (!r.ok) throw new Error(await r.text());
             const b = await r.json();
+            editingEtag = r.headers.get('ETag');
             $('#buildingModalTitle').text('Edit Building');
             $('#building_id').val(b.id);
             $('#b_name').val(b.name || '');
@@ -125,9 +130,12 @@
             if (id) {
                 r = await fetch(`/api/buildings/${id}/`, {
                     method: 'PATCH',
-                    headers: {'Content-Type': 'application/json', ...auth},
+                    headers: {'Content-Type': 'application/json', ...auth, ...(editingEtag && {'If-Match': editingEtag})},
                     body: JSON.stringify(payload)
                 });
+                if (r.status === 412) {
+                    return toast('Someone else changed this building. Reopen it to see their changes.', false);
+                }
             } else {
                 r = await fetch('/api/buildings/', {
                     method: 'POST',
@@ -187,12 +195,18 @@
         new bootstrap.Modal(document.getElementById('logsModal')).show();
     });
 
-    async function loadLogs(buildingId) {
+    // `pending`: an entry just accepted (202) that the log writer may not have stored yet
+    async function loadLogs(buildingId, pending) {
         const list = $('#logsList').empty();
         try {
             const r = await fetch(`/api/buildings/${buildingId}/logs/`, {headers: auth});
             if (!r.ok) throw new Error();
-            const rows = await r.json();
+            const j = await r.json();
+            const rows = Array.isArray(j) ? j : j.results;
+            if (pending && !rows.some(x => x.message === pending.message &&
+                Math.abs(new Date(x.timestamp) - new Date(pending.timestamp)) < 1000)) {
+                rows.unshift(pending);
+            }
             if (!rows.length) {
                 list.append('<li class="list-group-item">No logs yet.</li>');
                 return;
@@ -224,7 +238,7 @@
         });
         if (r.ok) {
             $('#logMessage').val('');
-            await loadLogs(currentLogsBuildingId);
+            await loadLogs(currentLogsBuildingId, await r.json());
             dt.ajax.reload(null, false); // refresh “last update/by”
         } else {
             toast('Adding log failed', false);
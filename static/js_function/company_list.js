@@ -29,10 +29,12 @@ $(function () {
     if (!token) return (location.href = '/');
 
     dt = $table.DataTable({
+        serverSide: true,   // paging/sorting/search happen in the API
+        processing: true,
         ajax: {
             url: '/api/companies/',
             headers: {Authorization: `Bearer ${token}`},
-            dataSrc: j => Array.isArray(j) ? j : j.results
+            dataSrc: 'data'
         },
         columns: [
             {data: 'id', visible: false},       // hidden primary-key
@@ -51,10 +51,12 @@ $(async function () {
     if (!token) return (location.href = '/');
 
     dt = $table.DataTable({
+        serverSide: true,   // paging/sorting/search happen in the API
+        processing: true,
         ajax: {
             url: '/api/contacts/',
             headers: {Authorization: `Bearer ${token}`},
-            dataSrc: j => Array.isArray(j) ? j : j.results
+            dataSrc: 'data'
         },
         columns: [
             {data: 'full_name', defaultContent: '—'},
@@ -105,7 +107,7 @@ $('#companySearchBtn').on('click', doCompanySearch);
 async function doCompanySearch() {
     const q = $('#companySearchInput').val().trim();
     if (!q) return;
-    const r = await fetch(`/api/companies/?search=${encodeURIComponent(q)}`,
+    const r = await fetch(`/api/companies/autocomplete/?q=${encodeURIComponent(q)}&limit=20`,
         {headers: {Authorization: `Bearer ${token}`}});
     if (!r.ok) {
         alert('Search failed');
@@ -15,9 +15,10 @@
     }
 
     /* ---------- fill dashboard statistics (your old code) ---- */
-    fetch(`/api/dashboard/?_=${Date.now()}`, {          // ← forces fresh GET
+    fetch('/api/dashboard/', {
         headers: {Authorization: `Bearer ${token}`},
         credentials: "include",
+        cache: "no-cache",                              // revalidate via ETag
     })
         .then(r => {
             if (r.status === 401) {
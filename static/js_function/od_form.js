@@ -30,7 +30,7 @@ function setMode(isEdit) {
 const $table = $('#odforms-table');
 const $modal = $('#exampleModalScrollable');
 const $form = $('#odformForm')[0];
-let dt, editingId = null;
+let dt, editingId = null, editingEtag = null;
 const token = localStorage.getItem('access');
 
 /* ---------- init table ---------- */
@@ -38,10 +38,12 @@ $(function () {
     if (!token) return location.href = '/';
 
     dt = $table.DataTable({
+        serverSide: true,   // paging/sorting/search happen in the API
+        processing: true,
         ajax: {
             url: '/api/odforms/',
             headers: {Authorization: `Bearer ${token}`},
-            dataSrc: j => Array.isArray(j) ? j : j.results
+            dataSrc: 'data'
         },
         columns: [
             {data: 'id', visible: false},
@@ -94,7 +96,7 @@ $(function () {
 /* ---------- helpers ---------- */
 function resetForm() {
     $form.reset();
-    editingId = null;
+    editingId = editingEtag = null;
     setMode(false);
 }
 
@@ -108,6 +110,7 @@ $table.on('click', '.edit-od', async function () {
         const r = await fetch(`/api/odforms/${id}/`, {headers: {Authorization: `Bearer ${token}`}});
         if (!r.ok) throw await r.text();
         const data = await r.json();
+        editingEtag = r.headers.get('ETag');
         Object.entries(data).forEach(([k, v]) => {
             const el = $form.elements.namedItem(k);
             if (!el) return;
@@ -148,9 +151,15 @@ $('#saveOdFormBtn').on('click', async e => {
     const payload = Object.fromEntries(fd);
     const r = await fetch(editingId ? `/api/odforms/${editingId}/` : '/api/odforms/', {
         method: editingId ? 'PATCH' : 'POST',
-        headers: {'Content-Type': 'application/json', Authorization: `Bearer ${token}`},
+        headers: {
+            'Content-Type': 'application/json', Authorization: `Bearer ${token}`,
+            ...(editingId && editingEtag && {'If-Match': editingEtag}),
+        },
         body: JSON.stringify(payload)
     });
+    if (r.status === 412) {
+        return alert('This OD form was changed by someone else. Reopen it to see their changes.');
+    }
 
     const txt = await r.text();
     const data = (() => {
@@ -6,10 +6,12 @@ $(document).ready(function () {
     }
 
     $('#units-table').DataTable({
+        serverSide: true,   // paging/sorting/search happen in the API
+        processing: true,
         ajax: {
             url: '/api/units/',
             headers: {Authorization: `Bearer ${token}`},
-            dataSrc: json => Array.isArray(json) ? json : json.results,
+            dataSrc: 'data',
             error: xhr => alert(`Could not load units (${xhr.status} ${xhr.statusText})`)
         },
         columns: [
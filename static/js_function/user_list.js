@@ -30,10 +30,12 @@
     $(function () {
         // Init table
         dt = $('#users-table').DataTable({
+            serverSide: true,   // paging/sorting/search happen in the API
+            processing: true,
             ajax: {
                 url: API_LIST,
                 headers: {Authorization: `Bearer ${token}`},
-                dataSrc: j => Array.isArray(j) ? j : j.results,
+                dataSrc: 'data',
                 error: (xhr) => {
                     if (xhr.status === 404) {
                         toast('Users API not found. Please add admin users endpoint.', false);